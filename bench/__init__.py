@@ -0,0 +1,12 @@
+"""로컬 가짜 API 서버로 Cog 동작을 측정하는 벤치마크 모음
+
+실제 Discord / 외부 API 없이 실행할 수 있도록 config.py 가 요구하는 환경변수를 더미 값으로 채운다.
+예) python -m bench.suite --iterations 200 --concurrency 8
+    python -m bench.twitter_poll --accounts 50
+"""
+import os
+
+os.environ.setdefault("DISCORD_TOKEN", "bench-token")
+os.environ.setdefault("DISCORD_CHANNEL_ID", "1")
+os.environ.setdefault("TWITTER_USERNAME", "bench")
+os.environ.setdefault("BEARER_TOKEN", "bench-bearer")
@@ -0,0 +1,213 @@
+# bench/discord_stubs.py
+import asyncio
+import itertools
+import tempfile
+import time
+import os
+from typing import Dict, List, Optional
+
+import discord
+from discord.ext import commands
+
+from http_client import HttpClient
+from state_store import StateStore
+from scheduler import JobScheduler
+from dispatcher import Dispatcher
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+
+
+class FakeChannel:
+    """보낸 메시지를 기록만 하는 채널 (fail_with 를 주면 매번 그 예외로 실패)"""
+
+    def __init__(self, channel_id: int, send_latency: float = 0.0, guild_id: Optional[int] = None,
+                 fail_with: Optional[Exception] = None):
+        self.id = channel_id
+        self.guild = FakeGuild(guild_id or channel_id)
+        self.send_latency = send_latency
+        self.fail_with = fail_with
+        self.sent: List[dict] = []
+        self.attempts = 0
+        self.last_sent_at: Optional[float] = None
+
+    async def send(self, content: Optional[str] = None, **kwargs):
+        self.attempts += 1
+        if self.send_latency:
+            await asyncio.sleep(self.send_latency)
+        if self.fail_with is not None:
+            raise self.fail_with
+        self.sent.append({"content": content, **kwargs})
+        self.last_sent_at = time.perf_counter()
+
+
+class FakeBot:
+    """Cog 가 사용하는 commands.Bot 의 일부만 흉내 낸 봇"""
+
+    def __init__(self, send_latency: float = 0.0):
+        self._setup_fakes(send_latency)
+
+    def _setup_fakes(self, send_latency: float):
+        self.send_latency = send_latency
+        self.channels: Dict[int, FakeChannel] = {}
+        self._tmpdir = tempfile.mkdtemp(prefix="bench-state-")
+        self.http_client = HttpClient()
+        self.state_store = StateStore(os.path.join(self._tmpdir, "state.db"))
+        self.scheduler = JobScheduler(state=self.state_store)
+        self.dispatcher = Dispatcher()
+
+    def get_channel(self, channel_id: int) -> FakeChannel:
+        if channel_id not in self.channels:
+            self.channels[channel_id] = FakeChannel(channel_id, self.send_latency)
+        return self.channels[channel_id]
+
+    async def wait_until_ready(self):
+        return
+
+    def is_ready(self) -> bool:
+        return True
+
+    async def close(self):
+        await self.scheduler.close()
+        await self.dispatcher.close()
+        await self.http_client.close()
+        await self.state_store.close()
+
+
+class FakeTreeBot(FakeBot, commands.Bot):
+    """실제 commands.Bot + CommandTree 를 쓰되 로그인 없이 공용 자원만 가짜로 채운 봇
+
+    add_cog 로 등록한 슬래시 명령어가 진짜 앱 커맨드 트리에 올라가므로 tree._call 로 호출할 수 있다.
+    """
+
+    def __init__(self, send_latency: float = 0.0):
+        commands.Bot.__init__(self, command_prefix="!", intents=discord.Intents.none())
+        self._setup_fakes(send_latency)
+
+
+# 디스코드는 3초 안에 첫 응답(send_message / defer)이 없으면 인터랙션을 무효화함
+INTERACTION_DEADLINE = 3.0
+_interaction_ids = itertools.count(1)
+
+
+class _FakeHTTPResponse:
+    """discord.HTTPException 생성에 필요한 최소한의 응답 객체"""
+
+    def __init__(self, status: int, reason: str):
+        self.status = status
+        self.reason = reason
+
+
+def forbidden() -> discord.Forbidden:
+    """채널에 보낼 권한이 없을 때 디스코드가 돌려주는 오류"""
+    return discord.Forbidden(_FakeHTTPResponse(403, "Forbidden"), {"code": 50013, "message": "Missing Permissions"})
+
+
+def _unknown_interaction() -> discord.NotFound:
+    return discord.NotFound(_FakeHTTPResponse(404, "Not Found"), {"code": 10062, "message": "Unknown interaction"})
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.name = f"bench-user-{user_id}"
+        self.bot = False
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class FakeInteractionResponse:
+    """InteractionResponse 흉내 - 첫 응답 시각을 기록하고 3초가 지나면 Unknown interaction 으로 실패"""
+
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _acknowledge(self, kind: str):
+        interaction = self._interaction
+        if self._done:
+            raise discord.InteractionResponded(interaction)
+        if interaction.latency:
+            await asyncio.sleep(interaction.latency)
+        if interaction.elapsed() > INTERACTION_DEADLINE:
+            interaction.expired = True
+            raise _unknown_interaction()
+        self._done = True
+        interaction.acked_at = time.perf_counter()
+        interaction.ack_kind = kind
+
+    async def defer(self, *, ephemeral: bool = False, thinking: bool = False):
+        await self._acknowledge("defer")
+
+    async def send_message(self, content: Optional[str] = None, **kwargs):
+        await self._acknowledge("message")
+        self._interaction.record(content, **kwargs)
+
+
+class FakeFollowup:
+    """Interaction.followup(Webhook) 흉내"""
+
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+
+    async def send(self, content: Optional[str] = None, **kwargs):
+        interaction = self._interaction
+        if interaction.latency:
+            await asyncio.sleep(interaction.latency)
+        if not interaction.response.is_done():
+            raise _unknown_interaction()
+        interaction.record(content, **kwargs)
+
+
+class FakeInteraction:
+    """tree._call 에 넘길 수 있는 슬래시 명령어 인터랙션
+
+    created 부터 첫 응답까지(acked_at), 마지막 메시지까지(finished_at) 시간을 기록한다.
+    latency 는 디스코드 API 한 번 왕복에 걸리는 시간(초).
+    """
+
+    def __init__(self, client, command_name: str, options: Optional[List[dict]] = None,
+                 user_id: Optional[int] = None, latency: float = 0.0):
+        self.id = next(_interaction_ids)
+        self.client = client
+        self._state = getattr(client, "_connection", None)
+        self.type = discord.InteractionType.application_command
+        self.data = {"id": str(self.id), "name": command_name, "type": 1, "options": options or []}
+        self.user = FakeUser(user_id or self.id)
+        self.guild_id = None
+        self.guild = None
+        self.channel = None
+        self.channel_id = None
+        self.locale = discord.Locale.korean
+        self.guild_locale = None
+        self.extras: dict = {}
+        self.command_failed = False
+        self.latency = latency
+        self.response = FakeInteractionResponse(self)
+        self.followup = FakeFollowup(self)
+        self.messages: List[dict] = []
+        self.created_at = time.perf_counter()
+        self.acked_at: Optional[float] = None
+        self.ack_kind: Optional[str] = None
+        self.finished_at: Optional[float] = None
+        self.expired = False
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.created_at
+
+    def record(self, content: Optional[str] = None, **kwargs):
+        self.messages.append({"content": content, **kwargs})
+        self.finished_at = time.perf_counter()
+
+    async def edit_original_response(self, *, content: Optional[str] = None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if not self.response.is_done():
+            raise _unknown_interaction()
+        self.record(content, **kwargs)
@@ -0,0 +1,138 @@
+# bench/fanout.py
+"""여러 길드 구독 채널로 알림을 보내는 팬아웃 벤치마크
+
+가짜 길드 N개에 채널을 하나씩 만들어 같은 피드를 구독시키고, 일부 채널은 권한 없음(403)으로 실패하게 한 뒤
+이벤트 E개를 SubscriptionRegistry 로 전송한다. Dispatcher 의 동시 전송 수를 바꿔 가며
+전체 전송 시간, 정상 채널이 알림을 받기까지 걸린 시간, 실패 격리, 자동 구독 해제 수를 측정하고
+채널을 하나씩 기다리며 보내는 단순 반복(sequential)과 비교한다.
+
+    python -m bench.fanout --guilds 200 --events 5 --send-latency-ms 80
+    python -m bench.fanout --levels 1,5,20,50 --failing-ratio 0.1 --mode deliver
+    python -m bench.fanout --events 3 --strike-window-ms 0   # 실패를 이벤트마다 세면 한 번의 몰림으로 구독이 해제됨
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import List
+
+import bench  # noqa: F401  (더미 환경변수 설정)
+from bench.discord_stubs import FakeBot, FakeChannel, forbidden
+from bench.interactions import percentiles
+from dispatcher import Dispatcher
+from subscriptions import STRIKE_WINDOW, SubscriptionRegistry
+
+FEED = "twitter"
+DEFAULT_LEVELS = "1,5,20,50"
+
+
+def build_bot(args, concurrency: int) -> FakeBot:
+    bot = FakeBot()
+    bot.dispatcher = Dispatcher(max_in_flight=concurrency, max_backlog=max(args.guilds * args.events, 1))
+    bot.subscriptions = SubscriptionRegistry(bot, bot.state_store, bot.dispatcher, max_concurrency=concurrency,
+                                             strike_window=args.strike_window_ms / 1000)
+    failing = int(args.guilds * args.failing_ratio)
+    for index in range(args.guilds):
+        guild_id = channel_id = 10_000 + index
+        bot.channels[channel_id] = FakeChannel(channel_id, args.send_latency_ms / 1000, guild_id=guild_id,
+                                               fail_with=forbidden() if index < failing else None)
+        bot.subscriptions.subscribe(guild_id, FEED, channel_id)
+    return bot
+
+
+async def send_event(bot: FakeBot, mode: str, number: int):
+    content = f"벤치마크 알림 #{number}"
+    if mode == "publish":
+        bot.subscriptions.publish(FEED, content, label="벤치마크")
+    else:
+        await bot.subscriptions.deliver(FEED, content, label="벤치마크")
+
+
+def summarize(bot: FakeBot, args, started: float, elapsed: float, concurrency) -> dict:
+    healthy = [channel for channel in bot.channels.values() if channel.fail_with is None]
+    broken = [channel for channel in bot.channels.values() if channel.fail_with is not None]
+    subscribed = set(bot.subscriptions.channel_ids(FEED))
+    reached: List[float] = [channel.last_sent_at - started for channel in healthy if channel.last_sent_at]
+    return {
+        "concurrency": concurrency,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "healthy_channel_done_ms": percentiles(reached),
+        "messages_delivered": sum(len(channel.sent) for channel in healthy),
+        "healthy_channels_missing_events": sum(1 for channel in healthy if len(channel.sent) < args.events),
+        "failed_attempts": sum(channel.attempts for channel in broken),
+        "auto_unsubscribed": sum(1 for channel in broken if channel.id not in subscribed),
+        "renders": args.events,
+    }
+
+
+async def run_registry(args, concurrency: int) -> dict:
+    bot = build_bot(args, concurrency)
+    try:
+        started = time.perf_counter()
+        for number in range(args.events):
+            await send_event(bot, args.mode, number)
+            if args.interval_ms:
+                await asyncio.sleep(args.interval_ms / 1000)
+        await bot.dispatcher.drain()
+        elapsed = time.perf_counter() - started
+        result = summarize(bot, args, started, elapsed, concurrency)
+        result["dispatcher"] = dict(bot.dispatcher.stats)
+        return result
+    finally:
+        await bot.close()
+
+
+async def run_sequential(args) -> dict:
+    """비교용: 이벤트마다 구독 채널을 하나씩 기다리며 전송 (실패는 건너뜀)"""
+    bot = build_bot(args, 1)
+    try:
+        started = time.perf_counter()
+        for number in range(args.events):
+            for channel_id in bot.subscriptions.channel_ids(FEED):
+                try:
+                    await bot.get_channel(channel_id).send(f"벤치마크 알림 #{number}")
+                except Exception:
+                    pass
+            if args.interval_ms:
+                await asyncio.sleep(args.interval_ms / 1000)
+        elapsed = time.perf_counter() - started
+        return summarize(bot, args, started, elapsed, "sequential")
+    finally:
+        await bot.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=200, help="구독한 길드(채널) 수")
+    parser.add_argument("--events", type=int, default=5, help="보낼 이벤트 수")
+    parser.add_argument("--levels", default=DEFAULT_LEVELS, help="동시 전송 수 단계 (쉼표로 구분)")
+    parser.add_argument("--mode", choices=("publish", "deliver"), default="publish",
+                        help="publish: 트윗/YouTube 알림처럼 대기열에 넣고 넘어감, deliver: 일정/이미지처럼 결과까지 대기")
+    parser.add_argument("--send-latency-ms", type=float, default=80, help="채널 하나에 메시지를 보내는 왕복 지연")
+    parser.add_argument("--failing-ratio", type=float, default=0.05, help="권한 없음(403)으로 실패하는 채널 비율 (0~1)")
+    parser.add_argument("--interval-ms", type=float, default=0, help="이벤트 사이 간격")
+    parser.add_argument("--strike-window-ms", type=float, default=STRIKE_WINDOW * 1000,
+                        help="같은 채널의 실패를 한 번만 세는 시간 (0이면 실패마다 셈)")
+    parser.add_argument("--skip-sequential", action="store_true", help="단순 반복 비교 생략")
+    parser.add_argument("--verbose", action="store_true", help="구독/전송 로그 출력")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.CRITICAL)
+
+    levels = sorted(int(level) for level in args.levels.split(",") if level.strip())
+    results = []
+    if not args.skip_sequential:
+        results.append(await run_sequential(args))
+    for level in levels:
+        results.append(await run_registry(args, level))
+
+    config = {key: value for key, value in vars(args).items() if key not in ("verbose",)}
+    print(json.dumps({
+        "benchmark": "fanout",
+        "config": config,
+        "results": results,
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
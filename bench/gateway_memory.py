@@ -0,0 +1,203 @@
+# bench/gateway_memory.py
+"""게이트웨이 프로필별 메모리 벤치마크
+
+프로필마다 새 파이썬 프로세스에서 index.py 의 실제 봇 객체를 만들고(로그인은 하지 않음),
+큰 길드 여러 개의 GUILD_CREATE 와 MESSAGE_CREATE 이벤트를 가짜로 만들어 봇의 ConnectionState 에 그대로 흘려 보낸다.
+디스코드가 실제로 보내는 것처럼 요청한 intents 에 없는 이벤트는 보내지 않고, 시작 시 멤버 전체를 요청(chunking)하는
+프로필에는 길드 멤버 전체를 채워 준다. 이벤트를 받기 전/후 RSS 와 캐시 크기를 비교한다.
+
+    python -m bench.gateway_memory --guilds 20 --members 5000 --messages 50000
+    python -m bench.gateway_memory --profiles lean --max-messages 100
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES = ("default", "lean")
+SELF_ID = 1
+GUILD_ID_BASE = 10 ** 17
+TIMESTAMP = "2026-01-01T00:00:00+00:00"
+
+
+def rss_mb() -> float:
+    """현재 RSS(MB) - /proc 가 없으면 최대 RSS"""
+    gc.collect()
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 2)
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+
+
+def user_payload(user_id: int) -> dict:
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "global_name": None,
+            "avatar": None}
+
+
+def member_payload(user_id: int) -> dict:
+    return {"user": user_payload(user_id), "roles": [], "joined_at": TIMESTAMP, "deaf": False, "mute": False,
+            "flags": 0}
+
+
+def guild_payload(guild_id: int, args) -> dict:
+    # 큰 길드의 GUILD_CREATE 는 presences intent 없이는 봇 자신(과 음성 채널 사용자)만 멤버로 들어 옴
+    return {
+        "id": str(guild_id), "name": f"guild{guild_id}", "owner_id": str(SELF_ID), "member_count": args.members,
+        "large": True, "features": [], "emojis": [], "stickers": [], "threads": [], "stage_instances": [],
+        "guild_scheduled_events": [], "voice_states": [], "presences": [], "verification_level": 0,
+        "default_message_notifications": 0, "explicit_content_filter": 0, "mfa_level": 0, "premium_tier": 0,
+        "roles": [{"id": str(guild_id), "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+                   "hoist": False, "managed": False, "mentionable": False}],
+        "channels": [{"id": str(guild_id + 1 + index), "type": 0, "name": f"channel{index}", "position": index,
+                      "permission_overwrites": []} for index in range(args.channels)],
+        "members": [member_payload(SELF_ID)],
+    }
+
+
+def message_payload(message_id: int, guild_id: int, channel_id: int, author_id: int, content: str) -> dict:
+    return {
+        "id": str(message_id), "channel_id": str(channel_id), "guild_id": str(guild_id),
+        "author": user_payload(author_id), "member": {"roles": [], "joined_at": TIMESTAMP, "deaf": False, "mute": False},
+        "content": content, "timestamp": TIMESTAMP, "edited_timestamp": None, "tts": False, "mention_everyone": False,
+        "mentions": [], "mention_roles": [], "attachments": [], "embeds": [], "pinned": False, "type": 0,
+    }
+
+
+async def run_child(args):
+    """자식 프로세스: index 의 봇에 가짜 게이트웨이 이벤트를 흘려 보내고 결과 출력"""
+    import discord
+    import index
+
+    bot = index.create_bot()
+    await bot._async_setup_hook()   # 로그인 없이 이벤트 루프만 연결 (이벤트 dispatch 에 필요)
+    state = bot._connection
+    state.user = discord.ClientUser(state=state, data=user_payload(SELF_ID) | {"bot": True})
+    intents = bot.intents
+    chunking = state._chunk_guilds and intents.members
+    # 실제 chunking 은 게이트웨이 요청이 필요하므로 결과(멤버 전체 캐시)만 직접 채움
+    state._chunk_guilds = False
+    before = rss_mb()
+
+    started = time.perf_counter()
+    user_id = 1000
+    for position in range(args.guilds):
+        guild_id = GUILD_ID_BASE + position * 10_000
+        state.parse_guild_create(guild_payload(guild_id, args))
+        if chunking:
+            guild = bot.get_guild(guild_id)
+            for _ in range(args.members - 1):
+                user_id += 1
+                guild._add_member(discord.Member(data=member_payload(user_id), guild=guild, state=state))
+        await asyncio.sleep(0)
+    after_guilds = rss_mb()
+
+    # 메시지 이벤트는 guild_messages intent 가 있을 때만, 본문은 message_content intent 가 있을 때만 옴
+    delivered_messages = 0
+    if intents.guild_messages:
+        content = "안녕하세요 " * (args.message_length // 6) if intents.message_content else ""
+        for number in range(args.messages):
+            guild_id = GUILD_ID_BASE + (number % args.guilds) * 10_000
+            channel_id = guild_id + 1 + (number // args.guilds) % args.channels
+            author_id = 1001 + number % max(args.members - 1, 1)
+            state.parse_message_create(message_payload(10 ** 15 + number, guild_id, channel_id, author_id, content))
+            delivered_messages += 1
+            if number % 500 == 0:
+                await asyncio.sleep(0)
+        for _ in range(10):
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+    after_messages = rss_mb()
+
+    result = {
+        "profile": os.environ["GATEWAY_PROFILE"],
+        "intents": sorted(name for name, value in intents if value),
+        "chunk_guilds_at_startup": bool(chunking),
+        "max_messages": state.max_messages,
+        "rss_mb": {"before_events": before, "after_guilds": after_guilds, "after_messages": after_messages,
+                   "growth": round(after_messages - before, 2)},
+        "cached_guilds": len(bot.guilds),
+        "cached_members": sum(len(guild.members) for guild in bot.guilds),
+        "cached_users": len(state._users),
+        "cached_messages": len(bot.cached_messages),
+        "message_events_received": delivered_messages,
+        "replay_seconds": round(elapsed, 3),
+    }
+    await bot.close()
+    await bot.scheduler.close()
+    await bot.http_client.close()
+    await bot.state_store.close()
+    print(json.dumps(result))
+
+
+def run_profile(profile: str, args, workdir: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": REPO_ROOT,
+        "STATE_DB_PATH": os.path.join(workdir, "bot_state.db"),
+        "DISCORD_TOKEN": "bench-token",
+        "DISCORD_CHANNEL_ID": "1",
+        "TWITTER_USERNAME": "bench",
+        "BEARER_TOKEN": "bench-bearer",
+        "METRICS_PORT": "0",
+        "LOG_FILE": "",
+        "GATEWAY_PROFILE": profile,
+        "GATEWAY_MAX_MESSAGES": str(args.max_messages),
+    })
+    command = [sys.executable, "-m", "bench.gateway_memory", "--child",
+               "--guilds", str(args.guilds), "--members", str(args.members), "--channels", str(args.channels),
+               "--messages", str(args.messages), "--message-length", str(args.message_length)]
+    completed = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", default=",".join(PROFILES), help="비교할 프로필 (쉼표로 구분)")
+    parser.add_argument("--guilds", type=int, default=20, help="길드 수")
+    parser.add_argument("--members", type=int, default=5000, help="길드당 멤버 수")
+    parser.add_argument("--channels", type=int, default=50, help="길드당 텍스트 채널 수")
+    parser.add_argument("--messages", type=int, default=50000, help="전체 MESSAGE_CREATE 이벤트 수")
+    parser.add_argument("--message-length", type=int, default=120, help="메시지 본문 길이")
+    parser.add_argument("--max-messages", type=int, default=0, help="lean 프로필의 메시지 캐시 크기 (0 이면 끔)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(run_child(args))
+        return
+
+    results = {}
+    for profile in (name.strip() for name in args.profiles.split(",") if name.strip()):
+        with tempfile.TemporaryDirectory() as workdir:
+            results[profile] = run_profile(profile, args, workdir)
+
+    comparison = {}
+    if "default" in results and "lean" in results:
+        default, lean = results["default"]["rss_mb"], results["lean"]["rss_mb"]
+        comparison = {
+            "rss_saved_mb": round(default["after_messages"] - lean["after_messages"], 2),
+            "growth_ratio": round(lean["growth"] / default["growth"], 3) if default["growth"] > 0 else None,
+        }
+    config = {key: value for key, value in vars(args).items() if key != "child"}
+    print(json.dumps({
+        "benchmark": "gateway_memory",
+        "config": config,
+        "results": results,
+        "comparison": comparison,
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
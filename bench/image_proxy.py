@@ -0,0 +1,141 @@
+# bench/image_proxy.py
+"""이미지 프록시(디스크 LRU 캐시 + 깨진 링크 거르기) 벤치마크
+
+가짜 이미지 사이트에서 일부 이미지를 깨진 링크(404, 이미지가 아닌 본문)로 만들고,
+인기 있는 이미지가 자주 다시 나오는 분포(Zipf)로 요청을 보내 세 가지 방식을 비교한다.
+
+- direct: 기존 방식 - 링크를 그대로 채널에 올림 (디스코드가 매번 원본 서버에서 가져감, 깨진 링크도 그대로 나감)
+- no_cache: 매번 내려받아 검증만 함
+- proxy: ImageProxy (디스크 LRU 캐시, 동시 요청 병합, 깨진 링크 기억)
+
+측정: 업스트림 이미지 요청 수/바이트, 요청당 지연, 캐시 적중률, 채널에 나간 깨진 링크 수
+
+    python -m bench.image_proxy --requests 2000 --catalog 500 --cache-mb 20
+    python -m bench.image_proxy --dead-ratio 0.1 --zipf 1.2 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import shutil
+import tempfile
+import time
+from typing import List
+
+import bench  # noqa: F401  (더미 환경변수 설정)
+from bench.interactions import percentiles
+from bench.upstreams import FakeImageSiteAPI
+from http_client import HttpClient
+from image_proxy import ImageProxy, ImageRejected, sniff_type
+
+SERVICE = "bench_images"
+MODES = ("direct", "no_cache", "proxy")
+
+
+def zipf_sequence(args) -> List[int]:
+    """인기 순위 k 의 이미지가 1/k^s 비율로 나오는 요청 순서"""
+    rng = random.Random(args.seed)
+    numbers = list(range(args.catalog))
+    rng.shuffle(numbers)
+    weights = [1 / (rank ** args.zipf) for rank in range(1, args.catalog + 1)]
+    return rng.choices(numbers, weights=weights, k=args.requests)
+
+
+async def run_mode(mode: str, args, sequence: List[int]) -> dict:
+    api = FakeImageSiteAPI(latency=args.latency_ms / 1000, images=args.catalog,
+                           image_bytes=args.image_kb * 1024, dead_ratio=args.dead_ratio)
+    base_url = await api.start()
+    http = HttpClient()
+    http.register_service(SERVICE, timeout=10)
+    workdir = tempfile.mkdtemp(prefix="bench-image-cache-")
+    proxy = ImageProxy(http, SERVICE, workdir, args.cache_mb * 1024 * 1024)
+    await proxy.start()
+
+    latencies: List[float] = []
+    posted = dead_posted = skipped = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(number: int):
+        nonlocal posted, dead_posted, skipped
+        url = f"{base_url}/images/{number:06d}.webp"
+        async with semaphore:
+            started = time.perf_counter()
+            if mode == "direct":
+                # 디스코드 임베드가 원본을 가져가는 것과 같은 요청 (결과는 확인하지 않고 링크를 올림)
+                async with http.get(SERVICE, url) as response:
+                    await response.read()
+                posted += 1
+                dead_posted += api.is_dead(number)
+            else:
+                try:
+                    if mode == "proxy":
+                        await proxy.fetch(url)
+                    else:
+                        async with http.get(SERVICE, url) as response:
+                            body = await response.read()
+                            if response.status != 200 or sniff_type(body[:16]) is None:
+                                raise ImageRejected(url, f"HTTP {response.status}")
+                    posted += 1
+                    dead_posted += api.is_dead(number)
+                except ImageRejected:
+                    skipped += 1
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(number) for number in sequence))
+        elapsed = time.perf_counter() - started
+        result = {
+            "mode": mode,
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "latency_ms": percentiles(latencies),
+            "upstream_image_requests": api.image_requests,
+            "upstream_mb": round(api.image_bytes_sent / 1024 / 1024, 2),
+            "posted": posted,
+            "dead_links_posted": dead_posted,
+            "broken_links_skipped": skipped,
+        }
+        if mode == "proxy":
+            result["hit_ratio"] = round(proxy.stats["hits"] / max(len(sequence), 1), 3)
+            result["proxy"] = proxy.describe()
+        return result
+    finally:
+        await proxy.close()
+        await http.close()
+        await api.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default=",".join(MODES), help="비교할 방식 (쉼표로 구분)")
+    parser.add_argument("--requests", type=int, default=2000, help="이미지 요청 수")
+    parser.add_argument("--catalog", type=int, default=500, help="전체 이미지 수")
+    parser.add_argument("--zipf", type=float, default=1.1, help="인기 편중 정도 (클수록 일부 이미지에 몰림)")
+    parser.add_argument("--image-kb", type=int, default=200, help="이미지 크기(KB)")
+    parser.add_argument("--cache-mb", type=int, default=20, help="디스크 캐시 크기(MB)")
+    parser.add_argument("--dead-ratio", type=float, default=0.05, help="깨진 링크 비율 (0~1)")
+    parser.add_argument("--latency-ms", type=float, default=30, help="이미지 서버 응답 지연")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="프록시 로그 출력")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.CRITICAL)
+
+    sequence = zipf_sequence(args)
+    results = []
+    for mode in (name.strip() for name in args.modes.split(",") if name.strip()):
+        results.append(await run_mode(mode, args, sequence))
+
+    config = {key: value for key, value in vars(args).items() if key != "verbose"}
+    print(json.dumps({
+        "benchmark": "image_proxy",
+        "config": config,
+        "distinct_images_requested": len(set(sequence)),
+        "results": results,
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+# bench/imgcrawl_lag.py
+"""/imgcrawl 이벤트 루프 지연 회귀 테스트
+
+일부러 느리게 응답하는 로컬 가짜 이미지 사이트에 /imgcrawl 을 여러 번 보내는 동안,
+일정 간격으로 깨어나는 탐침 태스크가 예정보다 얼마나 늦게 깨어났는지(이벤트 루프 지연)를 잰다.
+이미지 요청이 루프를 막으면 (예: 동기 requests 호출) 탐침이 외부 API 지연만큼 늦어진다.
+최대 지연이 --max-lag-ms 를 넘으면 종료 코드 1로 끝나므로 CI 나 배포 전 점검에 그대로 쓸 수 있다.
+
+    python -m bench.imgcrawl_lag
+    python -m bench.imgcrawl_lag --latency-ms 3000 --invocations 20 --max-lag-ms 100
+    python -m bench.imgcrawl_lag --self-check   # 탐침이 루프 차단을 실제로 잡아내는지 확인
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import List
+
+import bench  # noqa: F401  (더미 환경변수 설정)
+from bench.interactions import Harness, percentiles
+
+DEFAULT_MAX_LAG_MS = 100
+
+
+async def probe(interval: float, lags: List[float], stop: asyncio.Event):
+    """interval 마다 깨어나며 예정 시각보다 늦은 만큼을 기록"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(loop.time() - expected, 0.0))
+
+
+async def run(args) -> dict:
+    harness = Harness(argparse.Namespace(latency_ms=args.latency_ms, error_rate=0.0, schedules=1,
+                                         discord_latency_ms=args.discord_latency_ms, verbose=args.verbose))
+    await harness.start()
+    lags: List[float] = []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(args.interval_ms / 1000, lags, stop))
+    try:
+        await asyncio.sleep(args.interval_ms / 1000 * 2)  # 탐침이 먼저 돌기 시작하도록
+        started = time.perf_counter()
+        if args.self_check:
+            # 동기 호출로 루프를 막는 경우를 흉내 냄 - 탐침이 이 지연을 잡아내야 함
+            time.sleep(args.latency_ms / 1000)
+        interactions = await asyncio.gather(*(harness.invoke("imgcrawl", user_id=i + 1)
+                                              for i in range(args.invocations)))
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(args.interval_ms / 1000 * 2)
+    finally:
+        stop.set()
+        await prober
+        upstream = harness.upstream_requests()["nenekomashiro"]
+        await harness.close()
+
+    finished = [i for i in interactions if i.finished_at is not None]
+    max_lag_ms = round(max(lags, default=0.0) * 1000, 2)
+    return {
+        "invocations": args.invocations,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "final_ms": percentiles([i.finished_at - i.created_at for i in finished]),
+        "failed": sum(1 for i in interactions if i.command_failed),
+        "upstream_calls": upstream,
+        "probe_samples": len(lags),
+        "loop_lag_ms": percentiles(lags),
+        "max_lag_ms": max_lag_ms,
+        "passed": max_lag_ms <= args.max_lag_ms,
+    }
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=2000, help="가짜 이미지 사이트 응답 지연 (느린 서버)")
+    parser.add_argument("--invocations", type=int, default=10, help="동시에 보낼 /imgcrawl 수")
+    parser.add_argument("--discord-latency-ms", type=float, default=50, help="디스코드 API 왕복 지연")
+    parser.add_argument("--interval-ms", type=float, default=10, help="탐침 간격")
+    parser.add_argument("--max-lag-ms", type=float, default=DEFAULT_MAX_LAG_MS, help="허용하는 최대 이벤트 루프 지연")
+    parser.add_argument("--self-check", action="store_true", help="루프를 일부러 막아 탐침이 실패를 보고하는지 확인")
+    parser.add_argument("--verbose", action="store_true", help="Cog 로그 출력")
+    args = parser.parse_args()
+
+    result = await run(args)
+    config = {key: value for key, value in vars(args).items() if key != "verbose"}
+    print(json.dumps({"benchmark": "imgcrawl_lag", "config": config, "result": result},
+                     ensure_ascii=False, indent=2))
+    if not result["passed"]:
+        logging.getLogger(__name__).critical(
+            f"❌ /imgcrawl 실행 중 이벤트 루프가 {result['max_lag_ms']}ms 멈췄습니다 (허용 {args.max_lag_ms:g}ms)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,177 @@
+# bench/interactions.py
+"""슬래시 명령어 동시 호출 부하 테스트
+
+실제 commands.Bot 의 앱 커맨드 트리에 Schedule / Imgcrawl Cog 와 index.py 의 /ping 을 올리고,
+가짜 Interaction N개를 동시에 tree._call 로 흘려 보낸다 (게이트웨이의 INTERACTION_CREATE 처리와 같은 경로).
+외부 API 는 로컬 가짜 서버로 대체하고, 명령어별로 첫 응답(defer / send_message)까지 시간,
+마지막 메시지까지 시간, 외부 API 호출 수를 측정한다. 동시 호출 수를 늘려 가며
+첫 응답이 디스코드의 3초 제한을 넘기기 시작하는 지점을 찾는다.
+
+    python -m bench.interactions --levels 1,10,100,500 --latency-ms 80
+    python -m bench.interactions --commands schedule --cache warm --discord-latency-ms 120
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+from typing import Dict, List
+
+import bench  # noqa: F401  (더미 환경변수 설정)
+from bench.discord_stubs import INTERACTION_DEADLINE, FakeInteraction, FakeTreeBot
+from bench.upstreams import FakeImageSiteAPI, FakeStellightAPI
+import imgcrawl
+import schedule
+
+COMMANDS = ("schedule", "imgcrawl", "ping")
+DEFAULT_LEVELS = "1,10,50,100,500,1000,5000,20000"
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    if not values:
+        return {}
+
+    def pick(q: float) -> float:
+        return round(values[min(int(len(values) * q), len(values) - 1)] * 1000, 2)
+
+    return {"p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99), "max": round(values[-1] * 1000, 2),
+            "mean": round(statistics.mean(values) * 1000, 2)}
+
+
+class Harness:
+    """가짜 외부 API + 앱 커맨드 트리가 준비된 봇 하나"""
+
+    def __init__(self, args):
+        self.args = args
+        options = {"latency": args.latency_ms / 1000, "error_rate": args.error_rate}
+        self.upstreams = {
+            "stellight": FakeStellightAPI(schedules_per_day=args.schedules, **options),
+            "nenekomashiro": FakeImageSiteAPI(**options),
+        }
+        self.bot = FakeTreeBot()
+
+    async def start(self):
+        stellight = await self.upstreams["stellight"].start()
+        schedule.STELLARS_API_URL = f"{stellight}/api/v1/stellars"
+        schedule.SCHEDULES_API_URL = f"{stellight}/api/v1/schedules?startDateTimeAfter={{}}&startDateTimeBefore={{}}"
+        images = await self.upstreams["nenekomashiro"].start()
+        imgcrawl.COUNT_API_URL = f"{images}/image/list/count?code=999&search="
+        imgcrawl.POST_API_URL = f"{images}/image/post?page={{}}&perPage=30&sort=0&code=999&search="
+        imgcrawl.IMAGE_BASE_URL = f"{images}/"
+
+        # index.py 를 import 해도 봇 객체는 만들어지지 않음 - /ping 명령어만 가져옴
+        import index
+        schedule_cog = schedule.Schedule(self.bot)
+        schedule_cog.live_board = False
+        await self.bot.add_cog(schedule_cog)
+        await self.bot.add_cog(imgcrawl.Imgcrawl(self.bot))
+        self.bot.tree.add_command(index.ping)
+        logging.getLogger().setLevel(logging.INFO if self.args.verbose else logging.CRITICAL)
+
+    def upstream_requests(self) -> Dict[str, int]:
+        return {name: api.requests for name, api in self.upstreams.items()}
+
+    async def invoke(self, command: str, user_id: int) -> FakeInteraction:
+        interaction = FakeInteraction(self.bot, command, user_id=user_id,
+                                      latency=self.args.discord_latency_ms / 1000)
+        try:
+            await self.bot.tree._call(interaction)
+        except Exception:
+            interaction.command_failed = True
+        return interaction
+
+    async def close(self):
+        for name in list(self.bot.cogs):
+            await self.bot.remove_cog(name)
+        await FakeTreeBot.close(self.bot)
+        for api in self.upstreams.values():
+            await api.stop()
+
+
+async def run_storm(command: str, concurrency: int, args) -> dict:
+    harness = Harness(args)
+    await harness.start()
+    try:
+        if args.cache == "warm":
+            await harness.invoke(command, user_id=0)
+            imgcrawl_cog = harness.bot.get_cog("Imgcrawl")
+            if imgcrawl_cog.pool._refill_task:
+                await asyncio.gather(imgcrawl_cog.pool._refill_task, return_exceptions=True)
+        before = harness.upstream_requests()
+
+        interactions = await asyncio.gather(*(harness.invoke(command, user_id=i + 1) for i in range(concurrency)))
+
+        after = harness.upstream_requests()
+        acked = [i for i in interactions if i.acked_at is not None]
+        finished = [i for i in interactions if i.finished_at is not None]
+        ack_times = [i.acked_at - i.created_at for i in acked]
+        missed = sum(1 for i in interactions if i.expired or i.acked_at is None
+                     or i.acked_at - i.created_at > INTERACTION_DEADLINE)
+        upstream = {name: after[name] - before[name] for name in after}
+        return {
+            "command": command,
+            "concurrency": concurrency,
+            "ack_ms": percentiles(ack_times),
+            "final_ms": percentiles([i.finished_at - i.created_at for i in finished]),
+            "deferred": sum(1 for i in acked if i.ack_kind == "defer"),
+            "answered_directly": sum(1 for i in acked if i.ack_kind == "message"),
+            "missed_deadline": missed,
+            "final_over_deadline": sum(1 for i in finished if i.finished_at - i.created_at > INTERACTION_DEADLINE),
+            "failed": sum(1 for i in interactions if i.command_failed),
+            "upstream_calls": upstream,
+            "upstream_calls_total": sum(upstream.values()),
+        }
+    finally:
+        await harness.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", default=",".join(COMMANDS), help="실행할 명령어 (쉼표로 구분)")
+    parser.add_argument("--levels", default=DEFAULT_LEVELS, help="동시 호출 수 단계 (쉼표로 구분)")
+    parser.add_argument("--latency-ms", type=float, default=50, help="가짜 외부 API 응답 지연")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="가짜 외부 API 500 응답 비율 (0~1)")
+    parser.add_argument("--discord-latency-ms", type=float, default=50, help="디스코드 API 왕복 지연")
+    parser.add_argument("--schedules", type=int, default=20, help="하루 일정 수")
+    parser.add_argument("--cache", choices=("cold", "warm"), default="cold",
+                        help="cold: 재시작 직후처럼 빈 캐시, warm: 한 번 호출해 캐시/이미지 풀을 채운 뒤 측정")
+    parser.add_argument("--keep-going", action="store_true", help="3초 제한을 넘겨도 다음 단계까지 계속")
+    parser.add_argument("--verbose", action="store_true", help="Cog 로그 출력")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.commands.split(",") if name.strip()]
+    unknown = [name for name in names if name not in COMMANDS]
+    if unknown:
+        parser.error(f"알 수 없는 명령어: {', '.join(unknown)} (가능: {', '.join(COMMANDS)})")
+    levels = sorted(int(level) for level in args.levels.split(",") if level.strip())
+
+    results = []
+    breaking_points = {}
+    slow_followups = {}
+    for name in names:
+        breaking_points[name] = None
+        slow_followups[name] = None
+        for level in levels:
+            result = await run_storm(name, level, args)
+            results.append(result)
+            if result["final_over_deadline"] and slow_followups[name] is None:
+                slow_followups[name] = level
+            if result["missed_deadline"] and breaking_points[name] is None:
+                breaking_points[name] = level
+                if not args.keep_going:
+                    break
+
+    config = {key: value for key, value in vars(args).items() if key not in ("verbose",)}
+    print(json.dumps({
+        "benchmark": "interactions",
+        "config": config,
+        "deadline_seconds": INTERACTION_DEADLINE,
+        "first_concurrency_missing_deadline": breaking_points,
+        "first_concurrency_final_over_deadline": slow_followups,
+        "results": results,
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
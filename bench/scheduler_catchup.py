@@ -0,0 +1,122 @@
+# bench/scheduler_catchup.py
+"""예약 작업 보충 실행(catch-up) 회귀 테스트
+
+가짜 시계(FakeClock)와 임시 디렉터리의 실제 상태 저장소로 JobScheduler 의 재시작/지연 상황을 재현해
+다음을 확인한다. 실제 시간은 기다리지 않으므로 1초 안에 끝난다. 하나라도 실패하면 종료 코드 1.
+
+- 10:00 작업이 있을 때 10:02 에 재시작하면 한 번만 보충 실행
+- 이미 실행한 뒤 재시작하면 같은 회차를 다시 실행하지 않음
+- CATCH_UP_SKIP 은 놓친 회차를 실행하지 않고 기록만 함 (이후 재시작에서도 실행하지 않음)
+- 절전 등으로 misfire_grace 보다 늦게 깨어나면 그 회차는 건너뛰고, 유예 시간 안이면 실행
+
+    python -m bench.scheduler_catchup
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import bench  # noqa: F401  (더미 환경변수 설정)
+from scheduler import CATCH_UP_ONCE, CATCH_UP_SKIP, STATE_NAMESPACE, FakeClock, JobScheduler
+from state_store import StateStore
+
+CRON = "0 10 * * *"
+TZ = "Asia/Seoul"
+MISFIRE_GRACE = 900
+
+
+def kst(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(2026, 1, day, hour, minute, tzinfo=ZoneInfo(TZ))
+
+
+class Process:
+    """봇 프로세스 하나 (상태 저장소를 열고 작업을 등록) - 닫고 다시 만들면 재시작"""
+
+    def __init__(self, db_path: str, now: datetime, catch_up: str = CATCH_UP_ONCE):
+        self.clock = FakeClock(now)
+        self.catch_up = catch_up
+        self.runs = []
+        self.store = StateStore(db_path)
+        self.scheduler = JobScheduler(clock=self.clock, state=self.store)
+
+    async def start(self):
+        await self.store.open()
+
+        async def daily_post():
+            self.runs.append(self.clock.now())
+
+        self.scheduler.add_job("daily", CRON, daily_post, tz=TZ, catch_up=self.catch_up,
+                               misfire_grace=MISFIRE_GRACE)
+        await self.clock.advance()
+        return self
+
+    def recorded(self):
+        value = self.store.get(STATE_NAMESPACE, "daily")
+        return datetime.fromisoformat(value) if value else None
+
+    async def stop(self):
+        await self.scheduler.close()
+        await self.store.close()
+
+
+async def run(workdir: str) -> dict:
+    checks = {}
+    ten = kst(1, 10)
+
+    # 10:00 작업, 10:02 에 (처음) 시작 → 한 번 보충, 시간이 더 흘러도 다시 실행하지 않음
+    db = os.path.join(workdir, "once.db")
+    process = await Process(db, kst(1, 10, 2)).start()
+    await process.clock.advance(to=kst(1, 10, 30))
+    checks["restart_at_1002_runs_once"] = len(process.runs) == 1 and process.recorded() == ten
+    await process.stop()
+
+    # 같은 상태 저장소로 10:05 에 재시작 → 이미 실행한 회차
+    process = await Process(db, kst(1, 10, 5)).start()
+    await process.clock.advance(to=kst(1, 10, 30))
+    checks["restart_after_run_not_repeated"] = process.runs == []
+    await process.stop()
+
+    # CATCH_UP_SKIP: 실행 없이 기록만, 이후 CATCH_UP_ONCE 로 재시작해도 보충하지 않음
+    db = os.path.join(workdir, "skip.db")
+    process = await Process(db, kst(1, 10, 2), catch_up=CATCH_UP_SKIP).start()
+    checks["skip_records_without_running"] = process.runs == [] and process.recorded() == ten
+    await process.stop()
+    process = await Process(db, kst(1, 10, 4)).start()
+    checks["skipped_run_not_caught_up_later"] = process.runs == []
+    await process.stop()
+
+    # 09:00 부터 잠들어 있다가 10:30 에 깨어남 (유예 15분 초과) → 건너뛰고 다음 날은 정상 실행
+    db = os.path.join(workdir, "late.db")
+    process = await Process(db, kst(1, 9)).start()
+    await process.clock.jump(kst(1, 10, 30))
+    checks["late_wake_skipped"] = process.runs == [] and process.recorded() == ten
+    await process.clock.advance(to=kst(2, 10, 1))
+    checks["next_day_runs_after_skip"] = process.runs == [kst(2, 10)]
+
+    # 유예 시간 안에 깨어남 (10:05) → 실행
+    await process.clock.jump(kst(3, 10, 5))
+    checks["wake_within_grace_runs"] = len(process.runs) == 2 and process.recorded() == kst(3, 10)
+    await process.stop()
+
+    return {"checks": checks, "passed": all(checks.values())}
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="스케줄러 로그 출력")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        result = await run(workdir)
+    print(json.dumps({"benchmark": "scheduler_catchup", "result": result}, ensure_ascii=False, indent=2))
+    return 0 if result["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
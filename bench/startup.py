@@ -0,0 +1,87 @@
+# bench/startup.py
+"""봇 시작 시간 벤치마크
+
+새 파이썬 프로세스에서 index.py 를 import 하고 setup_hook(상태 저장소 열기 + 확장 모듈 로드)까지 실행해
+단계별 소요 시간을 잰다. Discord 로그인/게이트웨이 단계는 네트워크가 필요하므로 제외한다.
+여러 번 반복한 중앙값을 JSON으로 출력하므로 배포 전 회귀 확인용으로 쓸 수 있다.
+
+    python -m bench.startup --runs 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def run_child():
+    """자식 프로세스: index import + 봇 생성 → setup_hook → 결과 출력"""
+    import index
+
+    bot = index.create_bot()
+    index.startup.mark("imports")
+    await bot.setup_hook()
+    result = index.startup.as_dict()
+    result["phases_ms"].pop("login", None)  # 로그인하지 않으므로 의미 없음
+    result["loaded_extensions"] = sorted(bot.extensions)
+
+    await bot.close()
+    await bot.scheduler.close()
+    await bot.http_client.close()
+    await bot.state_store.close()
+    print(json.dumps(result))
+
+
+def run_once(workdir: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": REPO_ROOT,
+        "STATE_DB_PATH": os.path.join(workdir, "bot_state.db"),
+        "DISCORD_TOKEN": "bench-token",
+        "DISCORD_CHANNEL_ID": "1",
+        "TWITTER_USERNAME": "bench",
+        "BEARER_TOKEN": "bench-bearer",
+        "METRICS_PORT": "0",
+    })
+    completed = subprocess.run(
+        [sys.executable, "-m", "bench.startup", "--child"],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(run_child())
+        return
+
+    runs = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as workdir:
+            runs.append(run_once(workdir))
+
+    phases = sorted({phase for run in runs for phase in run["phases_ms"]})
+    extensions = sorted({ext for run in runs for ext in run["details_ms"].get("extensions", {})})
+    print(json.dumps({
+        "benchmark": "startup",
+        "runs": args.runs,
+        "median_phases_ms": {p: statistics.median(r["phases_ms"].get(p, 0) for r in runs) for p in phases},
+        "median_extensions_ms": {e: statistics.median(r["details_ms"]["extensions"].get(e, 0) for r in runs)
+                                 for e in extensions},
+        "median_total_ms": statistics.median(r["total_ms"] for r in runs),
+        "loaded_extensions": runs[-1]["loaded_extensions"],
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+# bench/suite.py
+"""오프라인 벤치마크 모음
+
+네 개의 외부 API(stellight, Twitter, YouTube, nenekomashiro)를 로컬 가짜 서버로 띄우고,
+실제 Cog 코드 경로를 가짜 Discord 계층 위에서 반복 실행해 작업별 처리량 / 지연 백분위 / 메모리 할당을 JSON으로 출력한다.
+
+- schedule: Schedule.get_stellars + get_schedules(fresh=True, ETag 조건부 요청) + format_schedule_message
+- schedule_cached: 위와 같지만 캐시 사용 (get_schedules 기본 동작)
+- twitter: Twitter._fetch_and_process_tweets (새 트윗 알림까지)
+- youtube: YouTube._check_latest_videos (playlistItems 모드, 새 동영상 알림까지)
+- imgcrawl: Imgcrawl.get_random_image (이미지 풀 + 백그라운드 보충)
+
+    python -m bench.suite --iterations 200 --concurrency 8 --latency-ms 20
+    python -m bench.suite --only twitter,youtube --error-rate 0.05 --rate-limit 50 --output results.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import bench  # noqa: F401  (더미 환경변수 설정)
+from bench.discord_stubs import FakeBot, FakeChannel
+from bench.upstreams import FakeImageSiteAPI, FakeStellightAPI, FakeTwitterAPI, FakeUpstream, FakeYouTubeAPI
+import imgcrawl
+import schedule
+import twitter
+import youtube
+from youtube_api import YouTubeAPI
+
+SCENARIOS = ("schedule", "schedule_cached", "twitter", "youtube", "imgcrawl")
+NOTIFY_CHANNEL_ID = 1
+
+
+@dataclass
+class Scenario:
+    """한 작업을 반복 실행하기 위한 준비물"""
+    op: Callable[[int], Awaitable[object]]
+    upstream: FakeUpstream
+    bot: FakeBot
+    channel: Optional[FakeChannel] = None
+    note: str = ""
+
+    async def close(self):
+        await self.bot.close()
+        await self.upstream.stop()
+
+
+def percentiles(durations: List[float]) -> Dict[str, float]:
+    values = sorted(durations)
+    if not values:
+        return {}
+
+    def pick(q: float) -> float:
+        return values[min(int(len(values) * q), len(values) - 1)] * 1000
+
+    return {
+        "p50": round(pick(0.50), 3),
+        "p90": round(pick(0.90), 3),
+        "p99": round(pick(0.99), 3),
+        "max": round(values[-1] * 1000, 3),
+        "mean": round(statistics.mean(values) * 1000, 3),
+    }
+
+
+# ---------------------------------------------------------------- 시나리오 준비
+
+async def setup_schedule(args, fresh: bool) -> Scenario:
+    api = FakeStellightAPI(stellars=args.stellars, schedules_per_day=args.schedules * args.payload_scale,
+                           title_length=40 * args.payload_scale, **args.upstream_options)
+    base_url = await api.start()
+    schedule.STELLARS_API_URL = f"{base_url}/api/v1/stellars"
+    schedule.SCHEDULES_API_URL = f"{base_url}/api/v1/schedules?startDateTimeAfter={{}}&startDateTimeBefore={{}}"
+
+    bot = FakeBot()
+    cog = schedule.Schedule(bot)
+    cog.live_board = False
+    await cog.cog_load()
+    today = datetime(2026, 1, 1)
+
+    async def op(i: int) -> str:
+        stellars = await cog.get_stellars()
+        schedules = await cog.get_schedules(today, fresh=fresh)
+        return cog.format_schedule_message(schedules, stellars)
+
+    note = "ETag 조건부 요청 (대부분 304)" if fresh else "AsyncTTLCache 적중"
+    return Scenario(op, api, bot, note=note)
+
+
+async def setup_twitter(args) -> Scenario:
+    api = FakeTwitterAPI(new_tweets_per_poll=args.new_items, tweet_length=40 * args.payload_scale,
+                         **args.upstream_options)
+    base_url = await api.start()
+    twitter.TWITTER_API_BASE = f"{base_url}/2"
+
+    bot = FakeBot()
+    cog = twitter.Twitter(bot)
+    cog.check_tweets.cancel()
+    cog.usernames = [f"stellar{i:03d}" for i in range(max(args.accounts, args.concurrency))]
+    await cog.cog_load()
+    await cog.init_twitter()
+    bot.subscriptions.subscribe(NOTIFY_CHANNEL_ID, "twitter", NOTIFY_CHANNEL_ID)
+    user_ids = [cog.user_ids[u.lower()] for u in cog.usernames if u.lower() in cog.user_ids]
+    if not user_ids:
+        raise RuntimeError("가짜 Twitter API 에서 사용자 ID를 가져오지 못했습니다")
+
+    # 첫 조회는 커서만 저장하므로 미리 한 바퀴 돌려 둠
+    for user_id in user_ids:
+        await cog._fetch_and_process_tweets(user_id)
+
+    async def op(i: int):
+        await cog._fetch_and_process_tweets(user_ids[i % len(user_ids)])
+
+    return Scenario(op, api, bot, bot.get_channel(NOTIFY_CHANNEL_ID), note=f"계정 {len(user_ids)}개를 돌아가며 조회")
+
+
+async def setup_youtube(args) -> Scenario:
+    api = FakeYouTubeAPI(videos=50, new_videos_per_poll=args.new_items,
+                         description_length=100 * args.payload_scale, **args.upstream_options)
+    base_url = await api.start()
+
+    bot = FakeBot()
+    cog = youtube.YouTube(bot)
+    cog.check_youtube.cancel()
+    cog.ingest_mode = "playlist"
+    cog.channel_id = "UCbenchmark"
+    cog.youtube = YouTubeAPI(bot.http_client, "bench-key", base_url=f"{base_url}/youtube/v3")
+    await cog.cog_load()
+    bot.subscriptions.subscribe(NOTIFY_CHANNEL_ID, "youtube", NOTIFY_CHANNEL_ID)
+    await cog._check_latest_videos()  # 첫 실행은 커서만 저장
+
+    async def op(i: int):
+        await cog._check_latest_videos()
+
+    return Scenario(op, api, bot, bot.get_channel(NOTIFY_CHANNEL_ID), note="_process_lock 때문에 실제로는 한 번에 하나씩 실행")
+
+
+async def setup_imgcrawl(args) -> Scenario:
+    api = FakeImageSiteAPI(images=args.images * args.payload_scale, **args.upstream_options)
+    base_url = await api.start()
+    imgcrawl.COUNT_API_URL = f"{base_url}/image/list/count?code=999&search="
+    imgcrawl.POST_API_URL = f"{base_url}/image/post?page={{}}&perPage=30&sort=0&code=999&search="
+    imgcrawl.IMAGE_BASE_URL = f"{base_url}/"
+
+    bot = FakeBot()
+    cog = imgcrawl.Imgcrawl(bot)
+    await cog.cog_load()
+
+    async def op(i: int) -> Optional[str]:
+        return await cog.get_random_image()
+
+    return Scenario(op, api, bot, note="풀 적중은 네트워크 없이 반환, 부족하면 백그라운드 보충")
+
+
+async def setup_scenario(name: str, args) -> Scenario:
+    if name == "schedule":
+        return await setup_schedule(args, fresh=True)
+    if name == "schedule_cached":
+        return await setup_schedule(args, fresh=False)
+    if name == "twitter":
+        return await setup_twitter(args)
+    if name == "youtube":
+        return await setup_youtube(args)
+    if name == "imgcrawl":
+        return await setup_imgcrawl(args)
+    raise ValueError(f"알 수 없는 시나리오: {name}")
+
+
+# ---------------------------------------------------------------- 측정
+
+async def run_timed(op, iterations: int, concurrency: int):
+    """concurrency 개의 작업자로 iterations 번 실행하고 (작업별 지연 목록, 실패 수, 전체 시간) 반환"""
+    durations: List[float] = []
+    failures = 0
+    counter = iter(range(iterations))
+
+    async def worker():
+        nonlocal failures
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                await op(i)
+            except Exception:
+                failures += 1
+            durations.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return durations, failures, time.perf_counter() - started
+
+
+async def measure_allocations(op, iterations: int) -> dict:
+    """tracemalloc 으로 작업당 순증 메모리와 최대 사용량 측정 (지연 측정과 분리해서 실행)"""
+    tracemalloc.start()
+    try:
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        before = tracemalloc.take_snapshot().filter_traces(ignore)
+        tracemalloc.reset_peak()
+        base_current, _ = tracemalloc.get_traced_memory()
+        for i in range(iterations):
+            await op(i)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+    finally:
+        tracemalloc.stop()
+
+    diff = after.compare_to(before, "filename")
+    net_bytes = sum(stat.size_diff for stat in diff)
+    net_blocks = sum(stat.count_diff for stat in diff)
+    top = sorted(diff, key=lambda stat: stat.size_diff, reverse=True)[:3]
+    return {
+        "iterations": iterations,
+        "net_bytes_per_op": round(net_bytes / iterations, 1),
+        "net_blocks_per_op": round(net_blocks / iterations, 2),
+        "peak_above_baseline_kib": round((peak - base_current) / 1024, 1),
+        "top_growth": [
+            {"file": stat.traceback[0].filename.rsplit("/", 1)[-1], "bytes": stat.size_diff} for stat in top
+            if stat.size_diff > 0
+        ],
+    }
+
+
+async def run_scenario(name: str, args) -> dict:
+    scenario = await setup_scenario(name, args)
+    try:
+        for i in range(args.warmup):
+            await scenario.op(i)
+        requests_before = scenario.upstream.requests
+
+        durations, failures, elapsed = await run_timed(scenario.op, args.iterations, args.concurrency)
+        upstream_requests = scenario.upstream.requests - requests_before
+        allocations = await measure_allocations(scenario.op, args.alloc_iterations)
+
+        await scenario.bot.dispatcher.drain()
+        result = {
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "failures": failures,
+            "elapsed_seconds": round(elapsed, 4),
+            "throughput_ops_per_sec": round(args.iterations / elapsed, 1) if elapsed else None,
+            "latency_ms": percentiles(durations),
+            "upstream_requests_per_op": round(upstream_requests / args.iterations, 3),
+            "allocations": allocations,
+            "upstream": scenario.upstream.describe(),
+            "http_connections_created": scenario.bot.http_client.connections_created,
+            "note": scenario.note,
+        }
+        if scenario.channel is not None:
+            result["discord_messages_sent"] = len(scenario.channel.sent)
+        return result
+    finally:
+        await scenario.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", default=",".join(SCENARIOS), help="실행할 시나리오 (쉼표로 구분)")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--alloc-iterations", type=int, default=50, help="tracemalloc 측정 반복 수")
+    parser.add_argument("--latency-ms", type=float, default=20, help="가짜 API 응답 지연")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="응답 지연 흔들림 (±)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 응답 비율 (0~1)")
+    parser.add_argument("--rate-limit", type=int, default=0, help="rate-window 초당 허용 요청 수 (0이면 제한 없음)")
+    parser.add_argument("--rate-window", type=float, default=1.0)
+    parser.add_argument("--payload-scale", type=int, default=1, help="응답 크기 배율 (일정 수, 본문 길이, 이미지 수)")
+    parser.add_argument("--stellars", type=int, default=12)
+    parser.add_argument("--schedules", type=int, default=20, help="하루 일정 수")
+    parser.add_argument("--accounts", type=int, default=20, help="트위터 계정 수")
+    parser.add_argument("--new-items", type=int, default=1, help="조회마다 새로 올라오는 트윗/동영상 수")
+    parser.add_argument("--images", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="결과 JSON 을 저장할 파일 (없으면 표준 출력)")
+    parser.add_argument("--verbose", action="store_true", help="Cog 로그 출력")
+    args = parser.parse_args()
+
+    # 오류 주입 시 Cog 가 남기는 로그가 결과를 가리지 않도록 기본은 조용히
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.CRITICAL)
+
+    args.upstream_options = {
+        "latency": args.latency_ms / 1000,
+        "jitter": args.jitter_ms / 1000,
+        "error_rate": args.error_rate,
+        "rate_limit": args.rate_limit,
+        "rate_window": args.rate_window,
+        "seed": args.seed,
+    }
+    names = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(unknown)} (가능: {', '.join(SCENARIOS)})")
+
+    results = {}
+    for name in names:
+        results[name] = await run_scenario(name, args)
+
+    config = {key: value for key, value in vars(args).items() if key not in ("only", "output", "verbose")}
+    report = json.dumps({"benchmark": "suite", "config": config, "results": results}, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+# bench/twitter_poll.py
+"""다중 계정 트위터 폴링 벤치마크
+
+로컬 가짜 Twitter API에 대해 N개 계정의 타임라인 한 바퀴를 확인하는 데 걸리는 시간을 잰다.
+동시 요청 수 1(순차)과 기본값을 비교해 JSON으로 출력한다.
+
+    python -m bench.twitter_poll --accounts 50 --latency-ms 80
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import bench  # noqa: F401  (더미 환경변수 설정)
+from bench.discord_stubs import FakeBot
+from bench.upstreams import FakeTwitterAPI
+import twitter
+
+
+async def run_case(accounts: int, latency: float, rounds: int, concurrency: int) -> dict:
+    api = FakeTwitterAPI(latency=latency)
+    base_url = await api.start()
+    twitter.TWITTER_API_BASE = f"{base_url}/2"
+    twitter.MAX_CONCURRENT_TIMELINES = concurrency
+
+    bot = FakeBot()
+    cog = twitter.Twitter(bot)
+    cog.check_tweets.cancel()
+    cog.usernames = [f"stellar{i:03d}" for i in range(accounts)]
+    try:
+        await cog.cog_load()
+        await cog.init_twitter()
+        bot.subscriptions.subscribe(1, "twitter", 1)
+        await cog.poll_timelines()  # 첫 바퀴는 커서만 저장
+
+        durations = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            await cog.poll_timelines()
+            durations.append(time.perf_counter() - started)
+        await bot.dispatcher.drain()
+
+        return {
+            "accounts": accounts,
+            "concurrency": concurrency,
+            "upstream_latency_ms": latency * 1000,
+            "rounds": rounds,
+            "poll_seconds_mean": round(statistics.mean(durations), 4),
+            "poll_seconds_max": round(max(durations), 4),
+            "upstream_requests": api.requests,
+            "notifications_queued": bot.dispatcher.stats["items_sent"],
+            "discord_messages_sent": len(bot.get_channel(1).sent),
+            "connections_created": bot.http_client.connections_created,
+        }
+    finally:
+        await bot.close()
+        await api.stop()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    default_concurrency = twitter.MAX_CONCURRENT_TIMELINES
+    results = []
+    for concurrency in (1, default_concurrency):
+        results.append(await run_case(args.accounts, args.latency_ms / 1000, args.rounds, concurrency))
+    print(json.dumps({"benchmark": "twitter_poll", "results": results}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,312 @@
+# bench/upstreams.py
+import hmac
+import time
+import asyncio
+import hashlib
+import random
+import aiohttp
+from typing import Dict, Optional
+from aiohttp import web
+
+
+class FakeUpstream:
+    """지연 시간 / 오류율 / Rate Limit 을 조절할 수 있는 로컬 가짜 API 서버의 기본 클래스
+
+    - latency: 응답마다 기다리는 시간(초), jitter 만큼 무작위로 흔들림
+    - error_rate: 0~1, 이 비율만큼 500 응답
+    - rate_limit: rate_window 초 동안 허용하는 요청 수 (0이면 제한 없음), 넘으면 429 + Retry-After
+    """
+
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0, rate_limit: int = 0,
+                 rate_window: float = 1.0, jitter: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._window_started = 0.0
+        self._window_requests = 0
+        self.app = web.Application(middlewares=[self._count_and_delay])
+        self._runner: web.AppRunner = None
+        self.base_url = ""
+
+    def _rate_limit_headers(self, now: float) -> Dict[str, str]:
+        reset = self._window_started + self.rate_window
+        return {
+            "x-rate-limit-limit": str(self.rate_limit),
+            "x-rate-limit-remaining": str(max(self.rate_limit - self._window_requests, 0)),
+            "x-rate-limit-reset": str(int(time.time() + max(reset - now, 0)) + 1),
+        }
+
+    @web.middleware
+    async def _count_and_delay(self, request, handler):
+        self.requests += 1
+        delay = self.latency
+        if self.jitter:
+            delay = max(delay + self._random.uniform(-self.jitter, self.jitter), 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        headers: Dict[str, str] = {}
+        if self.rate_limit:
+            now = time.monotonic()
+            if now - self._window_started >= self.rate_window:
+                self._window_started = now
+                self._window_requests = 0
+            self._window_requests += 1
+            headers = self._rate_limit_headers(now)
+            if self._window_requests > self.rate_limit:
+                self.rate_limited += 1
+                retry_after = max(self._window_started + self.rate_window - now, 0.0)
+                headers["Retry-After"] = f"{retry_after:.3f}"
+                return web.json_response({"error": "rate limited"}, status=429, headers=headers)
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"error": "injected failure"}, status=500)
+
+        response = await handler(request)
+        for name, value in headers.items():
+            response.headers.setdefault(name, value)
+        if response.body is not None:
+            self.bytes_sent += len(response.body)
+        return response
+
+    def describe(self) -> dict:
+        return {
+            "requests": self.requests,
+            "injected_errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "bytes_sent": self.bytes_sent,
+        }
+
+    async def start(self) -> str:
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://127.0.0.1:{port}"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+
+class FakeStellightAPI(FakeUpstream):
+    """stellight.fans 의 스텔라 목록 / 일정 엔드포인트 (ETag 조건부 요청 지원)"""
+
+    def __init__(self, latency: float = 0.05, stellars: int = 12, schedules_per_day: int = 20,
+                 title_length: int = 40, **options):
+        super().__init__(latency, **options)
+        self.stellars = stellars
+        self.schedules_per_day = schedules_per_day
+        self.title_length = title_length
+        self.app.router.add_get("/api/v1/stellars", self.list_stellars)
+        self.app.router.add_get("/api/v1/schedules", self.list_schedules)
+
+    async def list_stellars(self, request):
+        return web.json_response([{"id": i, "nameKor": f"스텔라{i:02d}"} for i in range(1, self.stellars + 1)])
+
+    async def list_schedules(self, request):
+        day = request.query.get("startDateTimeAfter", "2026-01-01T00:00:00")[:10]
+        etag = f'"{day}-{self.stellars}-{self.schedules_per_day}-{self.title_length}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+
+        padding = "가" * max(self.title_length - 10, 0)
+        content = []
+        for i in range(self.schedules_per_day):
+            title = "휴방" if i % 9 == 8 else f"방송 {i} {padding}"
+            content.append({
+                "stellarId": i % self.stellars + 1,
+                "title": title,
+                "startDateTime": f"{day}T{(i * 7) % 24:02d}:{(i * 13) % 60:02d}:00Z",
+            })
+        return web.json_response({"content": content}, headers={"ETag": etag})
+
+
+class FakeImageSiteAPI(FakeUpstream):
+    """nenekomashiro.com 의 이미지 수 / 이미지 목록 / 이미지 파일 엔드포인트
+
+    dead_ratio 만큼의 이미지는 깨진 링크 (절반은 404, 절반은 image/webp 로 내려오는 HTML 오류 페이지)
+    """
+
+    def __init__(self, latency: float = 0.05, images: int = 3000, per_page: int = 30, image_bytes: int = 200 * 1024,
+                 dead_ratio: float = 0.0, **options):
+        super().__init__(latency, **options)
+        self.images = images
+        self.per_page = per_page
+        self.image_bytes = image_bytes
+        self.dead_ratio = dead_ratio
+        self.image_requests = 0
+        self.image_bytes_sent = 0
+        self.app.router.add_get("/image/list/count", self.count)
+        self.app.router.add_get("/image/post", self.post)
+        self.app.router.add_get("/images/{name}", self.image)
+
+    def is_dead(self, number: int) -> bool:
+        """이미지 번호로 정해지는 깨진 링크 여부 (매번 같은 결과)"""
+        return (number * 7919) % 1000 < self.dead_ratio * 1000
+
+    async def image(self, request):
+        self.image_requests += 1
+        number = int(request.match_info["name"].split(".")[0])
+        if self.is_dead(number):
+            if number % 2:
+                return web.Response(status=404, text="not found")
+            return web.Response(body=b"<html>error</html>", content_type="image/webp")
+        # RIFF....WEBP 헤더 + 채움 바이트
+        body = b"RIFF" + (self.image_bytes - 8).to_bytes(4, "little") + b"WEBP" + bytes(max(self.image_bytes - 12, 0))
+        self.image_bytes_sent += len(body)
+        return web.Response(body=body, content_type="image/webp")
+
+    async def count(self, request):
+        return web.Response(text=f"{self.images}\n")
+
+    async def post(self, request):
+        page = int(request.query.get("page", 1))
+        start = (page - 1) * self.per_page
+        end = min(start + self.per_page, self.images)
+        posts = [{"id": i, "src": f"images/{i:06d}.webp"} for i in range(start, end)]
+        return web.json_response({"post": posts, "page": page})
+
+
+class FakeTwitterAPI(FakeUpstream):
+    """Twitter API v2 의 사용자 조회 / 타임라인 엔드포인트"""
+
+    def __init__(self, latency: float = 0.05, new_tweets_per_poll: int = 1, tweet_length: int = 40, **options):
+        super().__init__(latency, **options)
+        self.new_tweets_per_poll = new_tweets_per_poll
+        self.tweet_length = tweet_length
+        # 실제 트윗 ID처럼 현재 시각이 들어 있는 snowflake (봇이 ID로 트윗 나이를 판단함)
+        self._next_tweet_id = (int(time.time() * 1000) - 1288834974657) << 22
+        self.app.router.add_get("/2/users/by", self.users_by)
+        self.app.router.add_get("/2/users/{user_id}/tweets", self.user_tweets)
+
+    async def users_by(self, request):
+        usernames = request.query.get("usernames", "").split(",")
+        return web.json_response({
+            "data": [{"id": str(10_000 + i), "username": name, "name": name} for i, name in enumerate(usernames) if name]
+        })
+
+    async def user_tweets(self, request):
+        since_id = int(request.query.get("since_id", 0))
+        tweets = []
+        for _ in range(self.new_tweets_per_poll):
+            self._next_tweet_id += random.randint(1, 10) << 22
+            if self._next_tweet_id > since_id:
+                tweets.append({
+                    "id": str(self._next_tweet_id),
+                    "text": f"benchmark tweet {self._next_tweet_id} ".ljust(self.tweet_length, "x"),
+                    "created_at": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+                })
+        tweets.reverse()  # 실제 API처럼 최신순
+        body = {"meta": {"result_count": len(tweets)}}
+        if tweets:
+            body["data"] = tweets
+        headers = {} if self.rate_limit else {"x-rate-limit-remaining": "1000"}
+        return web.json_response(body, headers=headers)
+
+
+class FakeYouTubeAPI(FakeUpstream):
+    """YouTube Data API v3 의 playlistItems.list 엔드포인트"""
+
+    def __init__(self, latency: float = 0.05, videos: int = 50, quota_exceeded: bool = False,
+                 new_videos_per_poll: int = 0, description_length: int = 0, **options):
+        super().__init__(latency, **options)
+        self.videos = videos
+        self.quota_exceeded = quota_exceeded
+        self.new_videos_per_poll = new_videos_per_poll
+        self.description_length = description_length
+        self._latest = videos
+        self.app.router.add_get("/youtube/v3/playlistItems", self.playlist_items)
+
+    async def playlist_items(self, request):
+        if self.quota_exceeded:
+            return web.json_response({"error": {
+                "code": 403,
+                "message": "The request cannot be completed because you have exceeded your quota.",
+                "errors": [{"reason": "quotaExceeded", "domain": "youtube.quota"}],
+            }}, status=403)
+
+        # new_videos_per_poll 만큼 매 요청마다 새 동영상이 올라온 것처럼 보이게 함 (최신순)
+        self._latest += self.new_videos_per_poll
+        max_results = int(request.query.get("maxResults", 5))
+        items = []
+        for i in range(self._latest - 1, max(self._latest - min(max_results, self.videos), 0) - 1, -1):
+            video_id = f"vid{i:08d}"
+            published = f"2026-01-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}Z"
+            items.append({
+                "snippet": {
+                    "title": f"benchmark video {i}",
+                    "description": "d" * self.description_length,
+                    "publishedAt": published,
+                    "resourceId": {"videoId": video_id},
+                },
+                "contentDetails": {"videoId": video_id, "videoPublishedAt": published},
+            })
+        return web.json_response({"kind": "youtube#playlistItemListResponse", "items": items})
+
+
+class FakeWebSubHub(FakeUpstream):
+    """WebSub 허브 (구독 요청을 받으면 콜백으로 확인 GET 을 보내고, publish 로 서명된 알림을 푸시)"""
+
+    def __init__(self, latency: float = 0.0, lease_seconds: int = 3600, **options):
+        super().__init__(latency, **options)
+        self.lease_seconds = lease_seconds
+        self.subscriptions: Dict[str, dict] = {}
+        self.verified: Dict[str, bool] = {}
+        self._tasks = set()
+        self.app.router.add_post("/subscribe", self.subscribe)
+
+    async def subscribe(self, request):
+        form = await request.post()
+        callback = form["hub.callback"]
+        self.subscriptions[callback] = dict(form)
+        # 실제 허브처럼 응답(202) 후 비동기로 확인
+        task = asyncio.create_task(self._verify(callback))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.Response(status=202)
+
+    async def _verify(self, callback: str):
+        form = self.subscriptions[callback]
+        challenge = f"challenge-{random.randint(0, 1 << 30)}"
+        status, text = await self.send_verification(callback, {
+            "hub.mode": form["hub.mode"], "hub.topic": form["hub.topic"],
+            "hub.challenge": challenge, "hub.lease_seconds": str(self.lease_seconds),
+            "hub.verify_token": form.get("hub.verify_token", ""),
+        })
+        self.verified[callback] = status == 200 and text == challenge
+
+    async def send_verification(self, callback: str, params: Dict[str, str]):
+        """콜백에 확인 GET 을 보내고 (상태 코드, 본문) 반환"""
+        async with aiohttp.ClientSession() as session:
+            async with session.get(callback, params=params) as response:
+                return response.status, await response.text()
+
+    async def publish(self, callback: str, body: str, secret: Optional[str] = None) -> int:
+        """구독자에게 알림 푸시 (secret 을 주면 그 값으로, 아니면 구독 시 받은 값으로 서명)"""
+        secret = secret if secret is not None else self.subscriptions[callback]["hub.secret"]
+        data = body.encode()
+        signature = hmac.new(secret.encode(), data, hashlib.sha1).hexdigest()
+        async with aiohttp.ClientSession() as session:
+            async with session.post(callback, data=data, headers={
+                "Content-Type": "application/atom+xml", "X-Hub-Signature": f"sha1={signature}"}) as response:
+                return response.status
+
+
+def atom_feed(videos) -> str:
+    """YouTube 가 WebSub 으로 보내는 형식의 Atom 문서 ((video_id, title, published) 목록)"""
+    entries = "".join(
+        f"<entry><yt:videoId>{video_id}</yt:videoId><title>{title}</title>"
+        f"<published>{published}</published></entry>" for video_id, title, published in videos)
+    return ('<feed xmlns="http://www.w3.org/2005/Atom" xmlns:yt="http://www.youtube.com/xml/schemas/2015">'
+            f"{entries}</feed>")
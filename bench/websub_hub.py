@@ -0,0 +1,164 @@
+# bench/websub_hub.py
+"""가짜 WebSub 허브로 YouTube 푸시 수신 경로를 점검하는 회귀 테스트
+
+로컬 가짜 허브(FakeWebSubHub)에 실제 WebSubSubscriber 로 구독하고, YouTube Cog 의 _handle_push 로
+알림을 흘려 보내 다음을 확인한다. 하나라도 실패하면 종료 코드 1.
+
+- 허브의 구독 확인(challenge)에 응답해 리스가 활성화됨
+- 요청하지 않았거나 hub.verify_token 이 틀린 확인 요청(위조 GET)은 404 로 거절하고 리스를 건드리지 않음
+- 잘못된 hub.lease_seconds 는 500 이 아니라 400 으로 거절하고 기존 리스를 유지
+- 마지막 동영상보다 새 동영상은 알리고, 이전 동영상의 수정 알림과 같은 알림의 재전송은 무시
+- 서명이 맞지 않는 알림은 무시
+- 푸시가 PUSH_SILENCE_HOURS 동안 오지 않거나 폴링이 푸시가 놓친 동영상을 찾으면 평소 간격 폴링으로 돌아감
+
+    python -m bench.websub_hub
+"""
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import bench  # noqa: F401  (더미 환경변수 설정)
+from bench.discord_stubs import FakeBot
+from bench.upstreams import FakeWebSubHub, atom_feed
+from websub import WebSubSubscriber
+import youtube
+
+CHANNEL_ID = "UCbenchmark"
+NOTIFY_CHANNEL_ID = 1
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def iso(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+
+async def wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.02)
+    return True
+
+
+async def run() -> dict:
+    hub = FakeWebSubHub()
+    hub_url = f"{await hub.start()}/subscribe"
+    bot = FakeBot()
+    cog = youtube.YouTube(bot)
+    cog.check_youtube.cancel()
+    cog.channel_id = CHANNEL_ID
+    await cog.cog_load()
+    bot.subscriptions.subscribe(NOTIFY_CHANNEL_ID, "youtube", NOTIFY_CHANNEL_ID)
+
+    announced = []
+    send_video_notification = cog._send_video_notification
+
+    async def record(video_id, title, description, url):
+        announced.append(video_id)
+        await send_video_notification(video_id, title, description, url)
+
+    cog._send_video_notification = record
+
+    port = free_port()
+    callback = f"http://127.0.0.1:{port}/websub"
+    subscriber = WebSubSubscriber(bot.http_client, topic_url=youtube.WEBSUB_TOPIC_URL.format(CHANNEL_ID),
+                                  callback_url=callback, on_notification=cog._handle_push, hub_url=hub_url,
+                                  host="127.0.0.1", port=port, retry_delay=0.2)
+    cog.websub = subscriber
+    checks = {}
+
+    async def push_and_settle(body: str, secret=None):
+        before = subscriber.notifications + subscriber.rejected
+        await hub.publish(callback, body, secret)
+        await wait_for(lambda: subscriber.notifications + subscriber.rejected > before)
+        await asyncio.sleep(0.05)
+        await asyncio.gather(*subscriber._dispatch_tasks, return_exceptions=True)
+
+    try:
+        await subscriber.start()
+        checks["subscription_verified"] = await wait_for(lambda: hub.verified.get(callback, False)) \
+            and subscriber.is_active
+        lease_before = subscriber.lease_expires_at
+
+        # 확인을 기다리는 요청이 없을 때 보낸 위조 GET (구독 연장 / 해지 / 거부)
+        spoofed = [(await hub.send_verification(callback, {
+            "hub.mode": mode, "hub.topic": subscriber.topic_url, "hub.challenge": "x",
+            "hub.lease_seconds": "60"}))[0] for mode in ("subscribe", "unsubscribe", "denied")]
+        checks["unrequested_verify_rejected_404"] = spoofed == [404, 404, 404] \
+            and subscriber.lease_expires_at == lease_before
+
+        # 재구독 요청이 확인을 기다리는 중 (허브가 보낼 토큰은 bench-token)
+        subscriber._pending["subscribe"] = "bench-token"
+        status, _ = await hub.send_verification(callback, {
+            "hub.mode": "subscribe", "hub.topic": subscriber.topic_url, "hub.challenge": "x",
+            "hub.lease_seconds": "60", "hub.verify_token": "guessed"})
+        checks["wrong_verify_token_rejected_404"] = status == 404 and subscriber.lease_expires_at == lease_before
+
+        status, _ = await hub.send_verification(callback, {
+            "hub.mode": "subscribe", "hub.topic": subscriber.topic_url, "hub.challenge": "x",
+            "hub.lease_seconds": "not-a-number", "hub.verify_token": "bench-token"})
+        checks["malformed_lease_rejected_400"] = status == 400 and subscriber.lease_expires_at == lease_before
+        subscriber._pending.pop("subscribe", None)
+
+        # 마지막으로 알린 동영상 (커서)
+        now = datetime.now(timezone.utc)
+        cog._save_cursor({"id": "cursor", "published": iso(now - timedelta(hours=1))})
+
+        await push_and_settle(atom_feed([("new1", "새 동영상", iso(now))]))
+        checks["new_video_announced"] = announced == ["new1"]
+
+        await push_and_settle(atom_feed([("old1", "제목을 고친 예전 동영상", iso(now - timedelta(days=30)))]))
+        checks["edit_of_older_video_ignored"] = announced == ["new1"]
+
+        await push_and_settle(atom_feed([("new1", "새 동영상 (제목 수정)", iso(now))]))
+        checks["repeated_push_ignored"] = announced == ["new1"]
+
+        await push_and_settle(atom_feed([("forged", "위조", iso(now + timedelta(minutes=1)))]), secret="wrong")
+        checks["bad_signature_ignored"] = announced == ["new1"] and subscriber.rejected == 1
+
+        checks["push_healthy_after_push"] = cog._push_is_healthy()
+        subscriber.last_notification_at = subscriber.last_verified_at = \
+            time.time() - (youtube.PUSH_SILENCE_HOURS + 1) * 3600
+        checks["silent_push_falls_back_to_polling"] = not cog._push_is_healthy()
+
+        subscriber.last_notification_at = time.time()
+        cog.push_missed_at = time.time() + 1  # 폴링이 방금 푸시가 놓친 동영상을 찾은 상황
+        checks["missed_push_falls_back_to_polling"] = not cog._push_is_healthy()
+    finally:
+        await subscriber.stop()
+        await bot.close()
+        await hub.stop()
+
+    return {
+        "checks": checks,
+        "announced": announced,
+        "notifications": subscriber.notifications,
+        "rejected_signatures": subscriber.rejected,
+        "passed": all(checks.values()),
+    }
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="Cog 로그 출력")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.CRITICAL)
+
+    result = await run()
+    print(json.dumps({"benchmark": "websub_hub", "result": result}, ensure_ascii=False, indent=2))
+    return 0 if result["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,116 @@
+# bench/youtube_client.py
+"""YouTube API 클라이언트 벤치마크
+
+로컬 가짜 YouTube Data API 에 대해 youtube_api.YouTubeAPI(공용 aiohttp 풀)와
+googleapiclient(discovery + 기본 스레드 풀)의 초기화 시간과 호출당 지연을 비교해 JSON으로 출력한다.
+googleapiclient 가 설치되어 있지 않으면 해당 항목은 건너뛴다.
+
+    python -m bench.youtube_client --calls 200 --latency-ms 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import bench  # noqa: F401  (더미 환경변수 설정)
+from bench.upstreams import FakeYouTubeAPI
+from http_client import HttpClient
+from youtube_api import YouTubeAPI, YouTubeQuotaError
+
+PLAYLIST_ID = "UUbenchmark"
+
+
+def summarize(startup: float, durations: list) -> dict:
+    durations = sorted(durations)
+    return {
+        "startup_ms": round(startup * 1000, 2),
+        "calls": len(durations),
+        "p50_ms": round(statistics.median(durations) * 1000, 2),
+        "p95_ms": round(durations[int(len(durations) * 0.95) - 1] * 1000, 2),
+        "mean_ms": round(statistics.mean(durations) * 1000, 2),
+    }
+
+
+async def bench_native(base_url: str, calls: int) -> dict:
+    http = HttpClient()
+    try:
+        started = time.perf_counter()
+        client = YouTubeAPI(http, "bench-key", base_url=f"{base_url}/youtube/v3")
+        await client.playlist_items(PLAYLIST_ID, max_results=1)
+        startup = time.perf_counter() - started
+
+        durations = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            await client.playlist_items(PLAYLIST_ID, max_results=50)
+            durations.append(time.perf_counter() - started)
+
+        result = summarize(startup, durations)
+        result["connections_created"] = http.connections_created
+        return result
+    finally:
+        await http.close()
+
+
+async def bench_googleapiclient(base_url: str, calls: int) -> dict:
+    try:
+        from googleapiclient.discovery import build
+    except ImportError:
+        return {"skipped": "googleapiclient 미설치"}
+
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    client = build("youtube", "v3", developerKey="bench-key", client_options={"api_endpoint": base_url})
+    request = client.playlistItems().list(part="snippet,contentDetails", playlistId=PLAYLIST_ID, maxResults=1)
+    await loop.run_in_executor(None, request.execute)
+    startup = time.perf_counter() - started
+
+    durations = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        request = client.playlistItems().list(part="snippet,contentDetails", playlistId=PLAYLIST_ID, maxResults=50)
+        await loop.run_in_executor(None, request.execute)
+        durations.append(time.perf_counter() - started)
+    return summarize(startup, durations)
+
+
+async def check_quota_error(latency: float) -> str:
+    """할당량 초과 응답이 YouTubeQuotaError 로 변환되는지 확인"""
+    api = FakeYouTubeAPI(latency=latency, quota_exceeded=True)
+    base_url = await api.start()
+    http = HttpClient()
+    try:
+        await YouTubeAPI(http, "bench-key", base_url=f"{base_url}/youtube/v3").playlist_items(PLAYLIST_ID)
+        return "예외 없음"
+    except YouTubeQuotaError as e:
+        return f"YouTubeQuotaError({e.reason})"
+    finally:
+        await http.close()
+        await api.stop()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    api = FakeYouTubeAPI(latency=latency)
+    base_url = await api.start()
+    try:
+        results = {
+            "youtube_api": await bench_native(base_url, args.calls),
+            "googleapiclient": await bench_googleapiclient(base_url, args.calls),
+        }
+    finally:
+        await api.stop()
+
+    results["quota_error_mapping"] = await check_quota_error(latency)
+    print(json.dumps({"benchmark": "youtube_client", "upstream_latency_ms": args.latency_ms,
+                      "results": results}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+# cache.py
+import logging
+import time
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    value: Any = None
+    fresh_until: float = 0.0      # 이 시각까지는 그대로 사용
+    stale_until: float = 0.0      # 이 시각까지는 오래된 값을 주면서 백그라운드 갱신
+    error: Optional[BaseException] = None
+    error_until: float = 0.0      # 오류 결과(네거티브 캐시) 유지 시각
+
+    @property
+    def has_value(self) -> bool:
+        return self.stale_until > 0
+
+
+class AsyncTTLCache:
+    """stale-while-revalidate + 요청 병합 + 네거티브 캐시를 지원하는 비동기 TTL 캐시"""
+
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0, negative_ttl: float = 0,
+                 max_entries: int = 256, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "negative_hits": 0, "errors": 0}
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """캐시 조회 (없거나 만료되면 loader 실행, 동시 요청은 하나로 병합)"""
+        now = self._clock()
+        entry = self._entries.get(key)
+
+        if entry:
+            self._entries.move_to_end(key)
+            if entry.has_value and now < entry.fresh_until:
+                self.stats["hits"] += 1
+                return entry.value
+            if entry.has_value and now < entry.stale_until:
+                # 오래된 값을 바로 돌려주고 갱신은 백그라운드에서 (최근 실패했다면 잠시 보류)
+                self.stats["stale_hits"] += 1
+                if entry.error is None or now >= entry.error_until:
+                    self._start_load(key, loader)
+                return entry.value
+            if entry.error is not None and now < entry.error_until:
+                self.stats["negative_hits"] += 1
+                raise entry.error
+
+        if key in self._inflight:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+        return await asyncio.shield(self._start_load(key, loader))
+
+    async def refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """만료 여부와 상관없이 새로 로드 (실패하면 남아 있는 값으로 대체)"""
+        try:
+            return await asyncio.shield(self._start_load(key, loader))
+        except Exception:
+            if self.peek(key) is None:
+                raise
+            return self.peek(key)
+
+    def _start_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """진행 중인 로드가 있으면 재사용, 없으면 새로 시작"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader))
+            task.add_done_callback(self._consume_error)
+            self._inflight[key] = task
+        return task
+
+    def _consume_error(self, task: asyncio.Task):
+        """백그라운드 갱신 실패가 처리되지 않은 예외로 남지 않도록 기록"""
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"{self.name} 캐시 갱신 실패: {task.exception()}")
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await loader()
+        except Exception as e:
+            self.stats["errors"] += 1
+            self._store_error(key, e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        self.set(key, value)
+        return value
+
+    def _store_error(self, key: Hashable, error: BaseException):
+        """로드 실패 기록 (오래된 값이 남아 있으면 그대로 유지)"""
+        entry = self._entries.get(key) or _Entry()
+        entry.error = error
+        entry.error_until = self._clock() + self.negative_ttl
+        self._put(key, entry)
+
+    def set(self, key: Hashable, value: Any):
+        """값 직접 저장"""
+        now = self._clock()
+        self._put(key, _Entry(value=value, fresh_until=now + self.ttl,
+                              stale_until=now + self.ttl + self.stale_ttl))
+
+    def _put(self, key: Hashable, entry: _Entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """만료 여부와 상관없이 저장된 값 반환 (없으면 None)"""
+        entry = self._entries.get(key)
+        return entry.value if entry and entry.has_value else None
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """키 하나 또는 전체 무효화"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def age(self, key: Hashable) -> Optional[float]:
+        """저장된 값의 경과 시간(초)"""
+        entry = self._entries.get(key)
+        if not entry or not entry.has_value:
+            return None
+        return self._clock() - (entry.fresh_until - self.ttl)
+
+    def describe(self) -> str:
+        """디버그용 상태 문자열"""
+        s = self.stats
+        return (f"{self.name}: 항목 {len(self._entries)}개 / 적중 {s['hits']} · 만료값 제공 {s['stale_hits']} · "
+                f"미스 {s['misses']} · 병합 {s['coalesced']} · 오류 {s['errors']} (네거티브 적중 {s['negative_hits']})")
@@ -0,0 +1,380 @@
+# cluster.py
+"""샤드를 여러 프로세스로 나눠 실행할 때의 리더 선출과 프로세스 간 이벤트 전달
+
+각 프로세스는 AutoShardedBot 으로 자기 샤드(CLUSTER_SHARD_IDS)만 게이트웨이에 연결한다.
+외부 API 폴링(트윗/YouTube)과 매일 예약 작업은 잠금 파일을 잡은 리더 하나만 실행하고,
+리더가 만든 알림은 Unix 소켓으로 다른 프로세스에 넘겨 각자 맡은 길드의 구독 채널로 보낸다.
+리더 프로세스가 죽으면 잠금이 풀리고, 먼저 잠금을 잡은 프로세스가 리더를 이어받는다.
+
+    python cluster.py --processes 2 --shards 4
+"""
+import os
+import sys
+import json
+import time
+import fcntl
+import signal
+import asyncio
+import logging
+import argparse
+import subprocess
+from typing import Dict, List, Optional, Set
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 클러스터 설정
+ELECTION_INTERVAL = 2.0       # 리더가 아닐 때 잠금 재시도 / 리더 재연결 주기(초)
+MAX_LINE = 4 * 1024 * 1024    # 소켓으로 주고받는 이벤트 한 줄 최대 크기
+PEER_QUEUE_SIZE = 1000        # 느린 프로세스에 쌓아 두는 최대 이벤트 수 (넘치면 버림)
+RESTART_DELAY = 5.0           # 런처: 프로세스가 죽은 뒤 다시 띄우기까지 대기(초)
+
+ROLE_SINGLE = "single"
+ROLE_LEADER = "leader"
+ROLE_FOLLOWER = "follower"
+
+
+def shard_for_guild(guild_id: int, shard_count: int) -> int:
+    """길드가 속한 샤드 번호 (디스코드 공식 규칙)"""
+    return (guild_id >> 22) % shard_count
+
+
+class _Peer:
+    """리더에 연결된 다른 프로세스 하나"""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.node_id = "?"
+        self.shard_ids: List[int] = []
+        self.queue: asyncio.Queue = asyncio.Queue(PEER_QUEUE_SIZE)
+        self.task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+
+class ClusterNode:
+    """이 프로세스의 클러스터 역할 (리더 / 팔로워)
+
+    샤드 목록이 없으면(단일 프로세스) 항상 리더처럼 동작하고 아무것도 하지 않는다.
+    """
+
+    def __init__(self, bot, shard_ids: Optional[List[int]], shard_count: int, socket_path: str, lock_path: str,
+                 node_id: Optional[str] = None, election_interval: float = ELECTION_INTERVAL):
+        self.bot = bot
+        self.shard_ids = list(shard_ids or [])
+        self.shard_count = shard_count
+        self.socket_path = socket_path
+        self.lock_path = lock_path
+        self.node_id = node_id or f"pid-{os.getpid()}"
+        self.election_interval = election_interval
+        self.role = ROLE_FOLLOWER if self.enabled else ROLE_SINGLE
+        self.leader_since: Optional[float] = None
+        self.events_relayed = 0
+        self.events_received = 0
+        self._owned: Set[int] = set(self.shard_ids)
+        self._lock_file = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: Dict[int, _Peer] = {}
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._follow_task: Optional[asyncio.Task] = None
+        self._event_tasks: Set[asyncio.Task] = set()
+        self._suspended_loops = []
+        self._closed = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.shard_ids) and self.shard_count > 0
+
+    @property
+    def is_leader(self) -> bool:
+        return self.role in (ROLE_SINGLE, ROLE_LEADER)
+
+    def owns_guild(self, guild_id: int) -> bool:
+        return not self.enabled or shard_for_guild(guild_id, self.shard_count) in self._owned
+
+    # ---------------------------------------------------------------- 시작 / 역할 전환
+
+    async def start(self):
+        """리더 선출 (확장 모듈 로드 전에 호출 - 팔로워는 예약 작업을 멈춘 상태로 등록)"""
+        if not self.enabled:
+            return
+        registry = getattr(self.bot, "subscriptions", None)
+        if registry is not None:
+            registry.owns_guild = self.owns_guild
+            registry.relay = self.broadcast
+            registry.on_change = self._send_feeds
+
+        if self._try_lock():
+            await self._become_leader()
+        else:
+            self.bot.scheduler.pause()
+            self._follow_task = asyncio.create_task(self._follow(), name="cluster:follow")
+            logger.info(f"✅ 클러스터 팔로워로 시작: {self.node_id} (샤드 {self.shard_ids}/{self.shard_count})")
+
+    def apply_role(self):
+        """확장 모듈 로드 후 호출 - 팔로워는 Cog 의 폴링 루프를 멈춰 둠 (리더가 되면 다시 시작)"""
+        if self.is_leader:
+            return
+        for loop in self._cog_loops():
+            if loop.is_running():
+                loop.cancel()
+                self._suspended_loops.append(loop)
+        if self._suspended_loops:
+            logger.info(f"⏸️ 리더가 아니므로 폴링 루프 {len(self._suspended_loops)}개 대기")
+
+    def _cog_loops(self):
+        from discord.ext import tasks
+
+        for cog in self.bot.cogs.values():
+            for attr in dir(type(cog)):
+                if isinstance(getattr(type(cog), attr, None), tasks.Loop):
+                    yield getattr(cog, attr)
+
+    def _try_lock(self) -> bool:
+        """리더 잠금 시도 (프로세스가 죽으면 OS 가 풀어 줌)"""
+        if self._lock_file is None:
+            directory = os.path.dirname(self.lock_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._lock_file = open(self.lock_path, "a+")
+        try:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        self._lock_file.seek(0)
+        self._lock_file.truncate()
+        self._lock_file.write(f"{self.node_id} {os.getpid()}\n")
+        self._lock_file.flush()
+        return True
+
+    async def _become_leader(self):
+        # 이전 리더가 남긴 소켓 파일 정리 후 대기
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._server = await asyncio.start_unix_server(self._handle_peer, path=self.socket_path, limit=MAX_LINE)
+        self.role = ROLE_LEADER
+        self.leader_since = time.time()
+        logger.info(f"👑 클러스터 리더: {self.node_id} (샤드 {self.shard_ids}/{self.shard_count}, {self.socket_path})")
+
+    async def _promote(self):
+        """팔로워 → 리더: 이전 리더의 커서를 이어받고 폴링 루프와 예약 작업 시작"""
+        await self._become_leader()
+        await self.bot.state_store.reload()
+        for cog in list(self.bot.cogs.values()):
+            hook = getattr(cog, "cluster_promoted", None)
+            if hook is None:
+                continue
+            try:
+                await hook()
+            except Exception as e:
+                logger.error(f"❌ {cog.qualified_name} 리더 전환 처리 중 오류: {e}", exc_info=True)
+        self.bot.scheduler.resume()
+        for loop in self._suspended_loops:
+            if not loop.is_running():
+                loop.start()
+        self._suspended_loops.clear()
+        logger.warning(f"👑 리더 프로세스를 이어받았습니다: {self.node_id}")
+
+    # ---------------------------------------------------------------- 리더: 이벤트 전달
+
+    def broadcast(self, event: dict) -> int:
+        """리더가 만든 이벤트를 모든 팔로워에 전달 (전달한 프로세스 수, 팔로워에서는 0)"""
+        if self.role != ROLE_LEADER or not self._peers:
+            return 0
+        line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+        for peer in self._peers.values():
+            try:
+                peer.queue.put_nowait(line)
+            except asyncio.QueueFull:
+                peer.dropped += 1
+                logger.error(f"❌ 프로세스 {peer.node_id} 대기열이 가득 차 이벤트를 버립니다")
+        self.events_relayed += 1
+        return len(self._peers)
+
+    async def _handle_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = _Peer(writer)
+        self._peers[id(peer)] = peer
+        peer.task = asyncio.create_task(self._pump(peer), name="cluster:pump")
+        registry = getattr(self.bot, "subscriptions", None)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if message.get("type") == "hello":
+                    peer.node_id = message.get("node", "?")
+                    peer.shard_ids = message.get("shards", [])
+                    logger.info(f"🔗 프로세스 연결: {peer.node_id} (샤드 {peer.shard_ids})")
+                if message.get("type") in ("hello", "feeds") and registry is not None:
+                    registry.remote_feeds[peer.node_id] = set(message.get("feeds", []))
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ 프로세스 {peer.node_id} 연결 오류: {e}")
+        finally:
+            self._peers.pop(id(peer), None)
+            if registry is not None:
+                registry.remote_feeds.pop(peer.node_id, None)
+            peer.task.cancel()
+            writer.close()
+            logger.warning(f"⚠️ 프로세스 연결 끊김: {peer.node_id}")
+
+    async def _pump(self, peer: _Peer):
+        while True:
+            line = await peer.queue.get()
+            peer.writer.write(line)
+            await peer.writer.drain()
+
+    # ---------------------------------------------------------------- 팔로워: 이벤트 수신
+
+    async def _follow(self):
+        """리더에 연결해 이벤트를 받고, 연결이 끊기면 리더 잠금을 다시 시도"""
+        while not self._closed:
+            if self._try_lock():
+                await self._promote()
+                return
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path, limit=MAX_LINE)
+            except OSError:
+                await asyncio.sleep(self.election_interval)
+                continue
+
+            self._writer = writer
+            self._send_feeds(hello=True)
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    self._apply(json.loads(line))
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ 리더 연결 오류: {e}")
+            finally:
+                self._writer = None
+                writer.close()
+            if not self._closed:
+                logger.warning("⚠️ 리더 연결이 끊겼습니다 - 리더 선출을 다시 시도합니다")
+
+    def _apply(self, event: dict):
+        # 받은 순서대로 대기열에 넣도록 바로 태스크로 시작 (전송 결과는 기다리지 않음)
+        self.events_received += 1
+        task = asyncio.create_task(self.bot.subscriptions.apply_remote(event))
+        self._event_tasks.add(task)
+        task.add_done_callback(self._event_done)
+
+    def _event_done(self, task: asyncio.Task):
+        self._event_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"❌ 클러스터 이벤트 처리 중 오류: {task.exception()}")
+
+    def _send_feeds(self, hello: bool = False):
+        """이 프로세스에 구독 채널이 있는 피드를 리더에 알림 (리더는 구독자가 없는 피드의 폴링을 건너뜀)"""
+        if self._writer is None:
+            return
+        message = {"type": "hello" if hello else "feeds", "node": self.node_id, "shards": self.shard_ids,
+                   "feeds": self.bot.subscriptions.local_feeds()}
+        self._writer.write((json.dumps(message) + "\n").encode("utf-8"))
+
+    # ---------------------------------------------------------------- 종료 / 상태
+
+    async def close(self):
+        self._closed = True
+        if self._follow_task:
+            self._follow_task.cancel()
+            await asyncio.gather(self._follow_task, return_exceptions=True)
+        if self._server:
+            self._server.close()
+            for peer in list(self._peers.values()):
+                peer.writer.close()
+            await self._server.wait_closed()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        if self._lock_file:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def describe(self) -> str:
+        """디버그용 상태 문자열"""
+        if not self.enabled:
+            return "단일 프로세스"
+        shards = f"샤드 {','.join(map(str, self.shard_ids))}/{self.shard_count}"
+        if self.role == ROLE_LEADER:
+            peers = ", ".join(f"{peer.node_id}(샤드 {','.join(map(str, peer.shard_ids))})"
+                              for peer in self._peers.values()) or "없음"
+            dropped = sum(peer.dropped for peer in self._peers.values())
+            return (f"👑 리더 {self.node_id} ({shards}) · 연결된 프로세스: {peers} · "
+                    f"전달한 이벤트 {self.events_relayed}개" + (f" · 버림 {dropped}개" if dropped else ""))
+        state = "연결됨" if self._writer else "연결 대기"
+        return f"팔로워 {self.node_id} ({shards}) · 리더 {state} · 받은 이벤트 {self.events_received}개"
+
+
+def is_leader(bot) -> bool:
+    """이 프로세스가 외부 API 폴링/예약 작업을 맡는지 (클러스터가 아니면 항상 True)"""
+    node = getattr(bot, "cluster", None)
+    return node is None or node.is_leader
+
+
+# -------------------------------------------------------------------- 런처
+
+def _spawn(index: int, shard_ids: List[int], args) -> subprocess.Popen:
+    env = dict(os.environ)
+    env["CLUSTER_SHARD_COUNT"] = str(args.shards)
+    env["CLUSTER_SHARD_IDS"] = ",".join(map(str, shard_ids))
+    env["CLUSTER_NODE_ID"] = f"node{index}"
+    # 프로세스마다 메트릭 포트와 로그 파일을 따로 사용 (파일 순환은 프로세스 하나만 해야 안전)
+    metrics_port = int(env.get("METRICS_PORT") or 9108)
+    if metrics_port:
+        env["METRICS_PORT"] = str(metrics_port + index)
+    log_file = env.get("LOG_FILE", "bot.log").strip()
+    if log_file:
+        root, ext = os.path.splitext(log_file)
+        env["LOG_FILE"] = f"{root}.node{index}{ext}"
+    logger.info(f"🚀 node{index} 시작 (샤드 {shard_ids}/{args.shards})")
+    return subprocess.Popen([sys.executable, args.script], env=env)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="실행할 프로세스 수")
+    parser.add_argument("--shards", type=int, default=0, help="전체 샤드 수 (기본: 프로세스 수)")
+    parser.add_argument("--script", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "index.py"),
+                        help="프로세스마다 실행할 봇 스크립트")
+    args = parser.parse_args()
+    args.shards = args.shards or args.processes
+    if args.processes > args.shards:
+        parser.error("프로세스 수가 샤드 수보다 많을 수 없습니다.")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    assignments = [[shard for shard in range(args.shards) if shard % args.processes == index]
+                   for index in range(args.processes)]
+    children = {index: _spawn(index, shard_ids, args) for index, shard_ids in enumerate(assignments)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for child in children.values():
+            if child.poll() is None:
+                child.send_signal(signal.SIGINT)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    # 죽은 프로세스는 잠시 뒤 같은 샤드로 다시 시작 (그 사이 다른 프로세스가 리더를 이어받음)
+    restart_at: Dict[int, float] = {}
+    while not stopping or any(child.poll() is None for child in children.values()):
+        for index, child in children.items():
+            if stopping or child.poll() is None:
+                continue
+            if index not in restart_at:
+                logger.warning(f"⚠️ node{index} 종료 (코드 {child.returncode}) - {RESTART_DELAY:.0f}초 뒤 재시작")
+                restart_at[index] = time.monotonic() + RESTART_DELAY
+            elif time.monotonic() >= restart_at[index]:
+                del restart_at[index]
+                children[index] = _spawn(index, assignments[index], args)
+        time.sleep(0.5)
+
+
+if __name__ == "__main__":
+    main()
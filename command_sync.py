@@ -0,0 +1,60 @@
+# command_sync.py
+import json
+import hashlib
+import logging
+from typing import Optional
+
+import discord
+from discord import app_commands
+from state_store import get_state_store
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 상태 저장 설정
+STATE_NAMESPACE = "command_sync"
+
+
+def _command_payload(command, tree: app_commands.CommandTree) -> dict:
+    """Discord 에 등록되는 형태 그대로의 명령어 스키마"""
+    try:
+        return command.to_dict(tree)
+    except TypeError:
+        # discord.py 2.3 은 tree 인자를 받지 않음
+        return command.to_dict()
+
+
+def command_tree_fingerprint(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """명령어 트리(이름, 설명, 매개변수 등)의 안정적인 해시"""
+    payloads = [_command_payload(command, tree) for command in tree.get_commands(guild=guild)]
+    payloads.sort(key=lambda payload: (payload.get("type", 1), payload["name"]))
+    encoded = json.dumps(payloads, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+async def sync_command_tree(bot, force: bool = False, guild_id: int = 0) -> bool:
+    """명령어 스키마가 바뀌었을 때만 동기화 (guild_id 가 있으면 개발용 길드에만 즉시 반영)
+
+    동기화했으면 True, 이미 최신이라 건너뛰었으면 False.
+    """
+    store = get_state_store(bot)
+    await store.open()
+
+    guild = discord.Object(id=guild_id) if guild_id else None
+    if guild is not None:
+        bot.tree.copy_global_to(guild=guild)
+
+    # 다른 봇 계정(토큰)으로 바뀌면 다시 등록해야 하므로 application_id 도 함께 비교
+    fingerprint = f"{bot.application_id}:{command_tree_fingerprint(bot.tree, guild=guild)}"
+    key = f"guild:{guild_id}" if guild_id else "global"
+    scope = f"길드 {guild_id}" if guild_id else "전역"
+
+    if not force and store.get(STATE_NAMESPACE, key) == fingerprint:
+        logger.info(f"✅ Slash commands 변경 없음 - {scope} 동기화 생략")
+        return False
+
+    synced = await bot.tree.sync(guild=guild)
+    store.set(STATE_NAMESPACE, key, fingerprint)
+    await store.flush()
+    logger.info(f"✅ Slash commands synced ({scope}, {len(synced)}개)")
+    return True
@@ -2,10 +2,9 @@
 import os
 import logging
 from dotenv import load_dotenv
-from typing import Optional
+from typing import List, Optional
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO)
+# 로깅 출력 설정은 index.py 의 LogPipeline 에서 (여기서 basicConfig 를 부르면 핸들러가 중복됨)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
@@ -33,17 +32,111 @@ def validate_string(value: Optional[str], var_name: str, required: bool = True)
             return None
     return value.strip()
 
+def validate_list(value: Optional[str], var_name: str, required: bool = True) -> List[str]:
+    """쉼표로 구분된 목록 환경변수 검증"""
+    items = [item.strip() for item in (value or "").split(",") if item.strip()]
+    if not items and required:
+        raise ValueError(f"❌ 필수 환경변수 {var_name}이 설정되지 않았습니다.")
+    return items
+
 # 환경변수 로드 및 검증
 try:
     DISCORD_TOKEN = validate_string(os.getenv("DISCORD_TOKEN"), "DISCORD_TOKEN")
     DISCORD_CHANNEL_ID = validate_int(os.getenv("DISCORD_CHANNEL_ID"), "DISCORD_CHANNEL_ID")
-    TWITTER_USERNAME = validate_string(os.getenv("TWITTER_USERNAME"), "TWITTER_USERNAME")
+    # 모니터링할 트위터 계정 목록 (TWITTER_USERNAMES, 없으면 TWITTER_USERNAME 하나)
+    TWITTER_USERNAMES = validate_list(os.getenv("TWITTER_USERNAMES") or os.getenv("TWITTER_USERNAME"), "TWITTER_USERNAMES")
+    TWITTER_USERNAME = TWITTER_USERNAMES[0]
     BEARER_TOKEN = validate_string(os.getenv("BEARER_TOKEN"), "BEARER_TOKEN")
+    # 재시작 후 밀린 트윗을 따라잡을 때 알리는 최대 경과 시간(시간)과 계정별 최대 개수 (더 오래된/많은 트윗은 건너뜀)
+    TWITTER_CATCH_UP_MAX_HOURS = float(os.getenv("TWITTER_CATCH_UP_MAX_HOURS") or 6)
+    TWITTER_CATCH_UP_MAX_TWEETS = int(os.getenv("TWITTER_CATCH_UP_MAX_TWEETS") or 20)
+    if TWITTER_CATCH_UP_MAX_HOURS <= 0 or TWITTER_CATCH_UP_MAX_TWEETS <= 0:
+        raise ValueError("❌ TWITTER_CATCH_UP_MAX_HOURS / TWITTER_CATCH_UP_MAX_TWEETS는 0보다 커야 합니다.")
+
+    # 상태 저장소(SQLite) 경로
+    STATE_DB_PATH = os.getenv("STATE_DB_PATH", "").strip() or os.path.join("data", "bot_state.db")
 
     # YouTube API 설정 (선택적)
     YOUTUBE_API_KEY = validate_string(os.getenv("YOUTUBE_API_KEY"), "YOUTUBE_API_KEY", required=False)
     YOUTUBE_CHANNEL_ID = validate_string(os.getenv("YOUTUBE_CHANNEL_ID"), "YOUTUBE_CHANNEL_ID", required=False)
     DISCORD_YOUTUBE_CHANNEL_ID = validate_int(os.getenv("DISCORD_YOUTUBE_CHANNEL_ID"), "DISCORD_YOUTUBE_CHANNEL_ID", default=0)
+    # 새 동영상 수집 방식: playlist(업로드 재생목록, 1 unit) 또는 rss(공개 피드, 할당량 없음)
+    YOUTUBE_INGEST_MODE = (os.getenv("YOUTUBE_INGEST_MODE") or "playlist").strip().lower()
+    if YOUTUBE_INGEST_MODE not in ("playlist", "rss"):
+        raise ValueError(f"❌ YOUTUBE_INGEST_MODE는 playlist 또는 rss 여야 합니다. 현재값: '{YOUTUBE_INGEST_MODE}'")
+
+    # WebSub 푸시 알림 (선택적 - 외부에서 접근 가능한 콜백 URL이 있을 때만 활성화)
+    YOUTUBE_WEBSUB_CALLBACK_URL = os.getenv("YOUTUBE_WEBSUB_CALLBACK_URL", "").strip() or None
+    YOUTUBE_WEBSUB_SECRET = os.getenv("YOUTUBE_WEBSUB_SECRET", "").strip() or None
+    YOUTUBE_WEBSUB_PORT = int(os.getenv("YOUTUBE_WEBSUB_PORT") or 8080)
+
+    # 방송 일정 라이브 보드 (매일 10시에 올린 메시지를 일정이 바뀔 때마다 수정)
+    SCHEDULE_LIVE_BOARD = os.getenv("SCHEDULE_LIVE_BOARD", "").strip().lower() in ("1", "true", "yes")
+
+    # Prometheus 메트릭 엔드포인트 (0 이면 사용 안 함, 기본은 로컬에서만 접근 가능)
+    METRICS_PORT = int(os.getenv("METRICS_PORT") or 9108)
+    METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1").strip()
+
+    # 이벤트 루프를 이 시간(ms) 이상 막은 콜백을 느린 콜백으로 기록 (/loop_lag, bot_slow_callbacks_total)
+    LOOP_SLOW_CALLBACK_MS = float(os.getenv("LOOP_SLOW_CALLBACK_MS") or 250)
+    if LOOP_SLOW_CALLBACK_MS <= 0:
+        raise ValueError(f"❌ LOOP_SLOW_CALLBACK_MS는 0보다 커야 합니다. 현재값: '{LOOP_SLOW_CALLBACK_MS}'")
+
+    # 슬래시 명령어 동기화 (개발용 길드 ID가 있으면 해당 길드에만 즉시 반영, FORCE=1 이면 변경 없어도 동기화)
+    DISCORD_DEV_GUILD_ID = int(os.getenv("DISCORD_DEV_GUILD_ID") or 0)
+    COMMAND_SYNC_FORCE = os.getenv("COMMAND_SYNC_FORCE", "").strip().lower() in ("1", "true", "yes")
+
+    # 구독 채널로 퍼뜨릴 때 동시에 전송하는 메시지 수 (디스코드 전역 rate limit 50/초 안쪽으로)
+    FANOUT_CONCURRENCY = int(os.getenv("FANOUT_CONCURRENCY") or 5)
+
+    # 게이트웨이 프로필: default(기존 - 모든 멤버/메시지 캐시) 또는 lean(확장 모듈이 선언한 intents 만, 캐시 최소화)
+    # lean 에서는 메시지 이벤트를 받지 않으므로 !sync 대신 COMMAND_SYNC_FORCE=1 로 동기화
+    GATEWAY_PROFILE = (os.getenv("GATEWAY_PROFILE") or "default").strip().lower()
+    if GATEWAY_PROFILE not in ("default", "lean"):
+        raise ValueError(f"❌ GATEWAY_PROFILE은 default 또는 lean 이어야 합니다. 현재값: '{GATEWAY_PROFILE}'")
+    # lean 프로필의 메시지 캐시 크기 (0 이면 캐시 안 함)
+    GATEWAY_MAX_MESSAGES = int(os.getenv("GATEWAY_MAX_MESSAGES") or 0)
+
+    # 샤딩 (CLUSTER_SHARD_COUNT 가 0 이면 샤딩 안 함, CLUSTER_SHARD_IDS 를 주면 그 샤드만 이 프로세스에서 실행)
+    # 여러 프로세스로 나눠 실행할 때는 cluster.py 런처가 프로세스마다 CLUSTER_SHARD_IDS / CLUSTER_NODE_ID 를 채워 줌
+    CLUSTER_SHARD_COUNT = int(os.getenv("CLUSTER_SHARD_COUNT") or 0)
+    CLUSTER_SHARD_IDS = [int(shard) for shard in validate_list(os.getenv("CLUSTER_SHARD_IDS"), "CLUSTER_SHARD_IDS",
+                                                               required=False)]
+    if CLUSTER_SHARD_IDS and not CLUSTER_SHARD_COUNT:
+        raise ValueError("❌ CLUSTER_SHARD_IDS를 쓰려면 CLUSTER_SHARD_COUNT도 설정해야 합니다.")
+    if any(shard < 0 or shard >= CLUSTER_SHARD_COUNT for shard in CLUSTER_SHARD_IDS):
+        raise ValueError(f"❌ CLUSTER_SHARD_IDS는 0 ~ {CLUSTER_SHARD_COUNT - 1} 사이여야 합니다.")
+    CLUSTER_NODE_ID = os.getenv("CLUSTER_NODE_ID", "").strip() or None
+    # 리더 선출 잠금 파일과 리더 → 다른 프로세스 이벤트 전달용 Unix 소켓 (같은 호스트의 프로세스끼리 공유)
+    CLUSTER_LOCK_FILE = os.getenv("CLUSTER_LOCK_FILE", "data/cluster.lock").strip()
+    CLUSTER_SOCKET = os.getenv("CLUSTER_SOCKET", "data/cluster.sock").strip()
+
+    # 최근 N개 이미지는 다시 내보내지 않음 (0 이면 중복 방지 안 함)
+    IMGCRAWL_NO_REPEAT_WINDOW = int(os.getenv("IMGCRAWL_NO_REPEAT_WINDOW") or 300)
+    if IMGCRAWL_NO_REPEAT_WINDOW < 0:
+        raise ValueError(f"❌ IMGCRAWL_NO_REPEAT_WINDOW는 0 이상이어야 합니다. 현재값: '{IMGCRAWL_NO_REPEAT_WINDOW}'")
+
+    # 이미지 프록시: 켜면 이미지 링크 대신 받아서 검증한 파일을 첨부로 올림 (깨진 링크는 채널에 나가지 않음)
+    IMGCRAWL_PROXY = os.getenv("IMGCRAWL_PROXY", "").strip().lower() in ("1", "true", "yes")
+    # 디스크 캐시 위치/크기, 받을 이미지 최대 크기, 축소할 긴 변 길이(px, 0 이면 축소 안 함 - Pillow 필요)
+    # 클러스터에서는 프로세스마다 따로 인덱스를 가지므로 캐시 디렉터리도 노드별로 나눔
+    IMGCRAWL_CACHE_DIR = os.getenv("IMGCRAWL_CACHE_DIR", "").strip() or \
+        os.path.join("data", "image_cache", *([CLUSTER_NODE_ID] if CLUSTER_NODE_ID else []))
+    IMGCRAWL_CACHE_BYTES = int(os.getenv("IMGCRAWL_CACHE_MB") or 200) * 1024 * 1024
+    IMGCRAWL_MAX_IMAGE_BYTES = int(os.getenv("IMGCRAWL_MAX_IMAGE_MB") or 8) * 1024 * 1024
+    IMGCRAWL_MAX_SIDE = int(os.getenv("IMGCRAWL_MAX_SIDE") or 0)
+
+    # 로그 파일 (크기 제한 + 순환), 형식(text 또는 json), 같은 경고/오류 반복 억제 시간(초, 0이면 사용 안 함)
+    LOG_FILE = os.getenv("LOG_FILE", "bot.log").strip() or None
+    LOG_LEVEL = (os.getenv("LOG_LEVEL") or "INFO").strip().upper()
+    if LOG_LEVEL not in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+        raise ValueError(f"❌ LOG_LEVEL은 DEBUG/INFO/WARNING/ERROR/CRITICAL 중 하나여야 합니다. 현재값: '{LOG_LEVEL}'")
+    LOG_FORMAT = (os.getenv("LOG_FORMAT") or "text").strip().lower()
+    if LOG_FORMAT not in ("text", "json"):
+        raise ValueError(f"❌ LOG_FORMAT은 text 또는 json 이어야 합니다. 현재값: '{LOG_FORMAT}'")
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_MB") or 10) * 1024 * 1024
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT") or 5)
+    LOG_RATE_LIMIT_SECONDS = float(os.getenv("LOG_RATE_LIMIT_SECONDS") or 60)
 
     logger.info("✅ 모든 환경변수가 성공적으로 로드되었습니다.")
 
@@ -0,0 +1,237 @@
+# diagnostics.py
+import io
+import os
+import sys
+import time
+import logging
+import asyncio
+import threading
+import traceback
+import discord
+from collections import deque
+from dataclasses import dataclass, field
+from discord import app_commands
+from discord.ext import commands
+from typing import Deque, List, Optional, Tuple
+from config import LOOP_SLOW_CALLBACK_MS
+from metrics import REGISTRY
+from profiler import SamplingProfiler
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 필요한 게이트웨이 intents (슬래시 명령어만 사용)
+REQUIRED_INTENTS = ()
+
+# 이벤트 루프 감시 설정
+SAMPLE_INTERVAL = 0.25                 # 루프 지연 측정 주기(초)
+WATCHDOG_INTERVAL = 0.05               # 감시 스레드 확인 주기(초)
+SLOW_CALLBACK_THRESHOLD = LOOP_SLOW_CALLBACK_MS / 1000   # 이보다 오래 루프를 막은 콜백은 기록(초)
+HISTORY_SECONDS = 15 * 60              # 지연 기록 보관 시간
+LAG_WINDOWS = ((60, "1분"), (5 * 60, "5분"), (15 * 60, "15분"))
+MAX_SLOW_CALLBACKS = 20                # 최근 느린 콜백 보관 수
+STACK_DEPTH = 12
+
+# 프로파일링 설정
+MAX_PROFILE_SECONDS = 60
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "bot_event_loop_lag_seconds", "이벤트 루프 지연 (예정보다 늦게 깨어난 시간)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+SLOW_CALLBACKS = REGISTRY.counter(
+    "bot_slow_callbacks_total", "임계값보다 오래 이벤트 루프를 막은 콜백 수", ("owner",))
+
+
+@dataclass
+class SlowCallback:
+    """이벤트 루프를 오래 막은 콜백 한 건"""
+    started_at: float
+    owner: str
+    stack: List[str] = field(default_factory=list)
+    duration: float = 0.0
+    heartbeat: float = 0.0      # 멈추기 직전 heartbeat (monotonic)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(len(sorted_values) * q), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def _find_owner(frame) -> str:
+    """스택에서 책임 있는 Cog 메서드(없으면 이 저장소의 함수, 그것도 없으면 가장 안쪽 함수) 찾기"""
+    repo_frame = None
+    innermost = frame
+    while frame is not None:
+        self_obj = frame.f_locals.get("self") if frame.f_code.co_argcount else None
+        if isinstance(self_obj, commands.Cog):
+            return f"{self_obj.qualified_name}.{frame.f_code.co_name}"
+        if repo_frame is None and frame.f_code.co_filename.startswith(REPO_DIR):
+            repo_frame = frame
+        frame = frame.f_back
+    target = repo_frame or innermost
+    module = os.path.splitext(os.path.basename(target.f_code.co_filename))[0]
+    return f"{module}.{target.f_code.co_name}"
+
+
+class LoopWatchdog:
+    """이벤트 루프 지연 측정 + 느린 콜백 감지
+
+    루프 안의 측정 태스크가 SAMPLE_INTERVAL 마다 깨어나며 heartbeat 를 남기고,
+    별도 스레드가 heartbeat 가 임계값 이상 멈추면 그 순간 루프 스레드의 스택을 잡아 둔다.
+    """
+
+    def __init__(self, threshold: float = SLOW_CALLBACK_THRESHOLD, sample_interval: float = SAMPLE_INTERVAL):
+        self.threshold = threshold
+        self.sample_interval = sample_interval
+        self.samples: Deque[Tuple[float, float]] = deque(maxlen=int(HISTORY_SECONDS / sample_interval) + 1)
+        self.slow_callbacks: Deque[SlowCallback] = deque(maxlen=MAX_SLOW_CALLBACKS)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._sampler: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._current: Optional[SlowCallback] = None
+
+    @property
+    def running(self) -> bool:
+        return self._sampler is not None and not self._sampler.done()
+
+    def start(self):
+        """루프 안에서 호출 - 측정 태스크와 감시 스레드 시작"""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._sampler = asyncio.create_task(self._sample_loop(), name="diagnostics:loop-lag")
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"✅ 이벤트 루프 감시 시작 (느린 콜백 기준 {self.threshold * 1000:.0f}ms)")
+
+    async def stop(self):
+        self._stop.set()
+        if self._sampler:
+            self._sampler.cancel()
+            await asyncio.gather(self._sampler, return_exceptions=True)
+        if self._thread:
+            await asyncio.to_thread(self._thread.join, 1.0)
+
+    async def _sample_loop(self):
+        while True:
+            expected = time.monotonic() + self.sample_interval
+            await asyncio.sleep(self.sample_interval)
+            now = time.monotonic()
+            lag = max(now - expected, 0.0)
+            self._heartbeat = now
+            self.samples.append((now, lag))
+            LOOP_LAG_SECONDS.observe(lag)
+
+    def _watch(self):
+        """감시 스레드: heartbeat 가 멈추면 루프 스레드 스택 캡처"""
+        while not self._stop.wait(WATCHDOG_INTERVAL):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.sample_interval
+            current = self._current
+            if stalled >= self.threshold and current is None:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is None:
+                    continue
+                try:
+                    owner = _find_owner(frame)
+                except Exception:
+                    owner = "unknown"
+                stack = traceback.format_stack(frame, limit=STACK_DEPTH)
+                self._current = SlowCallback(started_at=time.time() - stalled, owner=owner, stack=stack,
+                                             heartbeat=heartbeat)
+            elif current is not None and heartbeat != current.heartbeat:
+                # 루프가 다시 돌기 시작함 - 실제로 막힌 시간 확정
+                current.duration = heartbeat - current.heartbeat - self.sample_interval
+                self._current = None
+                self.slow_callbacks.append(current)
+                SLOW_CALLBACKS.inc(owner=current.owner)
+                logger.warning(f"⚠️ 이벤트 루프가 {current.duration * 1000:.0f}ms 동안 멈춤 - {current.owner}\n"
+                               + "".join(current.stack[-4:]).rstrip())
+
+    def lag_summary(self, window: float) -> Tuple[float, float, float, int]:
+        """최근 window 초의 (p50, p99, 최대, 표본 수)"""
+        cutoff = time.monotonic() - window
+        values = sorted(lag for at, lag in self.samples if at >= cutoff)
+        if not values:
+            return 0.0, 0.0, 0.0, 0
+        return _percentile(values, 0.5), _percentile(values, 0.99), values[-1], len(values)
+
+
+class Diagnostics(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.watchdog = LoopWatchdog()
+        self._profile_lock = asyncio.Lock()
+
+    async def cog_load(self):
+        self.watchdog.start()
+
+    async def cog_unload(self):
+        await self.watchdog.stop()
+
+    @app_commands.command(name="loop_lag", description="이벤트 루프 지연과 느린 콜백을 확인합니다 (관리자)")
+    @app_commands.default_permissions(administrator=True)
+    async def loop_lag(self, interaction: discord.Interaction):
+        """이벤트 루프 지연 통계"""
+        lines = [f"**이벤트 루프 지연** (측정 주기 {self.watchdog.sample_interval * 1000:.0f}ms, "
+                 f"느린 콜백 기준 {self.watchdog.threshold * 1000:.0f}ms)"]
+        for window, label in LAG_WINDOWS:
+            p50, p99, worst, count = self.watchdog.lag_summary(window)
+            lines.append(f"{label}: p50 {p50 * 1000:.1f}ms · p99 {p99 * 1000:.1f}ms · 최대 {worst * 1000:.1f}ms ({count}회)")
+
+        recent = list(self.watchdog.slow_callbacks)[-5:]
+        if recent:
+            lines.append("\n**최근 느린 콜백**")
+            for item in reversed(recent):
+                at = time.strftime("%H:%M:%S", time.localtime(item.started_at))
+                lines.append(f"`{at}` {item.duration * 1000:.0f}ms - **{item.owner}**")
+            last_frame = recent[-1].stack[-1].strip().splitlines() if recent[-1].stack else []
+            if last_frame:
+                lines.append(f"```{chr(10).join(last_frame)[:500]}```")
+        else:
+            lines.append("\n최근 느린 콜백 없음")
+
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+    @app_commands.command(name="profile", description="실행 중인 봇을 지정한 시간 동안 샘플링 프로파일링합니다 (소유자)")
+    @app_commands.describe(seconds=f"측정 시간(초, 1~{MAX_PROFILE_SECONDS})")
+    @app_commands.default_permissions(administrator=True)
+    async def profile(self, interaction: discord.Interaction,
+                      seconds: app_commands.Range[int, 1, MAX_PROFILE_SECONDS] = 10):
+        """샘플링 프로파일러 실행 후 collapsed stack 파일과 요약 전송"""
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message("❌ 봇 소유자만 사용할 수 있는 명령어입니다.", ephemeral=True)
+            return
+        if self._profile_lock.locked():
+            await interaction.response.send_message("⚠️ 이미 프로파일링이 진행 중입니다.", ephemeral=True)
+            return
+
+        async with self._profile_lock:
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            logger.info(f"🔍 프로파일링 시작: {seconds}초 (요청자: {interaction.user})")
+
+            profiler = SamplingProfiler(loop=asyncio.get_running_loop())
+            profiler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                await asyncio.to_thread(profiler.stop)
+
+            filename = f"profile-{time.strftime('%Y%m%d-%H%M%S')}.collapsed"
+            attachment = discord.File(io.BytesIO(profiler.collapsed().encode("utf-8")), filename=filename)
+            summary = profiler.summary()
+            if len(summary) > 1900:
+                summary = summary[:1900] + "..."
+            await interaction.followup.send(f"**프로파일 결과**\n{summary}", file=attachment, ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Diagnostics(bot))
@@ -0,0 +1,339 @@
+# dispatcher.py
+import time
+import logging
+import asyncio
+import aiohttp
+import discord
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+from resilience import backoff, retry_after_from_headers
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 우선순위
+PRIORITY_HIGH = 0    # 방송 일정 게시 / 라이브 보드 등 정해진 시각에 나가야 하는 메시지 - 대량 알림보다 항상 먼저
+PRIORITY_BULK = 1    # 트윗/동영상 알림, 매일 이미지 등
+
+# 디스코드 제한
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+# 큐 설정
+MAX_BACKLOG = 5000           # 전체 대기 중인 대량 메시지 최대 수 (구독 채널 수백 개로 한 번에 퍼뜨려도 들어가도록)
+BATCH_WINDOW = 1.0           # 알림이 몰릴 때 한 메시지로 묶기 위해 기다리는 시간(초)
+MAX_IN_FLIGHT = 2            # 동시에 전송 중인 메시지 수 - 우선순위와 무관 (전역 rate limit 여유를 상호작용 응답에 남김)
+MAX_RETRIES = 5
+
+
+class BacklogFullError(Exception):
+    """대기열이 가득 차서 메시지를 받을 수 없음"""
+
+
+@dataclass
+class OutboundMessage:
+    channel: discord.abc.Messageable
+    content: Optional[str] = None
+    embeds: List[discord.Embed] = field(default_factory=list)
+    attachment: Optional[Tuple[str, str]] = None   # (로컬 파일 경로, 올릴 파일 이름) - 전송 시도마다 새로 열어서 올림
+    priority: int = PRIORITY_BULK
+    future: Optional[asyncio.Future] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def batchable(self) -> bool:
+        """임베드만 있는 대량 메시지는 같은 채널의 다른 알림과 묶을 수 있음"""
+        return self.priority == PRIORITY_BULK and not self.content and bool(self.embeds) and not self.attachment
+
+
+class _ChannelQueue:
+    """채널 하나의 대기열 (채널 안에서는 순서 보장)"""
+
+    def __init__(self):
+        self.lanes: Dict[int, Deque[OutboundMessage]] = {PRIORITY_HIGH: deque(), PRIORITY_BULK: deque()}
+        self.worker: Optional[asyncio.Task] = None
+        self.wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return sum(len(lane) for lane in self.lanes.values())
+
+
+class _SendSlots:
+    """전체 동시 전송 수 제한 - 자리가 나면 우선순위 메시지가 대량 메시지보다 먼저 받음"""
+
+    def __init__(self, size: int):
+        self._free = size
+        self._waiters: Dict[int, Deque[asyncio.Future]] = {PRIORITY_HIGH: deque(), PRIORITY_BULK: deque()}
+
+    async def acquire(self, priority: int):
+        if self._free > 0 and not any(self._waiters.values()):
+            self._free -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # 자리를 받은 직후 취소됨 - 다음 대기자에게 넘김
+            else:
+                self._waiters[priority].remove(future)
+            raise
+
+    def release(self):
+        for priority in (PRIORITY_HIGH, PRIORITY_BULK):
+            waiters = self._waiters[priority]
+            if waiters:
+                waiters.popleft().set_result(None)
+                return
+        self._free += 1
+
+
+class Dispatcher:
+    """봇 전체의 디스코드 발신 메시지 대기열
+
+    - 채널별로 순서대로 전송하고, 서로 다른 채널은 동시에 전송
+    - 몰려 들어온 임베드 알림은 최대 10개씩 한 메시지로 묶음
+    - 429/5xx/네트워크 오류는 retry_after 또는 지터 백오프로 재시도 (해당 채널만 잠시 멈춤)
+    - 대량 메시지 대기열은 크기 제한, 우선순위 메시지는 채널 대기열과 동시 전송 자리 모두에서 먼저
+    """
+
+    def __init__(self, max_backlog: int = MAX_BACKLOG, batch_window: float = BATCH_WINDOW,
+                 max_in_flight: int = MAX_IN_FLIGHT, max_retries: int = MAX_RETRIES):
+        self.max_backlog = max_backlog
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self._slots = _SendSlots(max_in_flight)
+        self._channels: Dict[int, _ChannelQueue] = {}
+        self._bulk_backlog = 0
+        self._closed = False
+        self.stats = {"queued": 0, "messages_sent": 0, "items_sent": 0, "batched": 0,
+                      "retries": 0, "rate_limited": 0, "dropped": 0, "failed": 0}
+
+    @property
+    def backlog(self) -> int:
+        return sum(len(queue) for queue in self._channels.values())
+
+    def enqueue(self, channel: discord.abc.Messageable, content: Optional[str] = None, *,
+                embed: Optional[discord.Embed] = None, embeds: Optional[List[discord.Embed]] = None,
+                attachment: Optional[Tuple[str, str]] = None, priority: int = PRIORITY_BULK) -> asyncio.Future:
+        """메시지를 대기열에 넣고 전송 결과(discord.Message)를 담을 Future 반환"""
+        if self._closed:
+            raise RuntimeError("Dispatcher가 이미 종료되었습니다.")
+
+        if priority == PRIORITY_BULK and self._bulk_backlog >= self.max_backlog:
+            self.stats["dropped"] += 1
+            raise BacklogFullError(f"발신 대기열이 가득 찼습니다 ({self.max_backlog}개)")
+
+        message = OutboundMessage(
+            channel=channel,
+            content=content,
+            embeds=list(embeds or []) + ([embed] if embed else []),
+            attachment=attachment,
+            priority=priority,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        queue = self._channels.get(channel.id)
+        if queue is None:
+            queue = self._channels[channel.id] = _ChannelQueue()
+        queue.lanes[priority].append(message)
+        queue.wakeup.set()
+        if priority == PRIORITY_BULK:
+            self._bulk_backlog += 1
+        self.stats["queued"] += 1
+
+        if queue.worker is None or queue.worker.done():
+            queue.worker = asyncio.create_task(self._channel_worker(channel.id, queue))
+        return message.future
+
+    async def send(self, channel: discord.abc.Messageable, content: Optional[str] = None, *,
+                   embed: Optional[discord.Embed] = None, embeds: Optional[List[discord.Embed]] = None,
+                   attachment: Optional[Tuple[str, str]] = None, priority: int = PRIORITY_BULK) -> discord.Message:
+        """대기열을 거쳐 전송하고 완료될 때까지 대기"""
+        return await self.enqueue(channel, content, embed=embed, embeds=embeds, attachment=attachment,
+                                  priority=priority)
+
+    def notify(self, channel: discord.abc.Messageable, content: Optional[str] = None, *,
+               embed: Optional[discord.Embed] = None, embeds: Optional[List[discord.Embed]] = None,
+               label: str = "알림") -> bool:
+        """결과를 기다리지 않는 대량 알림 (실패는 로그로만 남김)"""
+        try:
+            future = self.enqueue(channel, content, embed=embed, embeds=embeds)
+        except BacklogFullError as e:
+            logger.error(f"❌ {label} 전송 포기: {e}")
+            return False
+        future.add_done_callback(lambda f: self._log_failure(f, label))
+        return True
+
+    @staticmethod
+    def _log_failure(future: asyncio.Future, label: str):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"❌ {label} 전송 실패: {future.exception()}")
+
+    def _next_batch(self, queue: _ChannelQueue) -> List[OutboundMessage]:
+        """우선순위 메시지 하나, 또는 연속된 임베드 알림을 최대 10개까지 묶어서 꺼냄"""
+        if queue.lanes[PRIORITY_HIGH]:
+            return [queue.lanes[PRIORITY_HIGH].popleft()]
+
+        lane = queue.lanes[PRIORITY_BULK]
+        batch = [lane.popleft()]
+        if not batch[0].batchable:
+            return batch
+
+        embed_count = len(batch[0].embeds)
+        embed_chars = sum(len(e) for e in batch[0].embeds)
+        while lane and lane[0].batchable:
+            candidate = lane[0]
+            size = sum(len(e) for e in candidate.embeds)
+            if embed_count + len(candidate.embeds) > MAX_EMBEDS_PER_MESSAGE or \
+                    embed_chars + size > MAX_EMBED_CHARS_PER_MESSAGE:
+                break
+            batch.append(lane.popleft())
+            embed_count += len(candidate.embeds)
+            embed_chars += size
+        return batch
+
+    async def _channel_worker(self, channel_id: int, queue: _ChannelQueue):
+        """채널 하나의 대기열을 비울 때까지 순서대로 전송"""
+        try:
+            while len(queue):
+                await self._wait_for_burst(queue)
+                batch = self._next_batch(queue)
+                await self._deliver(batch)
+        finally:
+            if self._channels.get(channel_id) is queue and not len(queue):
+                del self._channels[channel_id]
+
+    async def _wait_for_burst(self, queue: _ChannelQueue):
+        """방금 들어온 알림이면 뒤따르는 알림을 잠깐 기다렸다가 한 번에 묶음"""
+        bulk = queue.lanes[PRIORITY_BULK]
+        while not queue.lanes[PRIORITY_HIGH] and bulk and bulk[0].batchable and len(bulk) < MAX_EMBEDS_PER_MESSAGE:
+            wait = bulk[0].enqueued_at + self.batch_window - time.monotonic()
+            if wait <= 0:
+                return
+            queue.wakeup.clear()
+            try:
+                await asyncio.wait_for(queue.wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                return
+
+    async def _deliver(self, batch: List[OutboundMessage]):
+        first = batch[0]
+        bulk = first.priority == PRIORITY_BULK
+        if bulk:
+            self._bulk_backlog -= len(batch)
+
+        try:
+            # 우선순위 메시지도 같은 동시 전송 제한을 받음 (구독 채널 전체로 퍼뜨리는 일정 게시가 rate limit 을 다 쓰지 않도록)
+            await self._slots.acquire(first.priority)
+            try:
+                message = await self._send_with_retry(batch)
+            finally:
+                self._slots.release()
+        except asyncio.CancelledError:
+            for item in batch:
+                item.future.cancel()
+            raise
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+
+        self.stats["messages_sent"] += 1
+        self.stats["items_sent"] += len(batch)
+        if len(batch) > 1:
+            self.stats["batched"] += len(batch) - 1
+        for item in batch:
+            if not item.future.done():
+                item.future.set_result(message)
+
+    async def _send_with_retry(self, batch: List[OutboundMessage]) -> discord.Message:
+        first = batch[0]
+        embeds = [embed for item in batch for embed in item.embeds]
+        kwargs = {"embeds": embeds} if embeds else {}
+
+        for attempt in range(self.max_retries + 1):
+            if first.attachment:
+                # 보낸 discord.File 은 닫히므로 시도마다 새로 엶
+                path, filename = first.attachment
+                kwargs["file"] = discord.File(path, filename=filename)
+            try:
+                return await first.channel.send(first.content, **kwargs)
+            except discord.RateLimited as e:
+                delay = e.retry_after
+                self.stats["rate_limited"] += 1
+            except discord.HTTPException as e:
+                # 403/404 등은 재시도해도 소용 없음
+                if e.status != 429 and e.status < 500:
+                    raise
+                if e.status == 429:
+                    self.stats["rate_limited"] += 1
+                delay = self._retry_after(e) or self._backoff(attempt)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                delay = self._backoff(attempt)
+
+            if attempt == self.max_retries:
+                break
+            self.stats["retries"] += 1
+            logger.warning(f"⚠️ 메시지 전송 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}초 후)")
+            # 해당 채널 작업만 멈추고 다른 채널은 계속 전송
+            await asyncio.sleep(delay)
+
+        raise RuntimeError(f"메시지 전송 재시도 {self.max_retries}회 모두 실패")
+
+    @staticmethod
+    def _retry_after(error: discord.HTTPException) -> Optional[float]:
+        """429 응답의 Retry-After 헤더 (버킷이 풀리는 시점)"""
+        response = getattr(error, "response", None)
+        return retry_after_from_headers(getattr(response, "headers", None))
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """지터를 준 지수 백오프"""
+        return backoff(attempt)
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """대기 중인 메시지를 모두 보낼 때까지 대기 (timeout 안에 끝나면 True)"""
+        workers = [queue.worker for queue in self._channels.values() if queue.worker and not queue.worker.done()]
+        if not workers:
+            return True
+        _, pending = await asyncio.wait(workers, timeout=timeout)
+        return not pending
+
+    async def close(self, timeout: float = 10.0):
+        """남은 메시지를 최대 timeout 초 동안 전송한 뒤 종료"""
+        self._closed = True
+        if await self.drain(timeout):
+            return
+
+        logger.warning(f"⚠️ 전송하지 못한 메시지 {self.backlog}개를 버리고 종료합니다.")
+        workers = [queue.worker for queue in self._channels.values() if queue.worker and not queue.worker.done()]
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        # send() 로 기다리는 쪽이 멈추지 않도록 남은 Future 취소
+        for queue in self._channels.values():
+            for lane in queue.lanes.values():
+                for item in lane:
+                    item.future.cancel()
+                lane.clear()
+        self._channels.clear()
+
+    def describe(self) -> str:
+        """디버그용 상태 문자열"""
+        s = self.stats
+        return (f"대기 {self.backlog}개 (채널 {len(self._channels)}개) / 전송 메시지 {s['messages_sent']} · "
+                f"알림 {s['items_sent']} (묶음 {s['batched']}) · 재시도 {s['retries']} · 429 {s['rate_limited']} · "
+                f"버림 {s['dropped']} · 실패 {s['failed']}")
+
+
+def get_dispatcher(bot) -> Dispatcher:
+    """봇에 연결된 발신 대기열 반환 (없으면 생성)"""
+    dispatcher = getattr(bot, "dispatcher", None)
+    if dispatcher is None:
+        dispatcher = Dispatcher()
+        bot.dispatcher = dispatcher
+    return dispatcher
@@ -0,0 +1,92 @@
+# gateway_profile.py
+import ast
+import logging
+import importlib.util
+import discord
+from discord.ext import commands
+from typing import Dict, Iterable, List, Optional, Set
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 게이트웨이 실행 프로필
+PROFILE_DEFAULT = "default"   # 기존 설정: 기본 intents + members + message_content, 멤버/메시지 전부 캐시
+PROFILE_LEAN = "lean"         # 확장 모듈이 선언한 intents 만 요청, 멤버/메시지 캐시 최소화
+PROFILES = (PROFILE_DEFAULT, PROFILE_LEAN)
+
+# 확장 모듈이 필요한 intents 를 선언하는 모듈 상수 이름 (예: REQUIRED_INTENTS = ("guilds",))
+# import 하지 않고 소스에서 읽으므로 리터럴 튜플/리스트로만 적어야 함
+DECLARATION = "REQUIRED_INTENTS"
+
+
+def _read_declaration(module_name: str) -> Optional[List[str]]:
+    """확장 모듈 소스에서 REQUIRED_INTENTS 값 읽기 (선언이 없으면 None)"""
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        return None
+    with open(spec.origin, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=spec.origin)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == DECLARATION for t in node.targets):
+            return list(ast.literal_eval(node.value))
+    return None
+
+
+def declared_intents(extensions: Iterable[str]) -> discord.Intents:
+    """확장 모듈들이 선언한 intents 합집합 (선언이 없는 모듈은 기본 intents 가 필요하다고 간주)"""
+    intents = discord.Intents.none()
+    valid = set(discord.Intents.VALID_FLAGS)
+    for ext in extensions:
+        names = _read_declaration(ext)
+        if names is None:
+            logger.warning(f"⚠️ {ext}.py 에 {DECLARATION} 선언이 없어 기본 intents 를 사용합니다.")
+            intents.value |= discord.Intents.default().value
+            continue
+        unknown = [name for name in names if name not in valid]
+        if unknown:
+            raise ValueError(f"❌ {ext}.py 의 알 수 없는 intent: {', '.join(unknown)}")
+        for name in names:
+            setattr(intents, name, True)
+    return intents
+
+
+def bot_options(profile: str, extensions: Iterable[str], max_messages: int = 0) -> Dict[str, object]:
+    """commands.Bot / AutoShardedBot 생성 인자 (intents, 캐시 설정)"""
+    if profile not in PROFILES:
+        raise ValueError(f"알 수 없는 게이트웨이 프로필: {profile} (가능: {', '.join(PROFILES)})")
+
+    if profile == PROFILE_DEFAULT:
+        intents = discord.Intents.default()
+        intents.message_content = True
+        intents.members = True
+        intents.guilds = True
+        return {"command_prefix": "!", "intents": intents}
+
+    # lean: 멤버는 봇 자신만, 시작 시 길드 멤버 전체 요청(chunking) 안 함, 메시지 캐시는 max_messages 개 (0 이면 끔)
+    return {
+        "command_prefix": "!",
+        "intents": declared_intents(extensions),
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+        "chunk_guilds_at_startup": False,
+        "max_messages": max_messages if max_messages > 0 else None,
+    }
+
+
+async def _ignore_message(message: discord.Message):
+    return
+
+
+def apply_profile(bot: commands.Bot, profile: str):
+    """생성한 봇에 프로필 적용 - lean 은 접두사 명령어 처리를 건너뜀 (슬래시 명령어만 사용)"""
+    if profile == PROFILE_LEAN:
+        bot.on_message = _ignore_message
+
+
+def describe(bot: commands.Bot, profile: str) -> str:
+    """디버그용 상태 문자열"""
+    enabled: Set[str] = {name for name, value in bot.intents if value}
+    cached_members = sum(len(guild.members) for guild in bot.guilds)
+    max_messages = bot._connection.max_messages
+    return (f"프로필 {profile} · intents {', '.join(sorted(enabled)) or '없음'} · "
+            f"캐시된 멤버 {cached_members}명 · 메시지 캐시 {max_messages if max_messages else '끔'}"
+            f" ({len(bot.cached_messages)}개)")
@@ -0,0 +1,244 @@
+# http_client.py
+import time
+import logging
+import asyncio
+import aiohttp
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from metrics import REGISTRY, observe_http
+from resilience import CircuitBreaker, CircuitOpenError, FAILURE_THRESHOLD, RESET_TIMEOUT, retry_after_from_headers
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 커넥션 풀 설정
+POOL_LIMIT = 100            # 전체 동시 커넥션 수
+POOL_LIMIT_PER_HOST = 10    # 호스트별 동시 커넥션 수
+DNS_CACHE_TTL = 300         # DNS 캐시 유지 시간(초)
+KEEPALIVE_TIMEOUT = 60      # 유휴 커넥션 유지 시간(초)
+DEFAULT_TIMEOUT = 30        # 서비스 기본 타임아웃(초)
+USER_AGENT = "DiscordBot/1.0"
+
+BREAKER_REJECTED = REGISTRY.counter(
+    "bot_upstream_circuit_rejected_total", "서킷 브레이커가 열려 보내지 않은 외부 API 요청 수", ("service",))
+
+
+@dataclass
+class ServiceConfig:
+    """외부 서비스별 기본 설정"""
+    name: str
+    timeout: aiohttp.ClientTimeout
+    headers: Dict[str, str] = field(default_factory=dict)
+    breaker: Optional[CircuitBreaker] = None
+
+
+class HttpClient:
+    """봇 전체가 공유하는 HTTP 클라이언트 (keep-alive 커넥션 풀)"""
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._services: Dict[str, ServiceConfig] = {}
+        self._lock = asyncio.Lock()
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    def register_service(self, name: str, timeout: float = DEFAULT_TIMEOUT,
+                         headers: Optional[Dict[str, str]] = None, failure_threshold: int = FAILURE_THRESHOLD,
+                         reset_timeout: float = RESET_TIMEOUT) -> ServiceConfig:
+        """서비스별 기본 타임아웃과 헤더, 서킷 브레이커 등록 (Cog 를 다시 로드해도 브레이커 상태는 유지)"""
+        merged = {"User-Agent": USER_AGENT}
+        merged.update(headers or {})
+        previous = self._services.get(name)
+        breaker = previous.breaker if previous and previous.breaker else CircuitBreaker(name)
+        breaker.failure_threshold = failure_threshold
+        breaker.reset_timeout = reset_timeout
+        config = ServiceConfig(name=name, timeout=aiohttp.ClientTimeout(total=timeout), headers=merged,
+                               breaker=breaker)
+        self._services[name] = config
+        return config
+
+    def breaker(self, service: str) -> CircuitBreaker:
+        """서비스의 서킷 브레이커 (등록하지 않은 서비스는 기본 설정으로 생성)"""
+        config = self._services.get(service)
+        if config is None:
+            config = self._services[service] = ServiceConfig(
+                name=service, timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT),
+                headers={"User-Agent": USER_AGENT}, breaker=CircuitBreaker(service))
+        elif config.breaker is None:
+            config.breaker = CircuitBreaker(service)
+        return config.breaker
+
+    def breakers(self) -> Dict[str, CircuitBreaker]:
+        """등록된 모든 서비스의 서킷 브레이커"""
+        return {name: config.breaker for name, config in self._services.items() if config.breaker}
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        """커넥션 재사용 통계를 위한 trace 설정"""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            self.requests += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self.connections_reused += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            self.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            self.dns_cache_misses += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """공유 세션 반환 (이벤트 루프 안에서 처음 필요할 때 생성)"""
+        if self._session and not self._session.closed:
+            return self._session
+
+        async with self._lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=POOL_LIMIT,
+                    limit_per_host=POOL_LIMIT_PER_HOST,
+                    ttl_dns_cache=DNS_CACHE_TTL,
+                    keepalive_timeout=KEEPALIVE_TIMEOUT,
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT),
+                    headers={"User-Agent": USER_AGENT},
+                    trace_configs=[self._build_trace_config()],
+                )
+                logger.info("✅ 공유 HTTP 커넥션 풀 생성")
+        return self._session
+
+    def request(self, service: str, method: str, url: str, **kwargs) -> "_RequestContext":
+        """서비스 기본 설정을 적용한 요청 (async with 로 사용)"""
+        config = self._services.get(service)
+        if config:
+            headers = dict(config.headers)
+            headers.update(kwargs.pop("headers", None) or {})
+            kwargs["headers"] = headers
+            kwargs.setdefault("timeout", config.timeout)
+        return _RequestContext(self, service, method, url, kwargs)
+
+    def get(self, service: str, url: str, **kwargs) -> "_RequestContext":
+        """GET 요청"""
+        return self.request(service, "GET", url, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        """커넥션 풀 사용 현황"""
+        connector = self._session.connector if self._session and not self._session.closed else None
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "handshakes_saved": max(self.requests - self.connections_created, 0),
+            "dns_cache_hits": self.dns_cache_hits,
+            "dns_cache_misses": self.dns_cache_misses,
+            "idle_connections": _count_conns(connector, "_conns"),
+            "active_connections": _count_conns(connector, "_acquired_per_host"),
+        }
+
+    def format_stats(self) -> str:
+        """통계를 사람이 읽을 수 있는 문자열로 변환"""
+        s = self.stats()
+        return (f"요청 {s['requests']}회 / 새 커넥션 {s['connections_created']}개 / "
+                f"재사용 {s['connections_reused']}회 (핸드셰이크 {s['handshakes_saved']}회 절약) / "
+                f"DNS 캐시 적중 {s['dns_cache_hits']}회 / 유휴 {s['idle_connections']} · 사용중 {s['active_connections']}")
+
+    def format_breakers(self) -> str:
+        """서비스별 서킷 브레이커 상태 (한 줄에 하나)"""
+        return "\n".join(f"{name}: {breaker.describe()}" for name, breaker in sorted(self.breakers().items()))
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    async def close(self):
+        """세션 및 커넥션 풀 종료"""
+        if self._session and not self._session.closed:
+            logger.info(f"🔌 공유 HTTP 커넥션 풀 종료 - {self.format_stats()}")
+            await self._session.close()
+        self._session = None
+
+
+def _record_status(breaker: CircuitBreaker, status: int, headers):
+    """응답 상태 코드를 서킷 브레이커에 반영 (429/5xx 는 실패, 나머지 4xx 는 요청 문제라 서비스는 정상)"""
+    if status == 429 or status == 503:
+        breaker.record_failure(f"HTTP {status}", retry_after_from_headers(headers))
+    elif status >= 500:
+        breaker.record_failure(f"HTTP {status}")
+    else:
+        breaker.record_success()
+
+
+def _count_conns(connector: Optional[aiohttp.BaseConnector], attr: str) -> int:
+    """커넥터 내부 풀 크기 (aiohttp 버전에 따라 없을 수 있음)"""
+    pool = getattr(connector, attr, None) if connector else None
+    if not pool:
+        return 0
+    return sum(len(conns) for conns in pool.values())
+
+
+class _RequestContext:
+    """세션 생성을 지연시키는 요청 컨텍스트 매니저"""
+
+    def __init__(self, client: HttpClient, service: str, method: str, url: str, kwargs: dict):
+        self._client = client
+        self._service = service
+        self._method = method
+        self._url = url
+        self._kwargs = kwargs
+        self._response: Optional[aiohttp.ClientResponse] = None
+
+    async def __aenter__(self) -> aiohttp.ClientResponse:
+        breaker = self._client.breaker(self._service)
+        try:
+            breaker.before_request()
+        except CircuitOpenError:
+            BREAKER_REJECTED.inc(service=self._service)
+            raise
+        session = await self._client.get_session()
+        started = time.perf_counter()
+        try:
+            self._response = await session.request(self._method, self._url, **self._kwargs)
+        except aiohttp.ClientResponseError as e:
+            # raise_for_status=True 인 경우 상태 코드로 기록
+            observe_http(self._service, self._url, str(e.status), time.perf_counter() - started)
+            _record_status(breaker, e.status, e.headers)
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            observe_http(self._service, self._url, "error", time.perf_counter() - started)
+            breaker.record_failure(type(e).__name__)
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        observe_http(self._service, self._url, str(self._response.status), time.perf_counter() - started)
+        _record_status(breaker, self._response.status, self._response.headers)
+        return self._response
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._response is not None:
+            self._response.release()
+
+
+def get_http_client(bot) -> HttpClient:
+    """봇에 연결된 공유 HTTP 클라이언트 반환 (없으면 생성)"""
+    client = getattr(bot, "http_client", None)
+    if client is None:
+        client = HttpClient()
+        bot.http_client = client
+    return client
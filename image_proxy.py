@@ -0,0 +1,383 @@
+# image_proxy.py
+import os
+import time
+import asyncio
+import hashlib
+import logging
+import importlib.util
+import multiprocessing
+import discord
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 다운로드 설정
+CHUNK_SIZE = 64 * 1024                 # 스트리밍으로 읽는 단위
+MAX_IMAGE_BYTES = 8 * 1024 * 1024      # 이보다 큰 이미지는 받지 않음 (디스코드 첨부 제한 안쪽)
+DEAD_STATUSES = {403, 404, 410}        # 다시 요청해도 소용 없는 응답 - 깨진 링크로 기억
+DEAD_LINK_TTL = 6 * 3600               # 깨진 링크를 기억하는 시간(초)
+MAX_DEAD_LINKS = 10000
+TEMP_SUFFIX = ".part"
+
+# 받을 수 있는 이미지 형식 (Content-Type → 확장자)
+CONTENT_TYPES = {"image/jpeg": ".jpg", "image/png": ".png", "image/gif": ".gif", "image/webp": ".webp"}
+EXTENSIONS = {ext: content_type for content_type, ext in CONTENT_TYPES.items()}
+
+# 축소 설정 (Pillow 가 있을 때만, 별도 프로세스에서)
+DOWNSCALE_WORKERS = 1
+JPEG_QUALITY = 85
+
+# Pillow 는 선택 의존성 (없으면 축소 없이 원본을 올림)
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+
+
+class ImageRejected(Exception):
+    """첨부로 올릴 수 없는 이미지 링크 (깨진 링크, 이미지가 아님, 너무 큼 등)"""
+
+    def __init__(self, url: str, reason: str, dead: bool = True):
+        super().__init__(f"{reason}: {url}")
+        self.url = url
+        self.reason = reason
+        self.dead = dead
+
+
+def sniff_type(data: bytes) -> Optional[str]:
+    """파일 앞부분의 시그니처로 이미지 형식 판별 (이미지가 아니면 None)"""
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _downscale(data: bytes, content_type: str, max_side: int) -> Optional[Tuple[bytes, str]]:
+    """긴 변이 max_side 를 넘으면 축소 (워커 프로세스에서 실행, 줄일 필요가 없으면 None)"""
+    from io import BytesIO
+    from PIL import Image
+
+    with Image.open(BytesIO(data)) as image:
+        # 움직이는 이미지는 프레임을 잃으므로 그대로 둠
+        if max(image.size) <= max_side or getattr(image, "is_animated", False):
+            return None
+        image.thumbnail((max_side, max_side))
+        output = BytesIO()
+        if content_type == "image/png":
+            image.save(output, "PNG", optimize=True)
+        elif content_type == "image/webp":
+            image.save(output, "WEBP", quality=JPEG_QUALITY)
+        else:
+            content_type = "image/jpeg"
+            image.convert("RGB").save(output, "JPEG", quality=JPEG_QUALITY, optimize=True)
+    if output.tell() >= len(data):
+        return None
+    return output.getvalue(), content_type
+
+
+def _write_file(path: str, data: bytes):
+    """임시 파일에 쓴 뒤 교체 (중간에 죽어도 반쯤 쓴 파일이 캐시에 남지 않음)"""
+    temp_path = path + TEMP_SUFFIX
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+@dataclass
+class CachedImage:
+    """디스크 캐시에 저장된 이미지 하나"""
+    key: str
+    path: str
+    size: int
+    content_type: str
+
+    @property
+    def filename(self) -> str:
+        """디스코드에 올릴 파일 이름"""
+        return f"image{CONTENT_TYPES.get(self.content_type, '')}"
+
+    def to_file(self) -> discord.File:
+        return discord.File(self.path, filename=self.filename)
+
+
+class DiskLRUCache:
+    """URL 해시로 찾는 크기 제한 디스크 캐시 (인덱스는 메모리, 오래 쓰지 않은 파일부터 삭제)"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, CachedImage]" = OrderedDict()
+        self._pins: Dict[str, int] = {}   # 전송 대기 중이라 지우면 안 되는 파일 (키별 고정 횟수)
+        self.total_bytes = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str, content_type: str) -> str:
+        return os.path.join(self.directory, key + CONTENT_TYPES[content_type])
+
+    def load(self):
+        """디스크에 남아 있는 파일로 인덱스 복원 (수정 시각 순서 = 사용 순서, 블로킹이라 스레드에서 호출)"""
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            key, ext = os.path.splitext(name)
+            if ext == TEMP_SUFFIX:
+                os.remove(path)
+                continue
+            if ext not in EXTENSIONS:
+                continue
+            stat = os.stat(path)
+            found.append((stat.st_mtime, CachedImage(key, path, stat.st_size, EXTENSIONS[ext])))
+        self._index.clear()
+        self.total_bytes = 0
+        for _, entry in sorted(found, key=lambda item: item[0]):
+            self._index[entry.key] = entry
+            self.total_bytes += entry.size
+        self._evict()
+        logger.info(f"✅ 이미지 캐시 로드: {len(self._index)}개, {self.total_bytes / 1024 / 1024:.1f}MB")
+
+    def get(self, key: str) -> Optional[CachedImage]:
+        """캐시 조회 (최근 사용으로 표시, 파일이 지워졌으면 인덱스에서도 제거)"""
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        try:
+            # 재시작 후에도 사용 순서가 유지되도록 수정 시각 갱신
+            os.utime(entry.path)
+        except OSError:
+            self.discard(key)
+            return None
+        self._index.move_to_end(key)
+        return entry
+
+    def add(self, key: str, path: str, size: int, content_type: str) -> CachedImage:
+        """저장을 마친 파일을 인덱스에 추가하고 용량을 넘으면 오래된 파일 삭제"""
+        self.discard(key, remove_file=False)
+        entry = self._index[key] = CachedImage(key, path, size, content_type)
+        self.total_bytes += size
+        self._evict()
+        return entry
+
+    def discard(self, key: str, remove_file: bool = True):
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry.size
+        if remove_file:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def pin(self, key: str):
+        """전송이 끝날 때까지 용량 정리에서 제외"""
+        self._pins[key] = self._pins.get(key, 0) + 1
+
+    def unpin(self, key: str):
+        count = self._pins.get(key, 0) - 1
+        if count > 0:
+            self._pins[key] = count
+            return
+        self._pins.pop(key, None)
+        # 고정 때문에 미뤄 둔 정리
+        self._evict()
+
+    def _evict(self):
+        # 방금 넣은 파일(가장 최근)과 고정된 파일은 남김
+        if self.total_bytes <= self.max_bytes or not self._index:
+            return
+        newest = next(reversed(self._index))
+        for key in list(self._index):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if key == newest or key in self._pins:
+                continue
+            self.discard(key)
+            self.evicted += 1
+
+
+class ImageProxy:
+    """외부 이미지 링크를 받아 검증한 뒤 디스크 캐시에 두고 첨부 파일로 올릴 수 있게 하는 프록시
+
+    - 청크 단위로 스트리밍하면서 Content-Type, 크기, 파일 시그니처 검증 (깨진 링크는 한동안 기억)
+    - 같은 URL 을 동시에 요청하면 다운로드는 한 번만
+    - Pillow 가 있으면 큰 이미지는 워커 프로세스에서 축소
+    """
+
+    def __init__(self, http, service: str, cache_dir: str, max_cache_bytes: int,
+                 max_image_bytes: int = MAX_IMAGE_BYTES, max_side: int = 0):
+        self.http = http
+        self.service = service
+        self.cache = DiskLRUCache(cache_dir, max_cache_bytes)
+        self.max_image_bytes = max_image_bytes
+        if max_side and not HAS_PILLOW:
+            logger.warning("⚠️ Pillow 가 설치되지 않아 이미지 축소 없이 원본을 올립니다.")
+            max_side = 0
+        self.max_side = max_side
+        self._executor: Optional[Executor] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._dead: "OrderedDict[str, float]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "rejected": 0, "downscaled": 0,
+                      "downloaded_bytes": 0}
+
+    async def start(self):
+        """디스크 캐시 인덱스 복원"""
+        await asyncio.to_thread(self.cache.load)
+
+    def is_dead(self, url: str) -> bool:
+        until = self._dead.get(url)
+        if until is None:
+            return False
+        if time.monotonic() >= until:
+            del self._dead[url]
+            return False
+        return True
+
+    def _mark_dead(self, url: str):
+        self._dead[url] = time.monotonic() + DEAD_LINK_TTL
+        self._dead.move_to_end(url)
+        while len(self._dead) > MAX_DEAD_LINKS:
+            self._dead.popitem(last=False)
+
+    def cached(self, url: str) -> Optional[CachedImage]:
+        """캐시에 있으면 바로 반환 (업스트림 요청 없음)"""
+        entry = self.cache.get(self.cache.key(url))
+        if entry is not None:
+            self.stats["hits"] += 1
+        return entry
+
+    async def fetch(self, url: str) -> CachedImage:
+        """캐시에서 찾거나 내려받아 저장 (올릴 수 없는 링크면 ImageRejected)"""
+        entry = self.cached(url)
+        if entry is not None:
+            return entry
+        if self.is_dead(url):
+            raise ImageRejected(url, "깨진 링크 (기억됨)")
+
+        key = self.cache.key(url)
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["misses"] += 1
+            task = self._inflight[key] = asyncio.create_task(self._download(url, key))
+            task.add_done_callback(lambda done: self._consume(done, key))
+        else:
+            self.stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    @asynccontextmanager
+    async def hold(self, url: str) -> AsyncIterator[CachedImage]:
+        """fetch 한 이미지를 async with 블록이 끝날 때까지 캐시 정리에서 지우지 않도록 고정
+
+        대기열을 거쳐 나중에 파일을 여는 전송은 이 안에서 해야 그 사이 다른 다운로드가 파일을 지우지 않음
+        """
+        image = await self.fetch(url)
+        # 다운로드가 끝난 뒤 이어서 실행되기 전에 다른 다운로드가 캐시를 정리했을 수 있음
+        if self.cache.get(image.key) is None:
+            image = await self.fetch(url)
+        self.cache.pin(image.key)
+        try:
+            yield image
+        finally:
+            self.cache.unpin(image.key)
+
+    def prefetch(self, urls: Iterable[str]):
+        """곧 쓸 이미지를 백그라운드로 미리 받아 둠 (실패는 깨진 링크로 기억만 함)"""
+        for url in urls:
+            key = self.cache.key(url)
+            if key in self._inflight or self.is_dead(url) or self.cache.get(key) is not None:
+                continue
+            self.stats["misses"] += 1
+            task = self._inflight[key] = asyncio.create_task(self._download(url, key))
+            task.add_done_callback(lambda done, key=key: self._consume(done, key))
+
+    def _consume(self, task: asyncio.Task, key: str):
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"이미지 미리 받기 실패: {task.exception()}")
+
+    async def _download(self, url: str, key: str) -> CachedImage:
+        try:
+            data, content_type = await self._read(url)
+            if self.max_side:
+                data, content_type = await self._shrink(url, data, content_type)
+        except ImageRejected as e:
+            self.stats["rejected"] += 1
+            if e.dead:
+                self._mark_dead(url)
+            raise
+
+        path = self.cache.path_for(key, content_type)
+        await asyncio.to_thread(_write_file, path, data)
+        return self.cache.add(key, path, len(data), content_type)
+
+    async def _read(self, url: str) -> Tuple[bytes, str]:
+        """스트리밍으로 읽으면서 형식과 크기 검증"""
+        async with self.http.get(self.service, url) as response:
+            if response.status != 200:
+                raise ImageRejected(url, f"HTTP {response.status}", dead=response.status in DEAD_STATUSES)
+            if response.content_type not in CONTENT_TYPES:
+                raise ImageRejected(url, f"이미지가 아님 ({response.content_type})")
+            if response.content_length and response.content_length > self.max_image_bytes:
+                raise ImageRejected(url, f"너무 큼 ({response.content_length / 1024 / 1024:.1f}MB)")
+
+            buffer = bytearray()
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                buffer.extend(chunk)
+                if len(buffer) > self.max_image_bytes:
+                    raise ImageRejected(url, f"너무 큼 ({self.max_image_bytes / 1024 / 1024:.0f}MB 초과)")
+        self.stats["downloaded_bytes"] += len(buffer)
+
+        # 오류 페이지를 image/* 로 주는 서버도 있으므로 실제 내용으로 다시 확인
+        content_type = sniff_type(bytes(buffer[:16]))
+        if content_type is None:
+            raise ImageRejected(url, "손상되었거나 이미지가 아닌 파일")
+        return bytes(buffer), content_type
+
+    async def _shrink(self, url: str, data: bytes, content_type: str) -> Tuple[bytes, str]:
+        """워커 프로세스에서 축소 (이벤트 루프를 막지 않음)"""
+        if self._executor is None:
+            # 여러 스레드가 도는 봇 프로세스를 fork 하면 다른 스레드가 쥔 잠금까지 복제되어 멈출 수 있으므로
+            # forkserver(없으면 spawn) 사용 - _downscale 은 최상위 함수라 그대로 넘길 수 있음
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self._executor = ProcessPoolExecutor(max_workers=DOWNSCALE_WORKERS, mp_context=context)
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._executor, _downscale, data, content_type, self.max_side)
+        except Exception as e:
+            raise ImageRejected(url, f"이미지를 열 수 없음 ({type(e).__name__})")
+        if result is None:
+            return data, content_type
+        self.stats["downscaled"] += 1
+        return result
+
+    def describe(self) -> str:
+        """디버그용 상태 문자열"""
+        s = self.stats
+        return (f"캐시 {len(self.cache)}개 {self.cache.total_bytes / 1024 / 1024:.1f}"
+                f"/{self.cache.max_bytes / 1024 / 1024:.0f}MB (삭제 {self.cache.evicted}개) / "
+                f"적중 {s['hits']} · 다운로드 {s['misses']} ({s['downloaded_bytes'] / 1024 / 1024:.1f}MB) · "
+                f"병합 {s['coalesced']} · 거부 {s['rejected']} (기억 중인 깨진 링크 {len(self._dead)}개) · "
+                f"축소 {s['downscaled'] if self.max_side else '사용 안 함'}")
+
+    async def close(self):
+        """진행 중인 다운로드 취소, 워커 프로세스 종료"""
+        for task in list(self._inflight.values()):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,54 +1,311 @@
 import logging
-import os
 import random
-import requests
+import time
+import asyncio
+import aiohttp
 import discord
-from discord.ext import tasks, commands
-from dotenv import load_dotenv
-from datetime import datetime
-
-# 환경 변수 로드
-load_dotenv()
-DISCORD_CHANNEL_ID = int(os.getenv("DISCORD_CHANNEL_ID"))
+from collections import deque
+from itertools import islice
+from discord.ext import commands
+from typing import Awaitable, Callable, Deque, List, Optional, Set, Tuple
+from config import IMGCRAWL_NO_REPEAT_WINDOW
+from config import IMGCRAWL_PROXY, IMGCRAWL_CACHE_DIR, IMGCRAWL_CACHE_BYTES, IMGCRAWL_MAX_IMAGE_BYTES, IMGCRAWL_MAX_SIDE
+from dispatcher import get_dispatcher
+from http_client import get_http_client
+from image_proxy import CachedImage, ImageProxy, ImageRejected
+from resilience import CircuitOpenError
+from scheduler import get_scheduler
+from subscriptions import get_subscriptions
 
 # ✅ API 엔드포인트
 COUNT_API_URL = "https://nenekomashiro.com/image/list/count?code=999&search="
 POST_API_URL = "https://nenekomashiro.com/image/post?page={}&perPage=30&sort=0&code=999&search="
 IMAGE_BASE_URL = "https://nenekomashiro.com/"
+PER_PAGE = 30
+
+# HTTP 서비스 이름
+HTTP_SERVICE = "nenekomashiro"
+
+# 매일 10시 자동 전송 (cron 형식, 한국 시간)
+DAILY_JOB_NAME = "imgcrawl.daily"
+DAILY_JOB_CRON = "0 10 * * *"
+
+# 필요한 게이트웨이 intents (구독 채널 조회)
+REQUIRED_INTENTS = ("guilds",)
+
+# ✅ 이미지 풀 설정
+POOL_LOW_WATER = 10        # 이 개수 아래로 내려가면 백그라운드 보충
+POOL_TARGET = 60           # 보충 시 채울 목표 개수
+COUNT_CACHE_TTL = 3600     # 전체 이미지 수 캐시 시간(초)
+REFILL_RETRY_DELAY = 30    # 보충 실패 시 재시도 대기(초)
+
+# ✅ 이미지 프록시 설정 (IMGCRAWL_PROXY=1 일 때)
+PROXY_MAX_ATTEMPTS = 5                      # 깨진 링크를 건너뛰며 시도할 최대 이미지 수
+PREFETCH_COUNT = 2                          # 다음에 나갈 이미지를 미리 받아 두는 수
+INSTANT_UPLOAD_MAX_BYTES = 2 * 1024 * 1024  # 캐시에 있는 이 크기 이하 이미지는 defer 없이 바로 첨부
+IMAGE_ACTION = "imgcrawl.image"             # 구독 채널별 첨부 전송 작업 (클러스터에서는 각 프로세스가 자기 채널로)
+
+
+class ImagePool:
+    """미리 받아둔 랜덤 이미지 URL 풀 (페이지 단위로 보충)"""
+
+    def __init__(self, fetch_count: Callable[[], Awaitable[int]],
+                 fetch_page: Callable[[int], Awaitable[List[str]]],
+                 low_water: int = POOL_LOW_WATER, target: int = POOL_TARGET,
+                 count_ttl: float = COUNT_CACHE_TTL, no_repeat_window: int = IMGCRAWL_NO_REPEAT_WINDOW):
+        self._fetch_count = fetch_count
+        self._fetch_page = fetch_page
+        self.low_water = low_water
+        self.target = max(target, low_water + 1)
+        self.count_ttl = count_ttl
+        self._urls: Deque[str] = deque()
+        self._recent: Deque[str] = deque(maxlen=no_repeat_window)
+        self._recent_set: Set[str] = set()
+        self._used_pages: Set[int] = set()
+        self._total_images: Optional[int] = None
+        self._total_time: float = 0.0
+        self._refill_task: Optional[asyncio.Task] = None
+        self._last_refill_error: float = -REFILL_RETRY_DELAY
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    async def get_total_pages(self) -> int:
+        """전체 페이지 수 (TTL 캐시)"""
+        now = time.monotonic()
+        if self._total_images is None or now - self._total_time >= self.count_ttl:
+            self._total_images = await self._fetch_count()
+            self._total_time = now
+            self._fit_window(self._total_images)
+        return (self._total_images // PER_PAGE) + 1 if self._total_images else 0
+
+    def _fit_window(self, total_images: int):
+        """전체 이미지가 적으면 중복 방지 범위를 절반으로 축소"""
+        limit = max(total_images // 2, 1)
+        if self._recent.maxlen > limit:
+            self._recent = deque(self._recent, maxlen=limit)
+            self._recent_set = set(self._recent)
+
+    def _pick_page(self, total_pages: int) -> int:
+        """아직 사용하지 않은 페이지 중 하나를 무작위로 선택"""
+        if len(self._used_pages) >= total_pages:
+            self._used_pages.clear()
+        while True:
+            page = random.randint(1, total_pages)
+            if page not in self._used_pages:
+                self._used_pages.add(page)
+                return page
+
+    def _remember(self, url: str):
+        """최근 전송 목록에 기록"""
+        if not self._recent.maxlen:
+            return
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_set.discard(self._recent[0])
+        self._recent.append(url)
+        self._recent_set.add(url)
+
+    async def refill(self):
+        """목표 개수까지 페이지 단위로 보충"""
+        total_pages = await self.get_total_pages()
+        if total_pages == 0:
+            return
+
+        before = len(self._urls)
+        attempts = 0
+        while len(self._urls) < self.target and attempts < total_pages:
+            attempts += 1
+            page = self._pick_page(total_pages)
+            urls = [u for u in await self._fetch_page(page) if u not in self._recent_set]
+            random.shuffle(urls)
+            self._urls.extend(urls)
+
+        if len(self._urls) == before:
+            raise ValueError("새로 가져온 이미지가 없습니다")
+        logging.info(f"✅ 이미지 풀 보충 완료: {len(self._urls)}개")
+
+    async def _refill_safely(self):
+        try:
+            await self.refill()
+        except CircuitOpenError as e:
+            self._last_refill_error = time.monotonic()
+            logging.debug(f"이미지 풀 보충 건너뜀: {e}")
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            self._last_refill_error = time.monotonic()
+            logging.error(f"❌ 이미지 풀 보충 중 오류 발생: {e}")
+
+    def ensure_refill(self):
+        """풀이 부족하면 백그라운드 보충 시작 (인터랙션 경로를 막지 않음)"""
+        if len(self._urls) >= self.low_water:
+            return
+        if self._refill_task and not self._refill_task.done():
+            return
+        if time.monotonic() - self._last_refill_error < REFILL_RETRY_DELAY:
+            return
+        self._refill_task = asyncio.create_task(self._refill_safely())
+
+    def peek(self, count: int) -> List[str]:
+        """다음에 꺼낼 이미지 URL 미리 보기 (꺼내지 않음)"""
+        return list(islice(self._urls, count))
+
+    def get_nowait(self) -> Optional[str]:
+        """메모리에서 바로 이미지 하나 꺼내기 (없으면 None)"""
+        url = None
+        while self._urls:
+            candidate = self._urls.popleft()
+            if candidate not in self._recent_set:
+                url = candidate
+                break
+        if url:
+            self._remember(url)
+        self.ensure_refill()
+        return url
+
+    async def get(self) -> Optional[str]:
+        """이미지 하나 꺼내기 (풀이 비어 있으면 보충을 기다림)"""
+        url = self.get_nowait()
+        if url is None and self._refill_task:
+            await asyncio.shield(self._refill_task)
+            url = self.get_nowait()
+        return url
+
+    def close(self):
+        """진행 중인 보충 작업 취소"""
+        if self._refill_task and not self._refill_task.done():
+            self._refill_task.cancel()
+
 
 class Imgcrawl(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.send_random_image.start()
+        self.http = get_http_client(bot)
+        self.subscriptions = get_subscriptions(bot)
+        self.http.register_service(HTTP_SERVICE, timeout=10)
+        self.breaker = self.http.breaker(HTTP_SERVICE)
+        self.pool = ImagePool(self.fetch_image_count, self.fetch_image_page)
+        self.scheduler = get_scheduler(bot)
+        self.dispatcher = get_dispatcher(bot)
+        self.proxy: Optional[ImageProxy] = None
+        if IMGCRAWL_PROXY:
+            self.proxy = ImageProxy(self.http, HTTP_SERVICE, IMGCRAWL_CACHE_DIR, IMGCRAWL_CACHE_BYTES,
+                                    max_image_bytes=IMGCRAWL_MAX_IMAGE_BYTES, max_side=IMGCRAWL_MAX_SIDE)
+            self.subscriptions.register_action(IMAGE_ACTION, self._send_cached_image)
+
+    async def cog_load(self):
+        """Cog 로드 시 이미지 풀 미리 채우고 매일 전송 작업 등록"""
+        if self.proxy:
+            await self.proxy.start()
+        self.pool.ensure_refill()
+        self.scheduler.add_job(DAILY_JOB_NAME, DAILY_JOB_CRON, self.send_random_image)
+
+    async def cog_unload(self):
+        """Cog 언로드 시 태스크 정리"""
+        self.scheduler.remove_job(DAILY_JOB_NAME)
+        self.pool.close()
+        if self.proxy:
+            await self.proxy.close()
+
+    async def fetch_image_count(self) -> int:
+        """전체 이미지 수 조회"""
+        async with self.http.get(HTTP_SERVICE, COUNT_API_URL, raise_for_status=True) as response:
+            return int((await response.text()).strip())
+
+    async def fetch_image_page(self, page: int) -> List[str]:
+        """한 페이지의 이미지 URL 목록 조회"""
+        async with self.http.get(HTTP_SERVICE, POST_API_URL.format(page), raise_for_status=True) as response:
+            images = (await response.json(content_type=None)).get("post", [])
+        return [IMAGE_BASE_URL + img["src"] for img in images if img.get("src")]
 
     # ✅ 랜덤 이미지 가져오기
-    async def get_random_image(self):
+    async def get_random_image(self) -> Optional[str]:
         try:
-            response = requests.get(COUNT_API_URL, timeout=10)
-            response.raise_for_status()
-            total_images = int(response.text.strip())
-            if total_images == 0:
+            return await self.pool.get()
+        except asyncio.TimeoutError:
+            logging.error("❌ 크롤링 중 오류 발생: 요청 타임아웃")
+            return None
+        except CircuitOpenError as e:
+            logging.warning(f"⚠️ 이미지 서버 차단 중: {e}")
+            return None
+        except (aiohttp.ClientError, ValueError) as e:
+            logging.error(f"❌ 크롤링 중 오류 발생: {e}")
+            return None
+
+    # ✅ 프록시 모드: 링크 대신 검증한 이미지 파일
+    async def get_random_upload(self, url: Optional[str] = None) -> Optional[Tuple[str, CachedImage]]:
+        """이미지를 받아 검증한 (URL, 캐시 파일) - 깨진 링크는 버리고 다음 이미지로"""
+        for _ in range(PROXY_MAX_ATTEMPTS):
+            url = url or await self.get_random_image()
+            if url is None:
                 return None
+            try:
+                image = await self.proxy.fetch(url)
+            except CircuitOpenError as e:
+                logging.warning(f"⚠️ 이미지 서버 차단 중: {e}")
+                return None
+            except ImageRejected as e:
+                logging.warning(f"⚠️ 올릴 수 없는 이미지 건너뜀 - {e}")
+                url = None
+                continue
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.warning(f"⚠️ 이미지 다운로드 실패, 다음 이미지로: {e or type(e).__name__}")
+                url = None
+                continue
+            self.proxy.prefetch(self.pool.peek(PREFETCH_COUNT))
+            return url, image
+        logging.error(f"❌ 이미지 {PROXY_MAX_ATTEMPTS}개를 연달아 받지 못했습니다.")
+        return None
 
-            total_pages = (total_images // 30) + 1
-            random_page = random.randint(1, total_pages)
+    async def _send_cached_image(self, channel, payload: dict) -> bool:
+        """구독 채널 하나에 이미지 첨부 전송 (같은 URL 은 캐시에서 한 번만 받음)"""
+        # 대기열에서 차례를 기다리는 동안 캐시 정리로 파일이 지워지지 않도록 전송이 끝날 때까지 고정
+        async with self.proxy.hold(payload["url"]) as image:
+            await self.dispatcher.send(channel, attachment=(image.path, image.filename))
+        return True
 
-            post_response = requests.get(POST_API_URL.format(random_page), timeout=10)
-            post_response.raise_for_status()
-            images = post_response.json().get("post", [])
-            if not images:
-                return None
+    async def _imgcrawl_proxied(self, interaction: discord.Interaction):
+        url = self.pool.get_nowait()
+        image = self.proxy.cached(url) if url else None
+        # 캐시에 있는 작은 이미지는 업스트림 요청 없이 defer 없이 바로 첨부
+        if image and image.size <= INSTANT_UPLOAD_MAX_BYTES:
+            await interaction.response.send_message(file=image.to_file())
+            self.proxy.prefetch(self.pool.peek(PREFETCH_COUNT))
+            return
 
-            random_img_data = random.choice(images)
-            return IMAGE_BASE_URL + random_img_data["src"]
-        except requests.exceptions.RequestException as e:
-            logging.error(f"❌ 크롤링 중 오류 발생: {e}")
-            return None
+        if image is None and self.breaker.is_open:
+            await interaction.response.send_message(
+                f"⏳ 이미지 서버가 응답하지 않아 잠시 요청을 멈췄습니다. "
+                f"약 {max(self.breaker.retry_in, 1):.0f}초 후 다시 시도해 주세요.", ephemeral=True)
+            return
+
+        await interaction.response.defer()
+        resolved = await self.get_random_upload(url)
+        if resolved:
+            async with self.proxy.hold(resolved[0]) as image:
+                await interaction.followup.send(file=image.to_file())
+        else:
+            await interaction.followup.send("❌ 이미지를 찾을 수 없습니다.")
 
     # ✅ /imgcrawl 슬래시 명령어
     @discord.app_commands.command(name="imgcrawl", description="네코마시로 사이트에서 랜덤 이미지를 가져옵니다")
     async def imgcrawl(self, interaction: discord.Interaction):
         """네코마시로 사이트에서 전체 이미지 중 랜덤으로 1개 가져오기"""
+        if self.proxy:
+            await self._imgcrawl_proxied(interaction)
+            return
+
+        # 풀에 이미지가 있으면 defer 없이 바로 응답
+        image_url = self.pool.get_nowait()
+        if image_url:
+            await interaction.response.send_message(image_url)
+            return
+
+        # 풀이 비었는데 이미지 서버가 차단 중이면 기다리게 하지 않고 바로 안내
+        if self.breaker.is_open:
+            await interaction.response.send_message(
+                f"⏳ 이미지 서버가 응답하지 않아 잠시 요청을 멈췄습니다. "
+                f"약 {max(self.breaker.retry_in, 1):.0f}초 후 다시 시도해 주세요.", ephemeral=True)
+            return
+
         await interaction.response.defer()
 
         image_url = await self.get_random_image()
@@ -57,18 +314,26 @@ class Imgcrawl(commands.Cog):
         else:
             await interaction.followup.send("❌ 이미지를 찾을 수 없습니다.")
 
-    # ✅ 매일 10시에 자동으로 이미지 보내기
-    @tasks.loop(minutes=1)
+    # ✅ 매일 10시에 자동으로 이미지 보내기 (스케줄러가 호출)
     async def send_random_image(self):
         await self.bot.wait_until_ready()
-        now = datetime.now()
-        if now.hour == 10 and now.minute == 0:
-            logging.info("🔔 10시가 되어 이미지 전송을 시작합니다.")
-            channel = self.bot.get_channel(DISCORD_CHANNEL_ID)
-            if channel:
-                image_url = await self.get_random_image()
-                if image_url:
-                    await channel.send(image_url)
+        logging.info("🔔 10시가 되어 이미지 전송을 시작합니다.")
+        if not self.subscriptions.has_subscribers("image"):
+            return
+        # 프록시 모드: 한 번 받아 검증한 이미지를 채널마다 첨부 (깨진 링크는 채널에 나가지 않음)
+        if self.proxy:
+            resolved = await self.get_random_upload()
+            if resolved:
+                result = await self.subscriptions.run_action("image", IMAGE_ACTION, {"url": resolved[0]},
+                                                             label="매일 이미지")
+                logging.info(f"✅ 매일 이미지 첨부 전송 완료: {result}")
+            return
+
+        # 이미지는 한 장만 골라 구독 채널 전체에 같은 이미지를 보냄
+        image_url = await self.get_random_image()
+        if image_url:
+            result = await self.subscriptions.deliver("image", image_url, label="매일 이미지")
+            logging.info(f"✅ 매일 이미지 전송 완료: {result}")
 
 # ✅ Cog 등록
 async def setup(bot):
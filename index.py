@@ -1,65 +1,71 @@
 # index.py
+import time
+from startup import StartupTimeline
+
+# ✅ 시작 단계별 소요 시간 (무거운 import 전에 기준점 기록)
+startup = StartupTimeline()
+
 import logging
 import discord
-import os
-import time
 import sys
 import asyncio
+from discord import app_commands
 from discord.ext import commands
-from dotenv import load_dotenv
-
-# 로깅 설정을 먼저 구성 - 콘솔과 파일에 모두 로깅
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("bot.log", encoding="utf-8"),
-        logging.StreamHandler()
-    ]
-)
-
-# 외부 라이브러리 로그 레벨 조정
-logging.getLogger('discord').setLevel(logging.WARNING)
-logging.getLogger('discord.http').setLevel(logging.WARNING)
-logging.getLogger('aiohttp').setLevel(logging.WARNING)
-logging.getLogger('googleapiclient').setLevel(logging.WARNING)
+from http_client import HttpClient
+from scheduler import JobScheduler
+from state_store import StateStore
+from command_sync import sync_command_tree
+from dispatcher import Dispatcher
+from metrics import MetricsServer, install_bot_metrics, instrument_cog_loops
+from log_pipeline import LogPipeline
+
+# 로깅 설정을 먼저 구성 - 로그는 큐에 쌓이고 별도 스레드가 파일(순환)과 콘솔에 기록
+# (설정을 읽기 전 로그도 큐에 남아 있다가 start() 때 기록됨)
+log_pipeline = LogPipeline()
 
 logger = logging.getLogger(__name__)
 
-# 환경 변수 로드
-load_dotenv()
-DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
-
-# 토큰 체크
-if not DISCORD_TOKEN:
-    logger.critical("❌ DISCORD_TOKEN 환경 변수가 설정되지 않았습니다.")
+# 환경 변수 로드 (.env 는 config.py 에서 한 번만 읽음 - 로깅 설정 뒤에 import)
+try:
+    from config import (DISCORD_TOKEN, DISCORD_DEV_GUILD_ID, COMMAND_SYNC_FORCE, METRICS_HOST, METRICS_PORT,
+                        FANOUT_CONCURRENCY, CLUSTER_SHARD_COUNT, CLUSTER_SHARD_IDS, CLUSTER_NODE_ID,
+                        CLUSTER_LOCK_FILE, CLUSTER_SOCKET, GATEWAY_PROFILE, GATEWAY_MAX_MESSAGES,
+                        LOG_FILE, LOG_LEVEL, LOG_FORMAT, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_RATE_LIMIT_SECONDS)
+except ValueError:
+    log_pipeline.start()
+    logger.critical("❌ DISCORD_TOKEN 등 필수 환경 변수가 설정되지 않았습니다.")
+    log_pipeline.stop()
     sys.exit(1)
 
-# ✅ `commands.Bot` 사용
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
-intents.guilds = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+from subscriptions import get_subscriptions
+from cluster import ClusterNode
+import gateway_profile
+
+# 기본 확장 모듈 (서로 의존하지 않으므로 동시에 로드)
+EXTENSIONS = ["subscriptions", "schedule", "imgcrawl", "twitter", "youtube", "diagnostics"]
+
+async def load_extension_timed(bot: commands.Bot, ext: str) -> bool:
+    """확장 모듈 하나 로드 (소요 시간 기록)"""
+    if ext in bot.extensions:
+        logger.info(f"⚠️ {ext}.py 이미 로드되어 건너뜁니다.")
+        return True
+
+    started = time.perf_counter()
+    try:
+        await bot.load_extension(ext)
+        logger.info(f"✅ {ext}.py 로드 완료")
+        return True
+    except Exception as e:
+        logger.error(f"❌ {ext}.py 로드 실패: {e}")
+        return False
+    finally:
+        startup.detail("extensions", ext, time.perf_counter() - started)
 
 # ✅ 확장 로드 (비동기 방식 적용)
-async def load_extensions():
-    # 기본 확장 모듈
-    extensions = ["schedule", "imgcrawl", "twitter", "youtube"]  # "youtube" 추가
-
-    # 확장 모듈 로드 시도
-    failed_extensions = []
-    for ext in extensions:
-        if ext in bot.extensions:
-            logger.info(f"⚠️ {ext}.py 이미 로드되어 건너뜁니다.")
-            continue
-
-        try:
-            await bot.load_extension(ext)
-            logger.info(f"✅ {ext}.py 로드 완료")
-        except Exception as e:
-            failed_extensions.append(ext)
-            logger.error(f"❌ {ext}.py 로드 실패: {e}")
+async def load_extensions(bot: commands.Bot):
+    # 모듈 import 는 순서대로 실행되지만 setup/cog_load 의 대기 구간(DB 열기, 서버 시작 등)은 겹쳐서 진행
+    results = await asyncio.gather(*(load_extension_timed(bot, ext) for ext in EXTENSIONS))
+    failed_extensions = [ext for ext, ok in zip(EXTENSIONS, results) if not ok]
 
     # 실패한 모듈이 있는 경우 경고
     if failed_extensions:
@@ -67,45 +73,20 @@ async def load_extensions():
         return False
     return True
 
-@bot.event
-async def setup_hook():
-    """봇이 로그인하기 전에 확장 모듈을 한 번만 로드"""
-    success = await load_extensions()
-    if success:
-        logger.info("✅ 모든 확장 모듈이 성공적으로 로드되었습니다.")
-
-@bot.event
-async def on_ready():
-    """봇이 준비되었을 때 실행"""
-    logger.info(f"✅ Bot logged in as {bot.user}")
-
-    # 슬래시 명령어 동기화 (재연결 시에도 실행)
+# 운영자용: 슬래시 명령어 강제 동기화 (!sync 또는 !sync global)
+@commands.command(name="sync")
+@commands.is_owner()
+async def sync_commands(ctx, scope: str = ""):
+    """명령어 트리 강제 동기화"""
+    guild_id = 0 if scope == "global" else DISCORD_DEV_GUILD_ID
     try:
-        await bot.tree.sync()
-        logger.info("✅ Slash commands synced")
-    except Exception as e:
-        logger.error(f"❌ Slash commands sync 실패: {e}")
-
-@bot.event
-async def on_error(event, *args, **kwargs):
-    """에러 발생 시 로깅"""
-    logger.error(f"❌ 이벤트 '{event}'에서 오류 발생", exc_info=True)
-
-@bot.event
-async def on_command_error(ctx, error):
-    """명령어 에러 핸들링"""
-    if isinstance(error, commands.CommandNotFound):
-        return  # 존재하지 않는 명령어는 무시
-    elif isinstance(error, commands.MissingRequiredArgument):
-        await ctx.send("❌ 필수 인수가 누락되었습니다.")
-    elif isinstance(error, commands.BadArgument):
-        await ctx.send("❌ 잘못된 인수입니다.")
-    else:
-        logger.error(f"❌ 명령어 '{ctx.command}' 실행 중 오류: {error}", exc_info=True)
-        await ctx.send("❌ 명령어 실행 중 오류가 발생했습니다.")
+        await sync_command_tree(ctx.bot, force=True, guild_id=guild_id)
+        await ctx.send(f"✅ Slash commands 동기화 완료 ({'길드 ' + str(guild_id) if guild_id else '전역'})")
+    except discord.HTTPException as e:
+        await ctx.send(f"❌ 동기화 실패: {e}")
 
 # 기본 슬래시 명령어 정의
-@bot.tree.command(name="ping", description="봇의 응답 시간을 확인합니다")
+@app_commands.command(name="ping", description="봇의 응답 시간을 확인합니다")
 async def ping(interaction: discord.Interaction):
     """Ping 테스트"""
     start_time = time.monotonic()
@@ -114,9 +95,133 @@ async def ping(interaction: discord.Interaction):
     latency = round((end_time - start_time) * 1000)
     await interaction.edit_original_response(content=f"🏓 Pong! ({latency}ms)")
 
+@app_commands.command(name="http_stats", description="공유 HTTP 커넥션 풀 사용 현황을 확인합니다")
+async def http_stats(interaction: discord.Interaction):
+    """HTTP 커넥션 풀 통계"""
+    bot = interaction.client
+    image_proxy = getattr(bot.get_cog("Imgcrawl"), "proxy", None)
+    await interaction.response.send_message(
+        f"**HTTP 커넥션 풀**\n{bot.http_client.format_stats()}\n\n**디스코드 발신 대기열**\n{bot.dispatcher.describe()}"
+        f"\n\n**피드 구독**\n{bot.subscriptions.describe()}\n\n**클러스터**\n{bot.cluster.describe()}"
+        f"\n\n**게이트웨이**\n{gateway_profile.describe(bot, GATEWAY_PROFILE)}"
+        f"\n\n**외부 서비스 서킷 브레이커**\n{bot.http_client.format_breakers() or '없음'}"
+        f"\n\n**이미지 프록시**\n{image_proxy.describe() if image_proxy else '사용 안 함'}"
+    )
+
+@app_commands.command(name="startup_stats", description="봇 시작 단계별 소요 시간을 확인합니다")
+async def startup_stats(interaction: discord.Interaction):
+    """시작 단계별 소요 시간"""
+    details = startup.format_details()
+    await interaction.response.send_message(
+        f"**시작 소요 시간**\n{startup.format()}" + (f"\n{details}" if details else "")
+    )
+
+def create_bot() -> commands.Bot:
+    """봇 객체와 공유 자원을 만들고 이벤트/명령어 등록 (연결은 하지 않음)
+
+    모듈 import 만으로는 아무것도 만들지 않음 - 이미지 축소 워커(forkserver/spawn)가 이 모듈을
+    __mp_main__ 으로 다시 import 해도 봇/상태 저장소/메트릭 서버가 두 번 생기지 않음
+    """
+    # ✅ `commands.Bot` 사용 (intents / 멤버·메시지 캐시는 게이트웨이 프로필에 따라)
+    options = gateway_profile.bot_options(GATEWAY_PROFILE, EXTENSIONS, max_messages=GATEWAY_MAX_MESSAGES)
+    if CLUSTER_SHARD_COUNT:
+        # 샤딩: CLUSTER_SHARD_IDS 가 없으면 모든 샤드를 이 프로세스에서, 있으면 그 샤드만 (나머지는 다른 프로세스)
+        bot = commands.AutoShardedBot(**options, shard_count=CLUSTER_SHARD_COUNT, shard_ids=CLUSTER_SHARD_IDS or None)
+    else:
+        bot = commands.Bot(**options)
+    gateway_profile.apply_profile(bot, GATEWAY_PROFILE)
+
+    # ✅ 모든 Cog가 공유하는 HTTP 커넥션 풀
+    bot.http_client = HttpClient()
+
+    # ✅ 재시작 후에도 유지되는 상태 저장소 (트윗/동영상 커서 등)
+    bot.state_store = StateStore()
+
+    # ✅ 채널 순서 보장 / 알림 묶음 / rate limit 재시도를 담당하는 발신 대기열
+    bot.dispatcher = Dispatcher(max_in_flight=FANOUT_CONCURRENCY)
+
+    # ✅ 길드별 피드 구독 목록 (이벤트 하나를 구독 채널 전체로 퍼뜨림)
+    bot.subscriptions = get_subscriptions(bot)
+
+    # ✅ 매일 정해진 시각에 실행되는 작업 스케줄러
+    bot.scheduler = JobScheduler(state=bot.state_store)
+
+    # ✅ 여러 프로세스로 샤드를 나눴을 때 폴링/예약 작업을 맡을 리더 선출 (단일 프로세스면 아무것도 안 함)
+    bot.cluster = ClusterNode(bot, CLUSTER_SHARD_IDS, CLUSTER_SHARD_COUNT, socket_path=CLUSTER_SOCKET,
+                              lock_path=CLUSTER_LOCK_FILE, node_id=CLUSTER_NODE_ID)
+
+    # ✅ Prometheus 메트릭 (외부 API 지연은 HttpClient, 반복 작업은 확장 로드 후 자동 계측)
+    install_bot_metrics(bot, bot.dispatcher)
+    bot.metrics_server = MetricsServer(host=METRICS_HOST, port=METRICS_PORT) if METRICS_PORT else None
+
+    bot.add_command(sync_commands)
+    for command in (ping, http_stats, startup_stats):
+        bot.tree.add_command(command)
+
+    @bot.event
+    async def setup_hook():
+        """봇이 로그인하기 전에 확장 모듈을 한 번만 로드"""
+        startup.mark("login")
+        await bot.state_store.open()
+        await bot.cluster.start()
+        success = await load_extensions(bot)
+        bot.cluster.apply_role()
+        instrument_cog_loops(bot)
+        startup.mark("extensions")
+
+        if bot.metrics_server:
+            try:
+                await bot.metrics_server.start()
+            except OSError as e:
+                logger.error(f"❌ 메트릭 엔드포인트 시작 실패: {e}")
+        if success:
+            logger.info("✅ 모든 확장 모듈이 성공적으로 로드되었습니다.")
+
+        # 슬래시 명령어 동기화 (스키마가 바뀐 경우에만 - 재연결 시에는 실행되지 않음, 클러스터에서는 리더만)
+        if bot.cluster.is_leader:
+            try:
+                await sync_command_tree(bot, force=COMMAND_SYNC_FORCE, guild_id=DISCORD_DEV_GUILD_ID)
+            except Exception as e:
+                logger.error(f"❌ Slash commands sync 실패: {e}")
+        startup.mark("command_sync")
+
+    @bot.event
+    async def on_ready():
+        """봇이 준비되었을 때 실행"""
+        logger.info(f"✅ Bot logged in as {bot.user}")
+        if not startup.completed:
+            startup.complete("gateway_ready")
+            logger.info(f"⏱️ 시작 소요 시간: {startup.format()}")
+
+    @bot.event
+    async def on_error(event, *args, **kwargs):
+        """에러 발생 시 로깅"""
+        logger.error(f"❌ 이벤트 '{event}'에서 오류 발생", exc_info=True)
+
+    @bot.event
+    async def on_command_error(ctx, error):
+        """명령어 에러 핸들링"""
+        if isinstance(error, commands.CommandNotFound):
+            return  # 존재하지 않는 명령어는 무시
+        elif isinstance(error, commands.MissingRequiredArgument):
+            await ctx.send("❌ 필수 인수가 누락되었습니다.")
+        elif isinstance(error, commands.BadArgument):
+            await ctx.send("❌ 잘못된 인수입니다.")
+        elif isinstance(error, commands.NotOwner):
+            await ctx.send("❌ 봇 소유자만 사용할 수 있는 명령어입니다.")
+        else:
+            logger.error(f"❌ 명령어 '{ctx.command}' 실행 중 오류: {error}", exc_info=True)
+            await ctx.send("❌ 명령어 실행 중 오류가 발생했습니다.")
+
+    return bot
+
 # ✅ 봇 실행
 async def main():
     """메인 실행 함수"""
+    log_pipeline.start(LOG_FILE, fmt=LOG_FORMAT, level=LOG_LEVEL, max_bytes=LOG_MAX_BYTES,
+                       backup_count=LOG_BACKUP_COUNT, rate_limit_seconds=LOG_RATE_LIMIT_SECONDS)
+    bot = create_bot()
+    startup.mark("imports")
     try:
         async with bot:
             await bot.start(DISCORD_TOKEN)
@@ -124,6 +229,15 @@ async def main():
         logger.critical("❌ 디스코드 로그인 실패: 토큰이 유효하지 않습니다.")
     except Exception as e:
         logger.critical(f"❌ 봇 실행 중 오류 발생: {e}")
+    finally:
+        await bot.cluster.close()
+        await bot.scheduler.close()
+        await bot.dispatcher.close()
+        if bot.metrics_server:
+            await bot.metrics_server.close()
+        await bot.http_client.close()
+        await bot.state_store.close()
+        log_pipeline.stop()
 
 if __name__ == "__main__":
     try:
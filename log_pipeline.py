@@ -0,0 +1,183 @@
+# log_pipeline.py
+import os
+import sys
+import json
+import time
+import queue
+import logging
+import threading
+import logging.handlers
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+# 기본 설정
+DEFAULT_LOG_FILE = "bot.log"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024   # 파일 하나 최대 10MB
+DEFAULT_BACKUP_COUNT = 5               # bot.log.1 ~ bot.log.5 까지 보관
+DEFAULT_RATE_LIMIT_SECONDS = 60.0      # 같은 경고/오류 줄은 이 시간 동안 한 번만 기록
+QUEUE_SIZE = 10_000                    # 기록 스레드가 밀리면 이 이상은 버림 (이벤트 루프를 막지 않음)
+MAX_TRACKED_MESSAGES = 1_000
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# JSON 형식에 그대로 옮겨 담는 extra 필드 (logger.info(..., extra={"command": ...}))
+STRUCTURED_FIELDS = ("cog", "command", "latency_ms", "user", "guild")
+
+# 외부 라이브러리 로그 레벨
+QUIET_LOGGERS = {"discord": logging.WARNING, "discord.http": logging.WARNING, "aiohttp": logging.WARNING}
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 하나씩 JSON 객체로 기록 (cog / command / latency_ms 등 extra 필드 포함)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in STRUCTURED_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RepeatFilter(logging.Filter):
+    """같은 경고/오류 줄이 window 초 안에 반복되면 버리고, 다음에 기록할 때 생략한 횟수를 덧붙임
+
+    매 주기마다 찍히는 "Rate Limit 초과" 같은 줄이 로그를 덮지 않게 하기 위함.
+    INFO 이하는 건드리지 않는다.
+    """
+
+    def __init__(self, window: float = DEFAULT_RATE_LIMIT_SECONDS, level: int = logging.WARNING):
+        super().__init__()
+        self.window = window
+        self.level = level
+        self.suppressed_total = 0
+        self._seen: Dict[Tuple[str, int, str], list] = {}   # key → [마지막 기록 시각, 생략 횟수]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.level or self.window <= 0:
+            return True
+
+        message = record.getMessage()
+        key = (record.name, record.levelno, message)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                self.suppressed_total += 1
+                return False
+
+            suppressed = entry[1] if entry else 0
+            if len(self._seen) >= MAX_TRACKED_MESSAGES:
+                self._evict(now)
+            self._seen[key] = [now, 0]
+
+        if suppressed:
+            record.msg = f"{message} (지난 {self.window:g}초 동안 {suppressed}회 반복 생략)"
+            record.args = None
+        return True
+
+    def _evict(self, now: float):
+        expired = [key for key, (at, _) in self._seen.items() if now - at >= self.window]
+        for key in expired:
+            del self._seen[key]
+        if len(self._seen) >= MAX_TRACKED_MESSAGES:
+            self._seen.clear()
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 버리는 QueueHandler (포맷은 기록 스레드에서)"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 기본 구현은 여기서 전체 포맷(예외 트레이스백 포함)을 하므로 메시지 합치기만 하고 나머지는 리스너로 미룸
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """루트 로거 → 큐 → 백그라운드 스레드(파일 순환 + 콘솔) 로깅
+
+    생성 즉시 루트 로거에 QueueHandler 를 달아 두므로 start() 전에 남긴 로그도 큐에 쌓였다가
+    start() 때 한꺼번에 기록된다. (config.py 를 읽기 전에 만들고, 설정을 읽은 뒤 start)
+    """
+
+    def __init__(self, level: int = logging.INFO, queue_size: int = QUEUE_SIZE):
+        self.queue: queue.Queue = queue.Queue(queue_size)
+        self.handler = _NonBlockingQueueHandler(self.queue)
+        self.repeat_filter = RepeatFilter()
+        self.handler.addFilter(self.repeat_filter)
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self.path: Optional[str] = None
+        self.format = "text"
+
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(level)
+        for name, quiet_level in QUIET_LOGGERS.items():
+            logging.getLogger(name).setLevel(quiet_level)
+
+    @property
+    def dropped(self) -> int:
+        return self.handler.dropped
+
+    def start(self, path: Optional[str] = DEFAULT_LOG_FILE, fmt: str = "text", level: Optional[str] = None,
+              max_bytes: int = DEFAULT_MAX_BYTES, backup_count: int = DEFAULT_BACKUP_COUNT,
+              rate_limit_seconds: float = DEFAULT_RATE_LIMIT_SECONDS, console: bool = True):
+        """기록 스레드 시작 (path 가 없으면 콘솔만)"""
+        if self.listener:
+            return
+        formatter = JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT)
+        handlers = []
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+        if console:
+            stream_handler = logging.StreamHandler(sys.stderr)
+            stream_handler.setFormatter(formatter)
+            handlers.append(stream_handler)
+
+        if level:
+            logging.getLogger().setLevel(level.upper())
+        self.repeat_filter.window = rate_limit_seconds
+        self.path = path
+        self.format = fmt
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self):
+        """남은 로그를 모두 기록하고 스레드 종료"""
+        if self.listener:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
@@ -0,0 +1,345 @@
+# metrics.py
+import re
+import time
+import asyncio
+import logging
+import functools
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+from resilience import STATE_VALUES
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 지연 시간 히스토그램 기본 구간(초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 메트릭 서버 기본 설정 (로컬에서만 수집)
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9108
+MAX_PENDING_INTERACTIONS = 1000
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 fn: Optional[Callable[[], object]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self.fn = fn
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _collect(self) -> Dict[LabelValues, float]:
+        """기록된 값, fn 이 있으면 수집할 때마다 fn 을 호출해서 읽은 값"""
+        if self.fn is None:
+            return self._values
+        try:
+            result = self.fn()
+        except Exception as e:
+            logger.debug(f"메트릭 {self.name} 수집 실패: {e}")
+            return {}
+        if result is None:
+            return {}
+        if isinstance(result, dict):
+            # {라벨값 튜플(또는 단일 값): 값}
+            return {(key if isinstance(key, tuple) else (key,)): value for key, value in result.items()}
+        return {(): result}
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, tuple(map(str, key)))} {_format_value(value)}"
+                for key, value in sorted(self._collect().items())]
+
+
+class Counter(_Metric):
+    """단조 증가 카운터 (fn 을 주면 다른 객체가 세고 있는 누적 값을 수집할 때마다 읽음)"""
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """현재 값 (fn 을 주면 수집할 때마다 호출해서 값을 읽음)"""
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """누적 구간 히스토그램 (+ 합계/개수)"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * len(self.buckets)
+            self._sums[key] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key in sorted(self._counts):
+            cumulative = 0
+            for bound, count in zip(self.buckets, self._counts[key]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(self._sums[key])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭 모음 (같은 이름으로 다시 만들면 기존 것을 반환)"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"{name} 은 이미 다른 종류의 메트릭으로 등록되어 있습니다.")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                fn: Optional[Callable[[], object]] = None) -> Counter:
+        counter = self._get_or_create(Counter, name, documentation, labelnames)
+        if fn is not None:
+            counter.fn = fn
+        return counter
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              fn: Optional[Callable[[], object]] = None) -> Gauge:
+        gauge = self._get_or_create(Gauge, name, documentation, labelnames)
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식"""
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+# 봇 전체가 공유하는 기본 레지스트리와 공통 메트릭
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "bot_http_request_duration_seconds", "외부 API 요청 지연 (응답 헤더 수신까지)", ("service", "endpoint"))
+HTTP_RESPONSES = REGISTRY.counter(
+    "bot_http_responses_total", "외부 API 응답 수 (status=error 는 연결 실패/타임아웃)", ("service", "endpoint", "status"))
+LOOP_TICK_SECONDS = REGISTRY.histogram(
+    "bot_loop_tick_duration_seconds", "tasks.loop / 예약 작업 한 번 실행 시간", ("loop",))
+LOOP_TICKS = REGISTRY.counter(
+    "bot_loop_ticks_total", "tasks.loop / 예약 작업 실행 수", ("loop", "result"))
+LOOP_SKIPPED = REGISTRY.counter(
+    "bot_loop_skipped_ticks_total", "실행이 주기보다 오래 걸려 건너뛴 주기 수", ("loop",))
+COMMAND_SECONDS = REGISTRY.histogram(
+    "bot_app_command_duration_seconds", "슬래시 명령어 수신부터 처리 완료까지", ("command", "result"))
+
+_ID_SEGMENT = re.compile(r"/(?:\d{3,}|UU[\w-]{22}|UC[\w-]{22})(?=/|$)")
+
+
+def endpoint_label(url) -> str:
+    """메트릭 라벨용 엔드포인트 (호스트 + 경로, 숫자/채널 ID 는 {id} 로 치환)"""
+    parts = urlsplit(str(url))
+    return f"{parts.netloc}{_ID_SEGMENT.sub('/{id}', parts.path) or '/'}"
+
+
+def observe_http(service: str, url, status, seconds: float):
+    """외부 API 요청 한 번 기록"""
+    endpoint = endpoint_label(url)
+    HTTP_REQUEST_SECONDS.observe(seconds, service=service, endpoint=endpoint)
+    HTTP_RESPONSES.inc(service=service, endpoint=endpoint, status=status)
+
+
+def _loop_interval(loop) -> Optional[float]:
+    seconds = (loop.seconds or 0) + (loop.minutes or 0) * 60 + (loop.hours or 0) * 3600
+    return seconds or None
+
+
+def instrument_loop(loop, name: str):
+    """tasks.Loop 한 개의 실행 시간/결과/건너뛴 주기 기록 (Cog 코드 수정 없이 감쌈)"""
+    if getattr(loop.coro, "__metrics_wrapped__", False):
+        return
+    original = loop.coro
+    interval = _loop_interval(loop)
+
+    @functools.wraps(original)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        result = "ok"
+        try:
+            return await original(*args, **kwargs)
+        except asyncio.CancelledError:
+            result = "cancelled"
+            raise
+        except Exception:
+            result = "error"
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            LOOP_TICK_SECONDS.observe(elapsed, loop=name)
+            LOOP_TICKS.inc(loop=name, result=result)
+            if interval and elapsed >= interval:
+                LOOP_SKIPPED.inc(int(elapsed // interval), loop=name)
+
+    wrapper.__metrics_wrapped__ = True
+    loop.coro = wrapper
+
+
+def instrument_cog_loops(bot):
+    """로드된 모든 Cog 의 tasks.Loop 계측"""
+    from discord.ext import tasks
+
+    for cog_name, cog in bot.cogs.items():
+        for attr in dir(type(cog)):
+            if isinstance(getattr(type(cog), attr, None), tasks.Loop):
+                instrument_loop(getattr(cog, attr), f"{cog_name}.{attr}")
+
+
+def install_bot_metrics(bot, dispatcher=None):
+    """게이트웨이 지연, 발신 대기열, 서킷 브레이커, 슬래시 명령어 지연 메트릭 연결"""
+    REGISTRY.gauge("bot_gateway_latency_seconds", "게이트웨이 heartbeat 지연",
+                   fn=lambda: bot.latency if bot.latency == bot.latency and bot.latency != float("inf") else None)
+    REGISTRY.gauge("bot_guilds", "참여 중인 길드 수", fn=lambda: len(bot.guilds))
+    if dispatcher is not None:
+        REGISTRY.gauge("bot_outbound_queue_messages", "전송 대기 중인 디스코드 메시지 수", fn=lambda: dispatcher.backlog)
+        REGISTRY.counter("bot_outbound_messages_total", "발신 대기열 누적 통계", ("result",),
+                         fn=lambda: dict(dispatcher.stats))
+
+    def _circuit_states():
+        # 공유 HTTP 클라이언트는 봇에 직접 넣거나 get_http_client 로 나중에 만들어질 수 있어 수집할 때마다 확인
+        client = getattr(bot, "http_client", None)
+        if client is None:
+            return None
+        return {name: STATE_VALUES[breaker.state] for name, breaker in client.breakers().items()}
+
+    REGISTRY.gauge("bot_upstream_circuit_state", "외부 서비스 서킷 브레이커 상태 (0=정상, 1=차단, 2=시험)",
+                   ("service",), fn=_circuit_states)
+
+    received: Dict[int, float] = {}
+
+    @bot.listen("on_interaction")
+    async def _metrics_interaction_received(interaction):
+        if len(received) >= MAX_PENDING_INTERACTIONS:
+            received.clear()
+        received[interaction.id] = time.perf_counter()
+
+    def _observe(interaction, command, result: str):
+        started = received.pop(interaction.id, None)
+        if started is not None:
+            name = getattr(command, "qualified_name", None) or "unknown"
+            elapsed = time.perf_counter() - started
+            COMMAND_SECONDS.observe(elapsed, command=name, result=result)
+            # JSON 로그 형식에서는 cog / command / latency_ms 필드로 기록됨
+            cog = getattr(getattr(command, "binding", None), "qualified_name", None)
+            logger.info(f"⏱️ /{name} {result} ({elapsed * 1000:.0f}ms)",
+                        extra={"cog": cog, "command": name, "latency_ms": round(elapsed * 1000, 1),
+                               "user": getattr(interaction.user, "id", None), "guild": interaction.guild_id})
+
+    @bot.listen("on_app_command_completion")
+    async def _metrics_command_completed(interaction, command):
+        _observe(interaction, command, "ok")
+
+    original_on_error = bot.tree.on_error
+
+    async def on_tree_error(interaction, error):
+        _observe(interaction, interaction.command, "error")
+        await original_on_error(interaction, error)
+
+    bot.tree.on_error = on_tree_error
+
+
+class MetricsServer:
+    """Prometheus 가 수집해 가는 /metrics HTTP 엔드포인트"""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    async def start(self):
+        from aiohttp import web
+
+        async def handle_metrics(request):
+            return web.Response(text=self.registry.render(), content_type="text/plain", charset="utf-8",
+                                headers={"X-Content-Type-Options": "nosniff"})
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"✅ 메트릭 엔드포인트 시작: http://{self.host}:{self.port}/metrics")
+
+    async def close(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
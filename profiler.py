@@ -0,0 +1,143 @@
+# profiler.py
+import os
+import sys
+import time
+import asyncio
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# 샘플링 설정
+SAMPLE_INTERVAL = 0.005      # 5ms 마다 한 번 (루프 스레드는 멈추지 않고 다른 스레드에서 읽기만 함)
+MAX_STACK_DEPTH = 64
+IDLE_FUNCTIONS = {"select", "poll", "epoll", "_run_once", "kqueue", "control"}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _cog_of(frames) -> Optional[str]:
+    """스택(바깥→안쪽)에서 가장 안쪽 Cog 이름"""
+    from discord.ext import commands
+
+    for frame in reversed(frames):
+        if frame.f_code.co_argcount:
+            self_obj = frame.f_locals.get("self")
+            if isinstance(self_obj, commands.Cog):
+                return self_obj.qualified_name
+    return None
+
+
+class SamplingProfiler:
+    """이벤트 루프 스레드를 별도 스레드에서 주기적으로 샘플링하는 프로파일러
+
+    collapsed stack(flamegraph.pl / speedscope 호환) 형식으로 결과를 만든다.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, loop: Optional[asyncio.AbstractEventLoop] = None,
+                 interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.loop = loop
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.by_cog: Counter = Counter()
+        self.by_task: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.started_at = 0.0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self._record(frame)
+
+    def _current_task_name(self) -> str:
+        if self.loop is None:
+            return "-"
+        try:
+            task = asyncio.current_task(self.loop)
+        except RuntimeError:
+            return "-"
+        if task is None:
+            return "-"
+        coro = task.get_coro()
+        return getattr(coro, "__qualname__", None) or task.get_name()
+
+    def _record(self, frame):
+        frames = []
+        while frame is not None and len(frames) < MAX_STACK_DEPTH:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()
+
+        self.samples += 1
+        innermost = frames[-1].f_code.co_name
+        if innermost in IDLE_FUNCTIONS and "selectors" in frames[-1].f_code.co_filename:
+            self.idle_samples += 1
+            self.stacks["<idle>"] += 1
+            return
+
+        self.stacks[";".join(_frame_label(f) for f in frames)] += 1
+        try:
+            cog = _cog_of(frames)
+        except Exception:
+            cog = None
+        self.by_cog[cog or "(봇 공통/라이브러리)"] += 1
+        self.by_task[self._current_task_name()] += 1
+
+    def collapsed(self) -> str:
+        """flamegraph 용 collapsed stack 텍스트"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def top_functions(self, limit: int = 10) -> List[Tuple[str, int, int]]:
+        """(함수, self 샘플, 포함 샘플) 상위 목록"""
+        own: Dict[str, int] = Counter()
+        inclusive: Dict[str, int] = Counter()
+        for stack, count in self.stacks.items():
+            if stack == "<idle>":
+                continue
+            labels = stack.split(";")
+            own[labels[-1]] += count
+            for label in set(labels):
+                inclusive[label] += count
+        ranked = sorted(own, key=lambda label: (own[label], inclusive[label]), reverse=True)[:limit]
+        return [(label, own[label], inclusive[label]) for label in ranked]
+
+    def summary(self, limit: int = 10) -> str:
+        """상위 함수 / Cog / 코루틴 요약"""
+        busy = self.samples - self.idle_samples
+        pct = lambda n, total: f"{n * 100 / total:.1f}%" if total else "0%"
+        lines = [f"샘플 {self.samples}개 ({self.elapsed:.1f}초, {self.interval * 1000:.0f}ms 간격) · "
+                 f"루프 사용률 {pct(busy, self.samples)}"]
+
+        lines.append("\n**Cog 별 (바쁜 샘플 기준)**")
+        for cog, count in self.by_cog.most_common(5):
+            lines.append(f"{cog}: {pct(count, busy)}")
+
+        lines.append("\n**코루틴 별**")
+        for task, count in self.by_task.most_common(5):
+            lines.append(f"`{task}`: {pct(count, busy)}")
+
+        lines.append(f"\n**상위 함수 {limit}개** (self / 포함)")
+        for label, own, inclusive in self.top_functions(limit):
+            lines.append(f"`{label}` {pct(own, busy)} / {pct(inclusive, busy)}")
+        return "\n".join(lines)
@@ -0,0 +1,184 @@
+# resilience.py
+import time
+import random
+import logging
+import aiohttp
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Mapping, Optional
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 서킷 브레이커 상태
+STATE_CLOSED = "closed"         # 정상 - 모든 요청 통과
+STATE_OPEN = "open"             # 차단 - 요청을 보내지 않고 바로 실패
+STATE_HALF_OPEN = "half_open"   # 시험 - 요청 하나만 보내 보고 결과에 따라 닫거나 다시 차단
+STATE_LABELS = {STATE_CLOSED: "정상", STATE_OPEN: "차단", STATE_HALF_OPEN: "시험 중"}
+STATE_VALUES = {STATE_CLOSED: 0, STATE_OPEN: 1, STATE_HALF_OPEN: 2}   # 메트릭용
+
+# 서킷 브레이커 기본 설정
+FAILURE_THRESHOLD = 5       # 연속 실패가 이만큼 쌓이면 차단
+RESET_TIMEOUT = 30.0        # 첫 차단 시간(초) - 다시 실패할 때마다 두 배
+MAX_RESET_TIMEOUT = 900.0   # 최대 차단 시간(초) - Retry-After 로 받은 시간은 제한하지 않음
+
+# 재시도 백오프 기본 설정
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """서킷 브레이커가 열려 있어 요청을 보내지 않음 (기존 ClientError 처리 경로를 그대로 탐)"""
+
+    def __init__(self, service: str, retry_in: float, reason: Optional[str] = None):
+        self.service = service
+        self.retry_in = retry_in
+        self.reason = reason
+        detail = f" - {reason}" if reason else ""
+        super().__init__(f"{service} 요청 차단 중 ({retry_in:.0f}초 후 재시도){detail}")
+
+
+def backoff(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """지터를 준 지수 백오프 (full jitter: 0 ~ min(cap, base * 2^attempt))"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_after_from_headers(headers: Optional[Mapping[str, str]], now: Optional[float] = None) -> Optional[float]:
+    """응답 헤더에서 다시 요청해도 되는 시점까지 남은 시간(초)
+
+    Retry-After (초 또는 HTTP 날짜), X-RateLimit-Reset-After (초, 디스코드),
+    x-rate-limit-reset (에포크 초, 트위터) 순서로 확인
+    """
+    if not headers:
+        return None
+    now = time.time() if now is None else now
+
+    value = headers.get("Retry-After")
+    if value:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(value).timestamp() - now, 0.0)
+            except (TypeError, ValueError):
+                pass
+
+    value = headers.get("X-RateLimit-Reset-After")
+    if value:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+
+    value = headers.get("x-rate-limit-reset")
+    if value:
+        try:
+            return max(float(value) - now, 0.0)
+        except ValueError:
+            pass
+    return None
+
+
+class CircuitBreaker:
+    """외부 서비스 하나의 서킷 브레이커 (closed → open → half_open → closed)"""
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT,
+                 max_reset_timeout: float = MAX_RESET_TIMEOUT, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._clock = clock
+        self._state = STATE_CLOSED
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self.failures = 0           # 연속 실패 수
+        self.consecutive_opens = 0  # 정상으로 돌아오기 전까지 연속 차단 수 (차단 시간 배수)
+        self.last_error: Optional[str] = None
+        self.stats: Dict[str, int] = {"opened": 0, "rejected": 0, "recovered": 0}
+
+    @property
+    def state(self) -> str:
+        """현재 상태 (차단 시간이 지나면 half_open)"""
+        if self._state == STATE_OPEN and self._clock() >= self._open_until:
+            self._state = STATE_HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """요청을 보내면 바로 차단되는 상태인지 (시험 요청이 진행 중인 half_open 포함)"""
+        state = self.state
+        return state == STATE_OPEN or (state == STATE_HALF_OPEN and self._probe_in_flight)
+
+    @property
+    def retry_in(self) -> float:
+        """다시 요청을 시도할 수 있을 때까지 남은 시간(초)"""
+        return max(self._open_until - self._clock(), 0.0) if self.state == STATE_OPEN else 0.0
+
+    def before_request(self):
+        """요청 전 확인 - 차단 중이면 CircuitOpenError"""
+        state = self.state
+        if state == STATE_CLOSED:
+            return
+        if state == STATE_HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            logger.info(f"🔎 {self.name} 서킷 브레이커 시험 요청")
+            return
+        self.stats["rejected"] += 1
+        raise CircuitOpenError(self.name, self.retry_in, self.last_error)
+
+    def release(self):
+        """시험 요청이 결과 없이 끝남 (취소 등) - 다음 요청이 다시 시험할 수 있게 함"""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        """요청 성공 - 차단 중이었다면 정상으로 복구"""
+        if self._state != STATE_CLOSED:
+            self.stats["recovered"] += 1
+            logger.info(f"✅ {self.name} 서킷 브레이커 복구 (연속 차단 {self.consecutive_opens}회 후)")
+        self._state = STATE_CLOSED
+        self._probe_in_flight = False
+        self.failures = 0
+        self.consecutive_opens = 0
+
+    def record_failure(self, reason: str, retry_after: Optional[float] = None):
+        """요청 실패 - 연속 실패가 임계값을 넘거나, 시험 요청이 실패하거나, 서버가 Retry-After 를 주면 차단"""
+        self.failures += 1
+        self.last_error = reason
+        if (self.state == STATE_HALF_OPEN or retry_after is not None
+                or self.failures >= self.failure_threshold):
+            self._open(reason, retry_after)
+
+    def trip(self, duration: float, reason: str):
+        """정해진 시간 동안 강제로 차단 (할당량 소진 등 응답 본문으로만 알 수 있는 경우)"""
+        self.last_error = reason
+        self._open(reason, duration)
+
+    def _open(self, reason: str, retry_after: Optional[float]):
+        self.consecutive_opens += 1
+        delay = min(self.max_reset_timeout, self.reset_timeout * (2 ** (self.consecutive_opens - 1)))
+        # 여러 프로세스/서비스가 같은 시점에 다시 몰리지 않도록 절반은 지터
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        if retry_after is not None:
+            # 서버가 알려 준 시점은 그대로 따르고 약간만 늦춤
+            delay = retry_after + random.uniform(0, 1)
+        was_open = self._state == STATE_OPEN
+        self._state = STATE_OPEN
+        self._open_until = max(self._open_until, self._clock() + delay) if was_open else self._clock() + delay
+        self._probe_in_flight = False
+        self.stats["opened"] += 1
+        logger.warning(f"⛔ {self.name} 서킷 브레이커 차단 {self.retry_in:.0f}초 - {reason}")
+
+    def describe(self) -> str:
+        """디버그용 상태 문자열"""
+        state = self.state
+        text = STATE_LABELS[state]
+        if state == STATE_OPEN:
+            text += f" ({self.retry_in:.0f}초 후 재시도, 연속 차단 {self.consecutive_opens}회)"
+        elif state == STATE_HALF_OPEN:
+            text += " (시험 요청 진행 중)" if self._probe_in_flight else " (다음 요청으로 시험)"
+        else:
+            text += f" (연속 실패 {self.failures}/{self.failure_threshold})"
+        if self.last_error and state != STATE_CLOSED:
+            text += f" · 마지막 오류: {self.last_error}"
+        return text + f" · 차단 {self.stats['opened']}회 / 거절 {self.stats['rejected']}회"
@@ -1,99 +1,199 @@
 import logging
-import requests
+import hashlib
 import discord
 import asyncio
 import aiohttp
-from discord.ext import tasks, commands
+from discord.ext import commands
 from datetime import datetime, timedelta
-from config import DISCORD_CHANNEL_ID
+from config import SCHEDULE_LIVE_BOARD
+from http_client import get_http_client
+from dispatcher import PRIORITY_HIGH, get_dispatcher
+from scheduler import get_scheduler, CATCH_UP_SKIP
+from state_store import get_state_store
+from subscriptions import get_subscriptions
+from cache import AsyncTTLCache
+from resilience import CircuitOpenError
 from typing import Dict, List, Optional
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
+# 필요한 게이트웨이 intents (구독 채널 조회)
+REQUIRED_INTENTS = ("guilds",)
+
 # API 엔드포인트
 STELLARS_API_URL = "https://stellight.fans/api/v1/stellars"
 SCHEDULES_API_URL = "https://stellight.fans/api/v1/schedules?startDateTimeAfter={}&startDateTimeBefore={}"
 
 # 캐시 설정
-CACHE_TIMEOUT = 3600  # 1시간
+CACHE_TIMEOUT = 3600            # 스텔라 정보: 1시간
+SCHEDULE_CACHE_TIMEOUT = 300    # 일정: 5분
+STALE_TIMEOUT = 3600            # 만료 후에도 갱신하는 동안 오래된 값을 제공하는 시간
+NEGATIVE_CACHE_TIMEOUT = 30     # API 오류를 기억해 재요청을 막는 시간
+STELLARS_CACHE_KEY = "stellars"
+
+# HTTP 서비스 이름
+HTTP_SERVICE = "stellight"
+
+# 매일 10시 자동 전송 (cron 형식, 한국 시간)
+DAILY_JOB_NAME = "schedule.daily"
+DAILY_JOB_CRON = "0 10 * * *"
+
+# 라이브 보드: 5분마다 조건부 요청으로 일정을 확인하고 바뀐 경우에만 메시지 수정
+BOARD_JOB_NAME = "schedule.board"
+BOARD_JOB_CRON = "*/5 * * * *"
+BOARD_STATE_NAMESPACE = "schedule_board"
+BOARD_ACTION = "schedule.board"   # 구독 채널별 보드 갱신 작업 (클러스터에서는 각 프로세스가 자기 채널을 갱신)
+MESSAGE_LIMIT = 2000            # 디스코드 메시지 최대 길이
+
+
+def split_message(text: str, limit: int = MESSAGE_LIMIT) -> List[str]:
+    """줄 단위로 limit 글자 이하의 조각으로 나눔 (한 줄이 너무 길면 강제로 자름)"""
+    chunks: List[str] = []
+    current = ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        if len(current) + len(line) > limit:
+            chunks.append(current)
+            current = ""
+        current += line
+    if current or not chunks:
+        chunks.append(current)
+    return [chunk.rstrip("\n") or "\u200b" for chunk in chunks]
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
 
 class Schedule(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.stellars = {}  # 방송인 정보 캐시
-        self.stellars_cache_time = None
-        self.send_schedule.start()
+        self.http = get_http_client(bot)
+        self.dispatcher = get_dispatcher(bot)
+        self.subscriptions = get_subscriptions(bot)
+        self.http.register_service(HTTP_SERVICE, timeout=30)
+        self.breaker = self.http.breaker(HTTP_SERVICE)
+        self.cache = AsyncTTLCache("stellars", ttl=CACHE_TIMEOUT, stale_ttl=STALE_TIMEOUT,
+                                   negative_ttl=NEGATIVE_CACHE_TIMEOUT)
+        self.schedules_cache = AsyncTTLCache("schedules", ttl=SCHEDULE_CACHE_TIMEOUT, stale_ttl=STALE_TIMEOUT,
+                                             negative_ttl=NEGATIVE_CACHE_TIMEOUT, max_entries=14)
+        self.scheduler = get_scheduler(bot)
+        self.store = get_state_store(bot)
+        self.live_board = SCHEDULE_LIVE_BOARD
+        # 날짜별 조건부 요청 검증값 (ETag / Last-Modified)
+        self._validators: Dict[str, Dict[str, str]] = {}
+        self.not_modified = 0
+        self._board_lock = asyncio.Lock()
+        self.subscriptions.register_action(BOARD_ACTION, self._apply_board)
+
+    async def cog_load(self):
+        """Cog 로드 시 매일 전송 작업 등록"""
+        self.scheduler.add_job(DAILY_JOB_NAME, DAILY_JOB_CRON, self.send_schedule)
+        if self.live_board:
+            await self.store.open()
+            self.scheduler.add_job(BOARD_JOB_NAME, BOARD_JOB_CRON, self.update_board, catch_up=CATCH_UP_SKIP)
 
     async def cog_unload(self):
         """Cog 언로드 시 태스크 정리"""
-        self.send_schedule.cancel()
+        self.scheduler.remove_job(DAILY_JOB_NAME)
+        self.scheduler.remove_job(BOARD_JOB_NAME)
+
+    async def _fetch_stellars(self) -> Dict[int, str]:
+        """스텔라 API에서 방송인 정보 조회 (실패 시 예외)"""
+        async with self.http.get(HTTP_SERVICE, STELLARS_API_URL, raise_for_status=True) as response:
+            data = await response.json()
+        stellars = {s["id"]: s["nameKor"] for s in data}
+        logger.info(f"✅ 스텔라 정보 로드 완료: {len(stellars)}명")
+        return stellars
 
     async def get_stellars(self) -> Dict[int, str]:
         """방송인 정보 가져오기 (캐시 적용)"""
-        current_time = datetime.now()
-
-        # 캐시가 유효한 경우 재사용
-        if (self.stellars and self.stellars_cache_time and
-            (current_time - self.stellars_cache_time).seconds < CACHE_TIMEOUT):
-            logger.debug("스텔라 정보 캐시 사용")
-            return self.stellars
-
         try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
-                async with session.get(STELLARS_API_URL) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        self.stellars = {s["id"]: s["nameKor"] for s in data}
-                        self.stellars_cache_time = current_time
-                        logger.info(f"✅ 스텔라 정보 로드 완료: {len(self.stellars)}명")
-                        return self.stellars
-                    else:
-                        logger.error(f"❌ 스텔라 API 응답 오류: {response.status}")
-
+            return await self.cache.get(STELLARS_CACHE_KEY, self._fetch_stellars)
+        except aiohttp.ClientResponseError as e:
+            logger.error(f"❌ 스텔라 API 응답 오류: {e.status}")
         except asyncio.TimeoutError:
             logger.error("❌ 스텔라 API 요청 타임아웃")
+        except CircuitOpenError as e:
+            logger.debug(f"스텔라 정보 조회 건너뜀: {e}")
         except aiohttp.ClientError as e:
             logger.error(f"❌ 스텔라 API 연결 오류: {e}")
         except Exception as e:
             logger.error(f"❌ 스텔라 정보 로드 중 예상치 못한 오류: {e}")
 
-        return self.stellars if self.stellars else {}
+        return self.cache.peek(STELLARS_CACHE_KEY) or {}
 
-    async def get_schedules(self, date: datetime) -> List[dict]:
-        """특정 날짜의 방송 일정 가져오기"""
+    async def _fetch_schedules(self, date_str: str, next_date_str: str) -> List[dict]:
+        """일정 API에서 하루치 일정 조회 (이전 응답이 있으면 조건부 요청, 실패 시 예외)"""
+        url = SCHEDULES_API_URL.format(date_str, next_date_str)
+        cached = self.schedules_cache.peek(date_str)
+        validators = self._validators.get(date_str, {}) if cached is not None else {}
+        headers = {}
+        if "etag" in validators:
+            headers["If-None-Match"] = validators["etag"]
+        if "last_modified" in validators:
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        async with self.http.get(HTTP_SERVICE, url, headers=headers, raise_for_status=True) as response:
+            if response.status == 304:
+                self.not_modified += 1
+                logger.debug(f"일정 변경 없음 (304): {date_str}")
+                return cached
+            data = await response.json()
+            self._validators[date_str] = {
+                name: value for name, value in (("etag", response.headers.get("ETag")),
+                                                ("last_modified", response.headers.get("Last-Modified"))) if value
+            }
+
+        # API 응답 구조 확인: {"content": [...]} 형태
+        if isinstance(data, dict) and "content" in data:
+            schedules = data["content"]
+        elif isinstance(data, list):
+            schedules = data
+        else:
+            logger.warning(f"예상치 못한 API 응답 구조: {type(data)}")
+            schedules = []
+
+        logger.info(f"✅ 일정 조회 완료: {len(schedules)}개")
+        return schedules
+
+    def _schedules_loader(self, date: datetime):
+        """날짜별 캐시 키와 로더"""
         date_str = date.strftime("%Y-%m-%dT00:00:00")
         next_date_str = (date + timedelta(days=1)).strftime("%Y-%m-%dT00:00:00")
-        url = SCHEDULES_API_URL.format(date_str, next_date_str)
+        return date_str, lambda: self._fetch_schedules(date_str, next_date_str)
 
-        try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-
-                        # API 응답 구조 확인: {"content": [...]} 형태
-                        if isinstance(data, dict) and "content" in data:
-                            schedules = data["content"]
-                        elif isinstance(data, list):
-                            schedules = data
-                        else:
-                            logger.warning(f"예상치 못한 API 응답 구조: {type(data)}")
-                            schedules = []
-
-                        logger.info(f"✅ 일정 조회 완료: {len(schedules)}개")
-                        return schedules
-                    else:
-                        logger.error(f"❌ 일정 API 응답 오류: {response.status}")
+    async def get_schedules(self, date: datetime, fresh: bool = False) -> List[dict]:
+        """특정 날짜의 방송 일정 가져오기 (캐시 적용, fresh=True면 새로 조회)"""
+        date_str, loader = self._schedules_loader(date)
 
+        try:
+            if fresh:
+                return await self.schedules_cache.refresh(date_str, loader)
+            return await self.schedules_cache.get(date_str, loader)
+        except aiohttp.ClientResponseError as e:
+            logger.error(f"❌ 일정 API 응답 오류: {e.status}")
         except asyncio.TimeoutError:
             logger.error("❌ 일정 API 요청 타임아웃")
+        except CircuitOpenError as e:
+            logger.debug(f"일정 조회 건너뜀: {e}")
         except aiohttp.ClientError as e:
             logger.error(f"❌ 일정 API 연결 오류: {e}")
         except Exception as e:
             logger.error(f"❌ 일정 조회 중 예상치 못한 오류: {e}")
 
-        return []
+        return self.schedules_cache.peek(date_str) or []
+
+    def _schedules_unavailable(self, date: datetime) -> bool:
+        """일정 API 가 차단 중이고 보여 줄 저장된 일정도 없는지 (빈 일정으로 잘못 안내하지 않도록)"""
+        date_str, _ = self._schedules_loader(date)
+        return self.breaker.is_open and self.schedules_cache.peek(date_str) is None
 
     def format_schedule_message(self, schedules: List[dict], stellars: Dict[int, str]) -> str:
         """일정 메시지 포맷"""
@@ -160,43 +260,151 @@ class Schedule(commands.Cog):
 
         return message
 
-    @tasks.loop(minutes=1)
     async def send_schedule(self):
-        """자동으로 방송 일정 전송"""
+        """자동으로 방송 일정 전송 (스케줄러가 매일 10시에 한 번 호출)"""
         await self.bot.wait_until_ready()
         now = datetime.now()
 
-        if now.hour == 10 and now.minute == 0:
-            logger.info("🔔 10시가 되어 방송 일정을 전송합니다.")
-            try:
-                channel = self.bot.get_channel(DISCORD_CHANNEL_ID)
-                if not channel:
-                    logger.error(f"❌ 채널을 찾을 수 없습니다: {DISCORD_CHANNEL_ID}")
-                    return
+        logger.info("🔔 10시가 되어 방송 일정을 전송합니다.")
+        if self.live_board:
+            # 라이브 보드: 새 메시지로 올리고 이후 변경은 이 메시지를 수정
+            await self.update_board(repost=True)
+            return
+
+        try:
+            if not self.subscriptions.has_subscribers("schedule"):
+                logger.warning("⚠️ 방송 일정을 구독한 채널이 없습니다.")
+                return
+            if self._schedules_unavailable(now):
+                logger.warning(f"⚠️ 일정 API 차단 중이라 오늘 일정 자동 전송을 건너뜁니다: {self.breaker.describe()}")
+                return
+
+            # 일정은 한 번만 조회하고 렌더링해서 구독 채널 전체로 보냄
+            stellars = await self.get_stellars()
+            schedules = await self.get_schedules(now, fresh=True)
+            message = self.format_schedule_message(schedules, stellars)
+
+            # 정해진 시각에 나가야 하므로 같은 채널에 밀린 트윗/동영상 알림보다 먼저 보냄
+            result = await self.subscriptions.deliver("schedule", *split_message(message), label="방송 일정",
+                                                      priority=PRIORITY_HIGH)
+            logger.info(f"✅ 방송 일정 자동 전송 완료: {result}")
 
-                stellars = await self.get_stellars()
-                schedules = await self.get_schedules(now)
-                message = self.format_schedule_message(schedules, stellars)
+        except Exception as e:
+            logger.error(f"❌ 방송 일정 자동 전송 중 오류: {e}")
 
-                await channel.send(message)
-                logger.info("✅ 방송 일정 자동 전송 완료")
+    async def update_board(self, repost: bool = False):
+        """라이브 일정 보드 갱신 (구독 채널마다 내용이 바뀐 조각만 수정, repost=True면 새 메시지로 게시)"""
+        await self.bot.wait_until_ready()
+        if not self.subscriptions.has_subscribers("schedule"):
+            return
 
-            except discord.HTTPException as e:
-                logger.error(f"❌ Discord 메시지 전송 오류: {e}")
+        async with self._board_lock:
+            now = datetime.now()
+            date_str, loader = self._schedules_loader(now)
+            try:
+                # 실패하면 남아 있는 값으로 대체, 값이 아예 없으면 보드를 그대로 둠 (빈 일정으로 덮어쓰지 않음)
+                schedules = await self.schedules_cache.refresh(date_str, loader)
             except Exception as e:
-                logger.error(f"❌ 방송 일정 자동 전송 중 오류: {e}")
+                logger.error(f"❌ 라이브 보드 일정 조회 실패 - 이번 갱신 건너뜀: {e}")
+                return
+
+            stellars = await self.get_stellars()
+            chunks = split_message(self.format_schedule_message(schedules, stellars))
+            payload = {"chunks": chunks, "hashes": [_digest(chunk) for chunk in chunks],
+                       "date": now.strftime("%Y-%m-%d"), "repost": repost}
+
+            result = await self.subscriptions.run_action("schedule", BOARD_ACTION, payload, label="라이브 보드 갱신")
+            if result.changed or result.relayed:
+                logger.info(f"✅ 라이브 보드 {'게시' if repost else '갱신'} 완료: 채널 {result.changed}개 "
+                            f"({len(chunks)}개 메시지, {result})")
+            else:
+                logger.debug("라이브 보드 변경 없음")
+
+    async def _apply_board(self, channel, payload: dict) -> bool:
+        return await self._update_channel_board(channel, payload["chunks"], payload["hashes"], payload["date"],
+                                                payload["repost"])
+
+    async def _update_channel_board(self, channel, chunks: List[str], hashes: List[str], date_str: str,
+                                    repost: bool) -> bool:
+        """채널 하나의 보드 갱신 (바뀐 내용이 있어 메시지를 보내거나 수정했으면 True)"""
+        key = str(channel.id)
+        board = self.store.get(BOARD_STATE_NAMESPACE, key) or {}
+        old_ids: List[int] = [] if repost else board.get("message_ids", [])
+        old_hashes: List[str] = [] if repost else board.get("hashes", [])
+        if old_ids and hashes == old_hashes:
+            return False
+
+        try:
+            message_ids = []
+            for index, (chunk, digest) in enumerate(zip(chunks, hashes)):
+                if index < len(old_ids):
+                    if index >= len(old_hashes) or old_hashes[index] != digest:
+                        await channel.get_partial_message(old_ids[index]).edit(content=chunk)
+                    message_ids.append(old_ids[index])
+                else:
+                    message = await self.dispatcher.send(channel, chunk, priority=PRIORITY_HIGH)
+                    message_ids.append(message.id)
+
+            # 조각 수가 줄었으면 남는 메시지 삭제
+            for message_id in old_ids[len(chunks):]:
+                try:
+                    await channel.get_partial_message(message_id).delete()
+                except discord.NotFound:
+                    pass
+
+        except discord.NotFound:
+            # 보드 메시지가 삭제된 경우 다음 갱신 때 새로 게시
+            logger.warning(f"⚠️ 라이브 보드 메시지를 찾을 수 없어 다시 게시합니다 (채널 {channel.id})")
+            self.store.delete(BOARD_STATE_NAMESPACE, key)
+            return False
+
+        self.store.set(BOARD_STATE_NAMESPACE, key, {
+            "date": date_str,
+            "message_ids": message_ids,
+            "hashes": hashes,
+        })
+        logger.debug(f"라이브 보드 {'게시' if repost or not old_ids else '수정'}: 채널 {channel.id} ({len(chunks)}개 메시지)")
+        return True
+
+    def _format_board_status(self) -> str:
+        """라이브 보드 상태 (디버그용)"""
+        if not self.live_board:
+            return "사용 안 함"
+        channel_ids = self.subscriptions.channel_ids("schedule")
+        boards = [self.store.get(BOARD_STATE_NAMESPACE, str(channel_id)) for channel_id in channel_ids]
+        dates = sorted({board["date"] for board in boards if board})
+        return (f"게시된 채널 {sum(1 for board in boards if board)}/{len(channel_ids)}개 "
+                f"({', '.join(dates) or '게시 전'}), 304 응답 {self.not_modified}회")
+
+    def _format_next_run(self) -> str:
+        """다음 자동 전송 시각 (한국 시간)"""
+        next_run = self.scheduler.next_run(DAILY_JOB_NAME)
+        if not next_run:
+            return "예약 없음"
+        return next_run.astimezone(self.scheduler.jobs[DAILY_JOB_NAME].spec.tz).strftime('%Y-%m-%d %H:%M')
 
     @discord.app_commands.command(name="schedule", description="오늘의 방송 일정을 확인합니다")
     async def show_schedule(self, interaction: discord.Interaction):
         """오늘의 방송 일정을 수동으로 확인합니다."""
         try:
+            now = datetime.now()
+            # 일정 API 가 차단 중이고 저장된 일정도 없으면 기다리게 하지 않고 바로 안내
+            if self._schedules_unavailable(now):
+                await interaction.response.send_message(
+                    f"⏳ 일정 서버가 응답하지 않아 잠시 요청을 멈췄습니다. "
+                    f"약 {max(self.breaker.retry_in, 1):.0f}초 후 다시 시도해 주세요.", ephemeral=True)
+                return
+
             await interaction.response.defer()
 
             stellars = await self.get_stellars()
-            schedules = await self.get_schedules(datetime.now())
+            schedules = await self.get_schedules(now)
             message = self.format_schedule_message(schedules, stellars)
+            if self.breaker.is_open:
+                message += "\n⚠️ 일정 서버 장애로 마지막으로 받아 온 일정을 보여 드립니다."
 
-            await interaction.followup.send(message)
+            for chunk in split_message(message):
+                await interaction.followup.send(chunk)
             logger.info(f"✅ 수동 일정 조회 완료 - 사용자: {interaction.user}")
 
         except discord.HTTPException as e:
@@ -232,7 +440,11 @@ class Schedule(commands.Cog):
 스텔라 정보: {stellar_count}명 로드됨
 오늘 일정: {schedule_count}개 발견됨
 현재 시각: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-캐시 상태: {'유효' if self.stellars_cache_time else '없음'}"""
+서킷 브레이커: {self.breaker.describe()}
+캐시 상태: {self.cache.describe()}
+{self.schedules_cache.describe()}
+다음 자동 전송: {self._format_next_run()}
+라이브 보드: {self._format_board_status()}"""
 
             await interaction.followup.send(debug_msg)
 
@@ -0,0 +1,304 @@
+# scheduler.py
+import logging
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+from state_store import get_state_store
+from metrics import LOOP_SKIPPED, LOOP_TICK_SECONDS, LOOP_TICKS
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 기본 설정
+DEFAULT_TIMEZONE = "Asia/Seoul"
+DEFAULT_MISFIRE_GRACE = 900   # 놓친 실행을 보충할 수 있는 최대 지연(초)
+MAX_SLEEP_CHUNK = 300         # 시계 변경에 대비해 한 번에 자는 최대 시간(초)
+
+# 상태 저장소 네임스페이스 (작업별 마지막 실행 시각)
+STATE_NAMESPACE = "scheduler"
+
+# 놓친 실행 처리 정책
+CATCH_UP_ONCE = "once"   # 유예 시간 안이면 한 번만 보충 실행
+CATCH_UP_SKIP = "skip"   # 놓친 실행은 건너뜀
+
+# cron 필드 범위 (분, 시, 일, 월, 요일)
+_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def _parse_field(expr: str, low: int, high: int) -> Set[int]:
+    """cron 필드 하나를 허용 값 집합으로 변환 (*, a-b, */n, a,b 지원)"""
+    values: Set[int] = set()
+    for part in expr.split(","):
+        step = 1
+        if "/" in part:
+            part, step_str = part.split("/", 1)
+            step = int(step_str)
+            if step <= 0:
+                raise ValueError(f"잘못된 cron 간격: {expr}")
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_str, end_str = part.split("-", 1)
+            start, end = int(start_str), int(end_str)
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+
+        if start < low or end > high or start > end:
+            raise ValueError(f"cron 값 범위 오류: {expr} ({low}-{high})")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSpec:
+    """분 시 일 월 요일 형식의 cron 표현식"""
+
+    def __init__(self, expr: str, tz: str = DEFAULT_TIMEZONE):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 표현식은 5개 필드여야 합니다: '{expr}'")
+        self.expr = expr
+        self.tz = ZoneInfo(tz)
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            sorted(_parse_field(f, low, high)) for f, (low, high) in zip(fields, _FIELD_RANGES)
+        )
+        self.weekdays = sorted({d % 7 for d in weekdays})  # 요일 7은 일요일(0)과 같음
+        self._dom_any = fields[2] == "*"
+        self._dow_any = fields[4] == "*"
+
+    def __repr__(self) -> str:
+        return f"CronSpec('{self.expr}', tz='{self.tz.key}')"
+
+    def _day_matches(self, day: datetime) -> bool:
+        if day.month not in self.months:
+            return False
+        dom_ok = day.day in self.days
+        dow_ok = (day.weekday() + 1) % 7 in self.weekdays  # cron: 일요일=0
+        # 일/요일이 모두 지정되면 둘 중 하나만 맞아도 실행 (표준 cron 규칙)
+        if self._dom_any or self._dow_any:
+            return dom_ok and dow_ok
+        return dom_ok or dow_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """after 이후(초과) 첫 실행 시각 (UTC aware datetime)"""
+        local = after.astimezone(self.tz).replace(second=0, microsecond=0, tzinfo=None) + timedelta(minutes=1)
+        day = local.replace(hour=0, minute=0)
+
+        for _ in range(366 * 5):
+            if self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= local:
+                            return candidate.replace(tzinfo=self.tz).astimezone(timezone.utc)
+            day += timedelta(days=1)
+        raise ValueError(f"다음 실행 시각을 찾을 수 없습니다: {self.expr}")
+
+
+class Clock:
+    """실제 벽시계"""
+
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    async def sleep_until(self, when: datetime):
+        # 긴 대기는 나눠서 자면서 시계 변경(NTP 보정 등)을 반영
+        while True:
+            delay = (when - self.now()).total_seconds()
+            if delay <= 0:
+                return
+            await asyncio.sleep(min(delay, MAX_SLEEP_CHUNK))
+
+
+class FakeClock(Clock):
+    """테스트용 가짜 시계 (advance 로 시간을 직접 진행)"""
+
+    def __init__(self, start: datetime):
+        self._now = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+        self._sleepers: List[Tuple[datetime, asyncio.Future]] = []
+
+    def now(self) -> datetime:
+        return self._now
+
+    async def sleep_until(self, when: datetime):
+        if when <= self._now:
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._sleepers.append((when, future))
+        await future
+
+    async def advance(self, seconds: float = 0, to: Optional[datetime] = None):
+        """시간을 진행시키고 깨어난 작업이 실행될 기회를 줌"""
+        target = to if to else self._now + timedelta(seconds=seconds)
+        # 중간 기상 시각을 순서대로 거치며 진행
+        while True:
+            pending = sorted((w for w, f in self._sleepers if not f.done() and w <= target), key=lambda w: w)
+            self._now = pending[0] if pending else target
+            still_sleeping = []
+            for when, future in self._sleepers:
+                if future.done():
+                    continue
+                if when <= self._now:
+                    future.set_result(None)
+                else:
+                    still_sleeping.append((when, future))
+            self._sleepers = still_sleeping
+            for _ in range(10):
+                await asyncio.sleep(0)
+            if not pending:
+                return
+
+    async def jump(self, to: datetime):
+        """중간 기상 시각을 거치지 않고 시간을 옮김 (절전에서 깨어난 것처럼 잠든 작업이 모두 늦게 깨어남)"""
+        self._now = to
+        sleepers, self._sleepers = self._sleepers, []
+        for when, future in sleepers:
+            if future.done():
+                continue
+            if when <= to:
+                future.set_result(None)
+            else:
+                self._sleepers.append((when, future))
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+
+@dataclass
+class Job:
+    """예약 작업"""
+    name: str
+    spec: CronSpec
+    callback: Callable[[], Awaitable[None]]
+    catch_up: str = CATCH_UP_ONCE
+    misfire_grace: float = DEFAULT_MISFIRE_GRACE
+    last_run: Optional[datetime] = None
+    next_run: Optional[datetime] = None
+    run_count: int = 0
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+
+class JobScheduler:
+    """벽시계 기준으로 다음 실행 시각까지 정확히 잠드는 작업 스케줄러"""
+
+    def __init__(self, clock: Optional[Clock] = None, state=None):
+        self.clock = clock or Clock()
+        self.state = state  # 마지막 실행 시각을 보관할 StateStore (없으면 메모리에만 유지)
+        self.jobs: Dict[str, Job] = {}
+        self.paused = False  # 클러스터의 리더가 아닌 프로세스는 작업을 등록만 하고 실행하지 않음
+
+    def add_job(self, name: str, cron: str, callback: Callable[[], Awaitable[None]],
+                tz: str = DEFAULT_TIMEZONE, catch_up: str = CATCH_UP_ONCE,
+                misfire_grace: float = DEFAULT_MISFIRE_GRACE) -> Job:
+        """작업 등록 및 시작 (같은 이름이 있으면 교체)"""
+        if catch_up not in (CATCH_UP_ONCE, CATCH_UP_SKIP):
+            raise ValueError(f"알 수 없는 catch-up 정책: {catch_up}")
+        self.remove_job(name)
+
+        job = Job(name=name, spec=CronSpec(cron, tz), callback=callback,
+                  catch_up=catch_up, misfire_grace=misfire_grace)
+        self.jobs[name] = job
+        if not self.paused:
+            self._start_job(job)
+        logger.info(f"✅ 예약 작업 등록: {name} ({cron}, {tz}){' - 일시 정지 상태' if self.paused else ''}")
+        return job
+
+    def _start_job(self, job: Job):
+        # 다른 프로세스가 실행했을 수도 있으므로 시작할 때마다 저장된 마지막 실행 시각을 다시 읽음
+        if self.state is not None:
+            last_run = self.state.get(STATE_NAMESPACE, job.name)
+            if last_run:
+                job.last_run = datetime.fromisoformat(last_run)
+        job.task = asyncio.create_task(self._run_job(job), name=f"scheduler:{job.name}")
+
+    def pause(self):
+        """모든 작업 실행 중지 (등록은 유지)"""
+        self.paused = True
+        for job in self.jobs.values():
+            if job.task and not job.task.done():
+                job.task.cancel()
+            job.task = None
+            job.next_run = None
+
+    def resume(self):
+        """멈춘 작업 다시 시작 (유예 시간 안에 놓친 실행은 catch-up 정책대로 보충)"""
+        self.paused = False
+        for job in self.jobs.values():
+            if job.task is None or job.task.done():
+                self._start_job(job)
+
+    def remove_job(self, name: str):
+        """작업 취소 및 제거"""
+        job = self.jobs.pop(name, None)
+        if job and job.task and not job.task.done():
+            job.task.cancel()
+
+    def next_run(self, name: str) -> Optional[datetime]:
+        job = self.jobs.get(name)
+        return job.next_run if job else None
+
+    async def _execute(self, job: Job, fire_time: datetime):
+        """한 번의 실행 (예외는 로깅만 하고 스케줄은 유지)"""
+        self._mark_run(job, fire_time)
+        job.run_count += 1
+        result = "ok"
+        try:
+            with LOOP_TICK_SECONDS.time(loop=job.name):
+                await job.callback()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            result = "error"
+            logger.error(f"❌ 예약 작업 '{job.name}' 실행 중 오류: {e}", exc_info=True)
+        LOOP_TICKS.inc(loop=job.name, result=result)
+
+    def _mark_run(self, job: Job, fire_time: datetime):
+        """실행(또는 건너뜀) 기록 - 재시작 후 같은 회차가 다시 실행되지 않도록 저장"""
+        job.last_run = fire_time
+        if self.state is not None:
+            self.state.set(STATE_NAMESPACE, job.name, fire_time.isoformat())
+
+    async def _run_job(self, job: Job):
+        now = self.clock.now()
+
+        # 시작 직후: 유예 시간 안에 놓친 실행이 있으면 보충
+        missed = job.spec.next_after(now - timedelta(seconds=job.misfire_grace))
+        if missed <= now and (job.last_run is None or job.last_run < missed):
+            if job.catch_up == CATCH_UP_ONCE:
+                logger.info(f"🔁 놓친 예약 작업 보충 실행: {job.name} ({missed.astimezone(job.spec.tz):%H:%M})")
+                await self._execute(job, missed)
+            else:
+                self._mark_run(job, missed)
+
+        while True:
+            base = max(self.clock.now(), job.last_run) if job.last_run else self.clock.now()
+            fire_time = job.spec.next_after(base)
+            job.next_run = fire_time
+            await self.clock.sleep_until(fire_time)
+
+            # 절전/시계 변경 등으로 유예 시간보다 늦게 깨어났으면 정책과 관계없이 이번 회차는 건너뜀
+            delay = (self.clock.now() - fire_time).total_seconds()
+            if delay > job.misfire_grace:
+                logger.warning(f"⚠️ 예약 작업 '{job.name}' 지연({delay:.0f}초)으로 건너뜀")
+                LOOP_SKIPPED.inc(loop=job.name)
+                self._mark_run(job, fire_time)
+                continue
+            await self._execute(job, fire_time)
+
+    async def close(self):
+        """모든 작업 취소"""
+        tasks = [job.task for job in self.jobs.values() if job.task]
+        for name in list(self.jobs):
+            self.remove_job(name)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def get_scheduler(bot) -> JobScheduler:
+    """봇에 연결된 공유 스케줄러 반환 (없으면 생성)"""
+    scheduler = getattr(bot, "scheduler", None)
+    if scheduler is None:
+        scheduler = JobScheduler(state=get_state_store(bot))
+        bot.scheduler = scheduler
+    return scheduler
@@ -0,0 +1,59 @@
+# startup.py
+import time
+from typing import Callable, Dict, Optional
+
+
+class StartupTimeline:
+    """봇 시작 단계별 소요 시간 기록 (imports → extensions → login → gateway ready)"""
+
+    def __init__(self, origin: Optional[float] = None, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self.origin = origin if origin is not None else clock()
+        self._last = self.origin
+        self.phases: Dict[str, float] = {}
+        self.details: Dict[str, Dict[str, float]] = {}
+        self.completed = False
+
+    def mark(self, phase: str) -> float:
+        """직전 기록 시점부터 지금까지를 phase 로 기록하고 소요 시간(초) 반환"""
+        now = self._clock()
+        elapsed = now - self._last
+        self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+        self._last = now
+        return elapsed
+
+    def detail(self, phase: str, name: str, seconds: float):
+        """단계 내부 항목 기록 (예: 확장 모듈별 로드 시간)"""
+        self.details.setdefault(phase, {})[name] = seconds
+
+    def complete(self, phase: str):
+        """마지막 단계 기록 후 완료 처리 (재연결 시 on_ready 가 다시 불려도 한 번만)"""
+        if not self.completed:
+            self.mark(phase)
+            self.completed = True
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def as_dict(self) -> Dict[str, object]:
+        """벤치마크/로그용 밀리초 단위 딕셔너리"""
+        return {
+            "phases_ms": {phase: round(seconds * 1000, 1) for phase, seconds in self.phases.items()},
+            "details_ms": {phase: {name: round(seconds * 1000, 1) for name, seconds in items.items()}
+                           for phase, items in self.details.items()},
+            "total_ms": round(self.total * 1000, 1),
+        }
+
+    def format(self) -> str:
+        """한 줄 요약 (로그/명령어 응답용)"""
+        parts = [f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in self.phases.items()]
+        return f"{' · '.join(parts)} (총 {self.total * 1000:.0f}ms)"
+
+    def format_details(self) -> str:
+        """단계별 세부 항목"""
+        lines = []
+        for phase, items in self.details.items():
+            ordered = sorted(items.items(), key=lambda item: item[1], reverse=True)
+            lines.append(f"{phase}: " + ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in ordered))
+        return "\n".join(lines)
@@ -0,0 +1,189 @@
+# state_store.py
+import os
+import json
+import logging
+import sqlite3
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from config import STATE_DB_PATH
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 저장소 설정
+DEFAULT_DB_PATH = STATE_DB_PATH
+FLUSH_DELAY = 1.0          # 변경을 모아서 한 번에 기록하기까지 대기(초)
+SEEN_LIMIT = 500           # 네임스페이스별로 기억하는 처리 완료 ID 수
+SEEN_KEY = "__seen__"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (namespace, key)
+)
+"""
+
+
+class StateStore:
+    """Cog 커서(마지막 트윗/동영상 ID 등)를 보관하는 SQLite 기반 상태 저장소
+
+    읽기는 시작 시 한 번 메모리로 올려두고, 쓰기는 모아서 전용 스레드에서 fsync 까지 수행한다.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, flush_delay: float = FLUSH_DELAY):
+        self.path = path
+        self.flush_delay = flush_delay
+        self._data: Dict[Tuple[str, str], Any] = {}
+        self._pending: Dict[Tuple[str, str], Any] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        # sqlite 커넥션은 항상 같은 스레드 하나에서만 사용
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="state-store")
+        self._flush_task: Optional[asyncio.Task] = None
+        self._opened = False
+        self._open_lock = asyncio.Lock()
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _open_sync(self) -> List[Tuple[str, str, str]]:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        return self._read_sync()
+
+    async def open(self):
+        """DB 열고 전체 상태를 메모리로 로드 (여러 번 호출해도 한 번만 수행)"""
+        async with self._open_lock:
+            if self._opened:
+                return
+            rows = await self._run(self._open_sync)
+            for namespace, key, value in rows:
+                try:
+                    self._data.setdefault((namespace, key), json.loads(value))
+                except ValueError:
+                    logger.warning(f"⚠️ 손상된 상태 값 무시: {namespace}/{key}")
+            self._opened = True
+            logger.info(f"✅ 상태 저장소 로드 완료: {self.path} ({len(self._data)}개 항목)")
+
+    def _read_sync(self) -> List[Tuple[str, str, str]]:
+        return self._conn.execute("SELECT namespace, key, value FROM kv").fetchall()
+
+    async def reload(self):
+        """디스크에서 다시 읽어 메모리 갱신 (같은 DB 를 쓰는 다른 프로세스의 기록 반영, 아직 안 쓴 변경은 유지)
+
+        클러스터에서 리더가 바뀔 때 새 리더가 이전 리더의 커서를 이어받기 위해 사용.
+        """
+        await self.open()
+        rows = await self._run(self._read_sync)
+        data: Dict[Tuple[str, str], Any] = {}
+        for namespace, key, value in rows:
+            try:
+                data[(namespace, key)] = json.loads(value)
+            except ValueError:
+                logger.warning(f"⚠️ 손상된 상태 값 무시: {namespace}/{key}")
+        for item, value in self._pending.items():
+            if value is None:
+                data.pop(item, None)
+            else:
+                data[item] = value
+        self._data = data
+        logger.info(f"🔄 상태 저장소 다시 읽음: {len(self._data)}개 항목")
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        """값 조회 (메모리)"""
+        return self._data.get((namespace, key), default)
+
+    def set(self, namespace: str, key: str, value: Any):
+        """값 저장 (메모리에 즉시 반영, 디스크 기록은 모아서 처리)"""
+        self._data[(namespace, key)] = value
+        self._pending[(namespace, key)] = value
+        self._schedule_flush()
+
+    def delete(self, namespace: str, key: str):
+        """값 삭제"""
+        self._data.pop((namespace, key), None)
+        self._pending[(namespace, key)] = None
+        self._schedule_flush()
+
+    def items(self, namespace: str) -> Dict[str, Any]:
+        """네임스페이스의 모든 값"""
+        return {k: v for (ns, k), v in self._data.items() if ns == namespace and k != SEEN_KEY}
+
+    def is_seen(self, namespace: str, item_id: str) -> bool:
+        """이미 처리한 ID인지 확인"""
+        return str(item_id) in self._data.get((namespace, SEEN_KEY), ())
+
+    def mark_seen(self, namespace: str, item_ids: Iterable[str], limit: int = SEEN_LIMIT):
+        """처리한 ID 기록 (최근 limit 개만 유지)"""
+        seen = list(self._data.get((namespace, SEEN_KEY), []))
+        for item_id in item_ids:
+            item_id = str(item_id)
+            if item_id not in seen:
+                seen.append(item_id)
+        self.set(namespace, SEEN_KEY, seen[-limit:])
+
+    def _schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._delayed_flush())
+            except RuntimeError:
+                # 이벤트 루프 밖에서 호출된 경우 close() 때 기록
+                pass
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    def _write_sync(self, batch: Dict[Tuple[str, str], Any]):
+        with self._conn:
+            for (namespace, key), value in batch.items():
+                if value is None:
+                    self._conn.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+                else:
+                    self._conn.execute(
+                        "INSERT INTO kv (namespace, key, value) VALUES (?, ?, ?) "
+                        "ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value",
+                        (namespace, key, json.dumps(value, ensure_ascii=False)),
+                    )
+
+    async def flush(self):
+        """대기 중인 변경을 한 트랜잭션으로 기록 (synchronous=FULL 로 fsync)"""
+        if not self._pending or self._conn is None:
+            return
+        batch, self._pending = self._pending, {}
+        try:
+            await self._run(self._write_sync, batch)
+            logger.debug(f"상태 저장소 기록: {len(batch)}개 항목")
+        except sqlite3.Error as e:
+            # 실패한 항목은 다음 기록 때 다시 시도
+            for item, value in batch.items():
+                self._pending.setdefault(item, value)
+            logger.error(f"❌ 상태 저장소 기록 실패: {e}")
+
+    async def close(self):
+        """남은 변경 기록 후 종료"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=True)
+        self._opened = False
+
+
+def get_state_store(bot) -> StateStore:
+    """봇에 연결된 상태 저장소 반환 (없으면 생성)"""
+    store = getattr(bot, "state_store", None)
+    if store is None:
+        store = StateStore()
+        bot.state_store = store
+    return store
@@ -0,0 +1,460 @@
+# subscriptions.py
+import time
+import logging
+import asyncio
+import discord
+from dataclasses import dataclass
+from discord import app_commands
+from discord.ext import commands
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from config import DISCORD_CHANNEL_ID, DISCORD_YOUTUBE_CHANNEL_ID, FANOUT_CONCURRENCY
+from dispatcher import PRIORITY_BULK, BacklogFullError, get_dispatcher
+from state_store import get_state_store
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 필요한 게이트웨이 intents (길드/채널 캐시: 채널 조회, 권한 확인, 길드 탈퇴/채널 삭제 이벤트)
+REQUIRED_INTENTS = ("guilds",)
+
+# 구독할 수 있는 피드
+FEEDS = {
+    "schedule": "방송 일정",
+    "image": "랜덤 이미지",
+    "twitter": "트윗 알림",
+    "youtube": "YouTube 알림",
+}
+
+# 상태 저장 설정
+STATE_NAMESPACE = "subscriptions"
+GUILD_KEY_PREFIX = "guild:"
+MIGRATED_KEY = "legacy_migrated"
+
+# 권한 없음 / 채널 없음이 연속으로 이만큼 나오면 구독 자동 해제
+MAX_CHANNEL_STRIKES = 3
+STRIKE_WINDOW = 600   # 같은 채널의 실패는 이 시간(초)에 한 번만 셈 (알림이 한꺼번에 몰려도 한 번의 실패로 봄)
+
+
+@dataclass
+class FanOutResult:
+    """피드 하나를 여러 채널로 보낸 결과"""
+    channels: int = 0
+    queued: int = 0          # publish(): 대기열에 넣은 채널 수 (결과는 기다리지 않음)
+    delivered: int = 0
+    failed: int = 0
+    missing: int = 0
+    changed: int = 0         # run_action(): 핸들러가 True 를 돌려준(실제로 바꾼) 채널 수
+    relayed: int = 0         # 클러스터: 같은 이벤트를 넘겨 받은 다른 프로세스 수
+
+    def __str__(self) -> str:
+        done = f"대기열 {self.queued}" if self.queued else f"성공 {self.delivered}"
+        text = f"채널 {self.channels}개 중 {done} · 실패 {self.failed} · 없음 {self.missing}"
+        return text + (f" · 다른 프로세스 {self.relayed}개로 전달" if self.relayed else "")
+
+
+class SubscriptionRegistry:
+    """길드별로 어떤 피드를 어느 채널로 보낼지 기록하는 구독 목록 (StateStore 에 저장)
+
+    이벤트는 한 번만 가져오고 렌더링한 뒤 구독 채널 전체에 보낸다.
+    전송은 Dispatcher(채널별 순서 보장 + 동시 전송 수 제한 + 429 재시도)를 거치고,
+    권한이 없거나 사라진 채널은 다른 채널에 영향을 주지 않고 실패로만 집계한다.
+
+    여러 프로세스로 샤드를 나눠 실행하면(cluster.py) 각 프로세스는 자기 샤드 길드의 채널로만 보내고,
+    리더가 만든 이벤트는 relay 로 다른 프로세스에 넘겨 그쪽 길드로 보내게 한다.
+    """
+
+    def __init__(self, bot, store, dispatcher, defaults: Optional[Dict[str, int]] = None,
+                 max_concurrency: int = FANOUT_CONCURRENCY, strike_window: float = STRIKE_WINDOW):
+        self.bot = bot
+        self.store = store
+        self.dispatcher = dispatcher
+        # 예전 단일 채널 설정 (첫 실행 때 해당 채널의 길드 구독으로 옮김)
+        self.defaults = {feed: channel_id for feed, channel_id in (defaults or {}).items() if channel_id}
+        self.max_concurrency = max_concurrency
+        self._index: Optional[Dict[str, List[int]]] = None
+        self.strike_window = strike_window
+        self._strikes: Dict[int, Tuple[int, float]] = {}   # 채널 ID → (연속 실패 수, 마지막으로 센 시각)
+        self._migrated = False
+        self._actions: Dict[str, Callable[[discord.abc.Messageable, Any], Awaitable[Optional[bool]]]] = {}
+        # 클러스터 모드 연결점 (cluster.ClusterNode 가 설정, 단일 프로세스에서는 기본값 그대로)
+        self.owns_guild: Callable[[int], bool] = lambda guild_id: True
+        self.relay: Optional[Callable[[dict], int]] = None
+        self.on_change: Optional[Callable[[], None]] = None
+        self.remote_feeds: Dict[str, Set[str]] = {}    # 다른 프로세스 → 구독자가 있는 피드
+
+    # ---------------------------------------------------------------- 구독 목록
+
+    def _guild_entry(self, guild_id: int) -> Dict[str, List[int]]:
+        return {feed: list(ids) for feed, ids in
+                (self.store.get(STATE_NAMESPACE, f"{GUILD_KEY_PREFIX}{guild_id}") or {}).items()}
+
+    def _save_guild(self, guild_id: int, entry: Dict[str, List[int]]):
+        entry = {feed: ids for feed, ids in entry.items() if ids}
+        if entry:
+            self.store.set(STATE_NAMESPACE, f"{GUILD_KEY_PREFIX}{guild_id}", entry)
+        else:
+            self.store.delete(STATE_NAMESPACE, f"{GUILD_KEY_PREFIX}{guild_id}")
+        self._index = None
+        if self.on_change:
+            self.on_change()
+
+    def for_guild(self, guild_id: int) -> Dict[str, List[int]]:
+        """길드의 피드별 구독 채널"""
+        return self._guild_entry(guild_id)
+
+    def subscribe(self, guild_id: int, feed: str, channel_id: int) -> bool:
+        """구독 추가 (이미 있으면 False)"""
+        if feed not in FEEDS:
+            raise ValueError(f"알 수 없는 피드: {feed}")
+        entry = self._guild_entry(guild_id)
+        channels = entry.setdefault(feed, [])
+        if channel_id in channels:
+            return False
+        channels.append(channel_id)
+        self._save_guild(guild_id, entry)
+        self._strikes.pop(channel_id, None)
+        logger.info(f"✅ 구독 추가: {FEEDS[feed]} → 채널 {channel_id} (길드 {guild_id})")
+        return True
+
+    def unsubscribe(self, guild_id: int, feed: str, channel_id: Optional[int] = None) -> int:
+        """구독 해제 (channel_id 가 없으면 길드의 해당 피드 전체), 해제한 채널 수 반환"""
+        entry = self._guild_entry(guild_id)
+        channels = entry.get(feed, [])
+        removed = [c for c in channels if channel_id is None or c == channel_id]
+        if not removed:
+            return 0
+        entry[feed] = [c for c in channels if c not in removed]
+        self._save_guild(guild_id, entry)
+        logger.info(f"✅ 구독 해제: {FEEDS.get(feed, feed)} ← 채널 {', '.join(map(str, removed))} (길드 {guild_id})")
+        return len(removed)
+
+    def remove_channel(self, channel_id: int) -> int:
+        """채널이 삭제되었거나 보낼 수 없을 때 모든 피드에서 제거"""
+        removed = 0
+        for guild_id, entry in self._all_guilds().items():
+            if any(channel_id in ids for ids in entry.values()):
+                removed += sum(ids.count(channel_id) for ids in entry.values())
+                self._save_guild(guild_id, {feed: [c for c in ids if c != channel_id] for feed, ids in entry.items()})
+        self._strikes.pop(channel_id, None)
+        return removed
+
+    def remove_guild(self, guild_id: int):
+        """봇이 길드에서 나가면 구독 전체 삭제"""
+        if self.store.get(STATE_NAMESPACE, f"{GUILD_KEY_PREFIX}{guild_id}") is not None:
+            self._save_guild(guild_id, {})
+            logger.info(f"🗑️ 길드 {guild_id} 구독 삭제")
+
+    def _all_guilds(self) -> Dict[int, Dict[str, List[int]]]:
+        return {int(key[len(GUILD_KEY_PREFIX):]): value for key, value in self.store.items(STATE_NAMESPACE).items()
+                if key.startswith(GUILD_KEY_PREFIX)}
+
+    def channel_ids(self, feed: str) -> List[int]:
+        """피드를 구독한 모든 채널 ID (이 프로세스가 맡은 길드 합산, 중복 없음)"""
+        if self._index is None:
+            index: Dict[str, List[int]] = {name: [] for name in FEEDS}
+            for guild_id, entry in self._all_guilds().items():
+                if not self.owns_guild(guild_id):
+                    continue
+                for name, ids in entry.items():
+                    bucket = index.setdefault(name, [])
+                    bucket.extend(c for c in ids if c not in bucket)
+            self._index = index
+        channels = list(self._index.get(feed, []))
+        if not self._migrated and feed in self.defaults and self.defaults[feed] not in channels:
+            channels.append(self.defaults[feed])
+        return channels
+
+    def has_subscribers(self, feed: str) -> bool:
+        """이 프로세스 또는 클러스터의 다른 프로세스에 구독 채널이 있는지"""
+        return bool(self.channel_ids(feed)) or any(feed in feeds for feeds in self.remote_feeds.values())
+
+    def local_feeds(self) -> List[str]:
+        return [feed for feed in FEEDS if self.channel_ids(feed)]
+
+    def describe(self) -> str:
+        """디버그용 상태 문자열"""
+        guilds = self._all_guilds()
+        counts = " · ".join(f"{label} {len(self.channel_ids(feed))}" for feed, label in FEEDS.items())
+        return f"길드 {len(guilds)}개 / {counts} (동시 전송 {self.max_concurrency})"
+
+    # ---------------------------------------------------------------- 예전 설정 이전
+
+    def _migrate_defaults(self):
+        """config 의 단일 채널 설정을 그 채널이 속한 길드의 구독으로 한 번만 옮김 (봇 준비 후)"""
+        if self._migrated:
+            return
+        if self.store.get(STATE_NAMESPACE, MIGRATED_KEY) or not self.defaults:
+            self._migrated = True
+            return
+        if not self.bot.is_ready():
+            return
+
+        clustered = self.relay is not None
+        for feed, channel_id in self.defaults.items():
+            channel = self.bot.get_channel(channel_id)
+            guild = getattr(channel, "guild", None)
+            if guild is None:
+                if clustered:
+                    # 다른 프로세스의 샤드에 있는 채널일 수 있으므로 이전은 그쪽에 맡김
+                    continue
+                logger.warning(f"⚠️ 기본 채널을 찾을 수 없어 구독으로 옮기지 않습니다: {FEEDS[feed]} ({channel_id})")
+                continue
+            self.subscribe(guild.id, feed, channel_id)
+        if not clustered or all(self.bot.get_channel(channel_id) for channel_id in self.defaults.values()):
+            self.store.set(STATE_NAMESPACE, MIGRATED_KEY, True)
+        self._migrated = True
+
+    # ---------------------------------------------------------------- 전송
+
+    def _resolve(self, feed: str, result: FanOutResult) -> List[discord.abc.Messageable]:
+        self._migrate_defaults()
+        channels = []
+        for channel_id in self.channel_ids(feed):
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                result.missing += 1
+                self._strike(channel_id, "채널을 찾을 수 없음")
+            else:
+                channels.append(channel)
+        result.channels = len(channels) + result.missing
+        return channels
+
+    def _strike(self, channel_id: int, reason: str):
+        """보낼 수 없는 채널 기록 - strike_window 마다 한 번씩 세어 연속으로 MAX_CHANNEL_STRIKES 회면 구독 해제"""
+        now = time.monotonic()
+        count, struck_at = self._strikes.get(channel_id, (0, None))
+        if struck_at is not None and now - struck_at < self.strike_window:
+            return
+        count += 1
+        self._strikes[channel_id] = (count, now)
+        if count >= MAX_CHANNEL_STRIKES:
+            removed = self.remove_channel(channel_id)
+            if removed:
+                logger.warning(f"⚠️ 채널 {channel_id} 구독 자동 해제 ({reason}, {MAX_CHANNEL_STRIKES}회 연속)")
+
+    def _record(self, channel_id: int, error: Optional[BaseException], result: FanOutResult):
+        if error is None:
+            result.delivered += 1
+            self._strikes.pop(channel_id, None)
+            return
+        result.failed += 1
+        if isinstance(error, (discord.Forbidden, discord.NotFound)):
+            self._strike(channel_id, f"{error.status} {error.text or ''}".strip())
+
+    def _relay(self, kind: str, feed: str, label: str, **fields) -> int:
+        """클러스터의 다른 프로세스로 이벤트 전달 (전달한 프로세스 수)"""
+        if self.relay is None:
+            return 0
+        return self.relay({"type": kind, "feed": feed, "label": label, **fields})
+
+    def publish(self, feed: str, content: Optional[str] = None, *, embed: Optional[discord.Embed] = None,
+                label: str = "알림") -> FanOutResult:
+        """구독 채널 전체에 알림을 대기열로 보냄 (결과를 기다리지 않음, 실패는 로그와 구독 정리로 처리)"""
+        relayed = self._relay("publish", feed, label, content=content, embed=embed.to_dict() if embed else None)
+        result = self._publish(feed, content, embed, label)
+        result.relayed = relayed
+        return result
+
+    def _publish(self, feed: str, content: Optional[str], embed: Optional[discord.Embed], label: str) -> FanOutResult:
+        result = FanOutResult()
+        for channel in self._resolve(feed, result):
+            try:
+                future = self.dispatcher.enqueue(channel, content, embed=embed)
+            except BacklogFullError as e:
+                result.failed += 1
+                logger.error(f"❌ {label} 전송 포기 (채널 {channel.id}): {e}")
+                continue
+            result.queued += 1
+            future.add_done_callback(lambda f, channel_id=channel.id: self._on_done(f, channel_id, label))
+        return result
+
+    def _on_done(self, future: asyncio.Future, channel_id: int, label: str):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            self._strikes.pop(channel_id, None)
+            return
+        logger.error(f"❌ {label} 전송 실패 (채널 {channel_id}): {error}")
+        if isinstance(error, (discord.Forbidden, discord.NotFound)):
+            self._strike(channel_id, f"{error.status} {error.text or ''}".strip())
+
+    async def deliver(self, feed: str, *contents: str, embed: Optional[discord.Embed] = None,
+                      label: str = "알림", priority: int = PRIORITY_BULK) -> FanOutResult:
+        """구독 채널 전체에 메시지(여러 조각이면 순서대로)를 보내고 채널별 결과를 기다림
+
+        클러스터 모드에서 다른 프로세스로 넘긴 몫은 기다리지 않는다 (relayed 로만 집계).
+        priority=PRIORITY_HIGH 면 같은 채널에 쌓인 대량 알림보다 먼저 나간다.
+        """
+        relayed = self._relay("deliver", feed, label, contents=list(contents),
+                              embed=embed.to_dict() if embed else None, priority=priority)
+        result = await self._deliver(feed, contents, embed, label, priority)
+        result.relayed = relayed
+        return result
+
+    async def _deliver(self, feed: str, contents, embed: Optional[discord.Embed], label: str,
+                       priority: int = PRIORITY_BULK) -> FanOutResult:
+        result = FanOutResult()
+        pending = {}
+        for channel in self._resolve(feed, result):
+            try:
+                if contents:
+                    futures = [self.dispatcher.enqueue(channel, content, embed=embed if i == 0 else None,
+                                                       priority=priority)
+                               for i, content in enumerate(contents)]
+                else:
+                    futures = [self.dispatcher.enqueue(channel, embed=embed, priority=priority)]
+            except BacklogFullError as e:
+                result.failed += 1
+                logger.error(f"❌ {label} 전송 포기 (채널 {channel.id}): {e}")
+                continue
+            pending[channel.id] = asyncio.gather(*futures)
+
+        outcomes = await asyncio.gather(*pending.values(), return_exceptions=True)
+        for channel_id, outcome in zip(pending, outcomes):
+            error = outcome if isinstance(outcome, BaseException) else None
+            if error is not None:
+                logger.error(f"❌ {label} 전송 실패 (채널 {channel_id}): {error}")
+            self._record(channel_id, error, result)
+        return result
+
+    async def for_each(self, feed: str, func: Callable[[discord.abc.Messageable], Awaitable[None]],
+                       label: str = "작업") -> FanOutResult:
+        """구독 채널마다 func(channel) 실행 (메시지 수정 등, 동시 실행 수 제한, 채널별 실패 격리)"""
+        result = FanOutResult()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(channel):
+            async with semaphore:
+                try:
+                    if await func(channel):
+                        result.changed += 1
+                except discord.HTTPException as e:
+                    logger.error(f"❌ {label} 실패 (채널 {channel.id}): {e}")
+                    return e
+            return None
+
+        channels = self._resolve(feed, result)
+        outcomes = await asyncio.gather(*(run(channel) for channel in channels), return_exceptions=True)
+        for channel, outcome in zip(channels, outcomes):
+            if isinstance(outcome, BaseException) and not isinstance(outcome, discord.HTTPException):
+                logger.error(f"❌ {label} 중 오류 (채널 {channel.id}): {outcome}")
+            self._record(channel.id, outcome, result)
+        return result
+
+    def register_action(self, name: str, handler: Callable[[discord.abc.Messageable, Any], Awaitable[Optional[bool]]]):
+        """run_action 으로 부를 채널별 작업 등록 (클러스터의 다른 프로세스도 이름으로 찾아 실행)"""
+        self._actions[name] = handler
+
+    async def run_action(self, feed: str, name: str, payload: Any, label: str = "작업") -> FanOutResult:
+        """구독 채널마다 등록된 작업 handler(channel, payload) 실행 (payload 는 JSON 으로 넘길 수 있는 값)"""
+        relayed = self._relay("action", feed, label, name=name, payload=payload)
+        handler = self._actions[name]
+        result = await self.for_each(feed, lambda channel: handler(channel, payload), label=label)
+        result.relayed = relayed
+        return result
+
+    async def apply_remote(self, event: dict) -> Optional[FanOutResult]:
+        """다른 프로세스(리더)가 넘긴 이벤트를 이 프로세스의 구독 채널로 전송"""
+        kind, feed, label = event.get("type"), event.get("feed"), event.get("label", "알림")
+        embed = discord.Embed.from_dict(event["embed"]) if event.get("embed") else None
+        if kind == "publish":
+            return self._publish(feed, event.get("content"), embed, label)
+        if kind == "deliver":
+            return await self._deliver(feed, event.get("contents") or [], embed, label,
+                                       event.get("priority", PRIORITY_BULK))
+        if kind == "action":
+            handler = self._actions.get(event.get("name"))
+            if handler is None:
+                logger.warning(f"⚠️ 등록되지 않은 작업 이벤트 무시: {event.get('name')}")
+                return None
+            payload = event.get("payload")
+            return await self.for_each(feed, lambda channel: handler(channel, payload), label=label)
+        logger.warning(f"⚠️ 알 수 없는 클러스터 이벤트 무시: {kind}")
+        return None
+
+
+def get_subscriptions(bot) -> SubscriptionRegistry:
+    """봇에 연결된 구독 목록 반환 (없으면 생성)"""
+    registry = getattr(bot, "subscriptions", None)
+    if registry is None:
+        registry = SubscriptionRegistry(
+            bot, get_state_store(bot), get_dispatcher(bot),
+            defaults={"schedule": DISCORD_CHANNEL_ID, "image": DISCORD_CHANNEL_ID,
+                      "twitter": DISCORD_CHANNEL_ID, "youtube": DISCORD_YOUTUBE_CHANNEL_ID},
+        )
+        bot.subscriptions = registry
+    return registry
+
+
+FEED_CHOICES = [app_commands.Choice(name=label, value=feed) for feed, label in FEEDS.items()]
+
+
+class Subscriptions(commands.Cog):
+    """길드 관리자가 피드 구독 채널을 설정하는 명령어"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.registry = get_subscriptions(bot)
+
+    async def cog_load(self):
+        await self.registry.store.open()
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.registry.remove_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        if self.registry.remove_channel(channel.id):
+            logger.info(f"🗑️ 삭제된 채널 {channel.id} 구독 정리")
+
+    @app_commands.command(name="subscribe", description="이 서버의 채널로 피드를 받습니다 (관리자)")
+    @app_commands.describe(feed="받을 피드", channel="보낼 채널 (기본: 현재 채널)")
+    @app_commands.choices(feed=FEED_CHOICES)
+    @app_commands.guild_only()
+    @app_commands.default_permissions(manage_guild=True)
+    async def subscribe(self, interaction: discord.Interaction, feed: app_commands.Choice[str],
+                        channel: Optional[discord.TextChannel] = None):
+        """피드 구독 추가"""
+        channel = channel or interaction.channel
+        permissions = channel.permissions_for(interaction.guild.me)
+        if not (permissions.send_messages and permissions.embed_links):
+            await interaction.response.send_message(
+                f"❌ {channel.mention} 채널에 메시지/임베드를 보낼 권한이 없습니다.", ephemeral=True)
+            return
+
+        if self.registry.subscribe(interaction.guild_id, feed.value, channel.id):
+            await interaction.response.send_message(f"✅ {feed.name}을(를) {channel.mention} 채널로 보냅니다.")
+        else:
+            await interaction.response.send_message(f"ℹ️ {channel.mention} 채널은 이미 {feed.name}을(를) 받고 있습니다.",
+                                                    ephemeral=True)
+
+    @app_commands.command(name="unsubscribe", description="피드 구독을 해제합니다 (관리자)")
+    @app_commands.describe(feed="해제할 피드", channel="해제할 채널 (기본: 이 서버의 모든 채널)")
+    @app_commands.choices(feed=FEED_CHOICES)
+    @app_commands.guild_only()
+    @app_commands.default_permissions(manage_guild=True)
+    async def unsubscribe(self, interaction: discord.Interaction, feed: app_commands.Choice[str],
+                          channel: Optional[discord.TextChannel] = None):
+        """피드 구독 해제"""
+        removed = self.registry.unsubscribe(interaction.guild_id, feed.value, channel.id if channel else None)
+        if removed:
+            await interaction.response.send_message(f"✅ {feed.name} 구독 {removed}개를 해제했습니다.")
+        else:
+            await interaction.response.send_message(f"ℹ️ 해제할 {feed.name} 구독이 없습니다.", ephemeral=True)
+
+    @app_commands.command(name="subscriptions", description="이 서버의 피드 구독 목록을 확인합니다")
+    @app_commands.guild_only()
+    async def list_subscriptions(self, interaction: discord.Interaction):
+        """길드 구독 목록"""
+        entry = self.registry.for_guild(interaction.guild_id)
+        lines = ["**피드 구독 목록**"]
+        for feed, label in FEEDS.items():
+            channels = ", ".join(f"<#{channel_id}>" for channel_id in entry.get(feed, [])) or "없음"
+            lines.append(f"{label}: {channels}")
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Subscriptions(bot))
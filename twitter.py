@@ -1,106 +1,268 @@
 import discord
-import tweepy
 import logging
 import asyncio
 import aiohttp
 import json
+import time
 from datetime import datetime, timedelta
 from discord.ext import commands, tasks
-from typing import Optional
+from typing import Dict, List, Optional
 from config import BEARER_TOKEN as TWITTER_BEARER_TOKEN
-from config import TWITTER_USERNAME
-from config import DISCORD_CHANNEL_ID as TWITTER_NOTIFY_CHANNEL_ID
+from config import TWITTER_USERNAME, TWITTER_USERNAMES
+from config import TWITTER_CATCH_UP_MAX_HOURS, TWITTER_CATCH_UP_MAX_TWEETS
+from http_client import get_http_client
+from resilience import CircuitOpenError
+from state_store import get_state_store
+from subscriptions import get_subscriptions
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
+# 필요한 게이트웨이 intents (구독 채널 조회)
+REQUIRED_INTENTS = ("guilds",)
+
+# API 엔드포인트
+TWITTER_API_BASE = "https://api.twitter.com/2"
+
+# HTTP 서비스 이름
+HTTP_SERVICE = "twitter"
+
+# 상태 저장 설정
+STATE_NAMESPACE = "twitter"
+LEGACY_CURSOR_FILE = "last_tweet_id.txt"  # 이전 버전에서 쓰던 커서 파일 (최초 1회만 읽음)
+CATCH_UP_PAGE_SIZE = 100                  # 재시작 후 밀린 트윗을 가져올 때 페이지 크기
+MAX_CATCH_UP_PAGES = 5                    # 한 번에 따라잡을 최대 페이지 수
+TWITTER_EPOCH_MS = 1288834974657          # 트윗 ID(snowflake)에 들어 있는 시각의 기준점
+
+# 다중 계정 모니터링 설정
+USER_LOOKUP_BATCH = 100       # /2/users/by 한 번에 조회할 수 있는 최대 사용자 수
+MAX_CONCURRENT_TIMELINES = 8  # 동시에 가져올 타임라인 수
+RATE_LIMIT_REQUESTS = 1500    # 타임라인 API 요청 한도 (15분당, 앱 인증 기준)
+RATE_LIMIT_WINDOW = 900       # 요청 한도 기준 시간(초)
+
+
+def tweet_age_hours(tweet_id: str) -> float:
+    """트윗 ID(snowflake)에 들어 있는 작성 시각으로 계산한 경과 시간(시간)"""
+    created_ms = (int(tweet_id) >> 22) + TWITTER_EPOCH_MS
+    return (time.time() * 1000 - created_ms) / 3_600_000
+
+
+class RateBudget:
+    """하나의 Rate Limit 창 안에서 요청 수를 나눠 쓰는 예산"""
+
+    def __init__(self, limit: int = RATE_LIMIT_REQUESTS, window: float = RATE_LIMIT_WINDOW):
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset_at = time.monotonic() + window
+
+    def try_acquire(self) -> bool:
+        """요청 1회분을 사용 (남은 예산이 없으면 False)"""
+        now = time.monotonic()
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+    def update_from_headers(self, headers):
+        """응답의 x-rate-limit-* 헤더로 남은 예산 보정"""
+        try:
+            remaining = headers.get("x-rate-limit-remaining")
+            reset = headers.get("x-rate-limit-reset")
+            if remaining is not None:
+                self.remaining = min(self.remaining, int(remaining))
+            if reset is not None:
+                self.reset_at = time.monotonic() + max(int(reset) - time.time(), 0)
+        except ValueError:
+            pass
+
+
 class Twitter(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.user_id: Optional[str] = None
-        self.latest_tweet_id: Optional[str] = None
-        self.notify_channel: Optional[discord.TextChannel] = None
+        self.store = get_state_store(bot)
+        self.http = get_http_client(bot)
+        self.subscriptions = get_subscriptions(bot)
+        self.http.register_service(HTTP_SERVICE, timeout=30, headers={
+            "Authorization": f"Bearer {TWITTER_BEARER_TOKEN}"
+        })
+        self.breaker = self.http.breaker(HTTP_SERVICE)
+        self.usernames: List[str] = list(TWITTER_USERNAMES)
+        self.user_ids: Dict[str, str] = {}    # username(소문자) → user id
+        self.since_ids: Dict[str, str] = {}   # user id → 마지막으로 처리한 트윗 ID
         self.last_check_time: Optional[datetime] = None
+        self.last_poll_duration: Optional[float] = None
+        self.rate_budget = RateBudget()
         self.check_tweets.start()
 
+    async def cog_load(self):
+        """저장된 사용자 ID와 계정별 커서 복원 (재시작 시 마지막 위치부터 이어서 확인)"""
+        await self.store.open()
+        self._restore_cursors()
+
+    async def cluster_promoted(self):
+        """클러스터에서 리더를 이어받음 - 이전 리더가 저장한 커서부터 이어서 확인"""
+        self._restore_cursors()
+
+    def _restore_cursors(self):
+        for username in self.usernames:
+            user_id = self.store.get(STATE_NAMESPACE, f"user_id:{username}")
+            if user_id:
+                self.user_ids[username.lower()] = user_id
+                since_id = self.store.get(STATE_NAMESPACE, f"latest_tweet_id:{user_id}")
+                if since_id:
+                    self.since_ids[user_id] = since_id
+
+        # 단일 계정 시절의 커서는 첫 번째 계정으로 이전
+        legacy = self.store.get(STATE_NAMESPACE, "latest_tweet_id") or self._load_legacy_cursor()
+        if legacy and not self.store.get(STATE_NAMESPACE, "legacy_migrated"):
+            user_id = self.user_ids.get(TWITTER_USERNAME.lower())
+            if user_id:
+                self._seed_legacy_cursor(user_id, legacy)
+            else:
+                self.store.set(STATE_NAMESPACE, f"legacy_cursor:{TWITTER_USERNAME}", legacy)
+            self.store.set(STATE_NAMESPACE, "legacy_migrated", True)
+            self.store.delete(STATE_NAMESPACE, "latest_tweet_id")
+
+        if self.since_ids:
+            logger.info(f"✅ 저장된 트윗 커서 복원: {len(self.since_ids)}개 계정")
+
     async def cog_unload(self):
         """Cog 언로드 시 정리"""
         self.check_tweets.cancel()
 
+    def _load_legacy_cursor(self) -> Optional[str]:
+        """이전 버전의 last_tweet_id.txt 커서 읽기"""
+        try:
+            with open(LEGACY_CURSOR_FILE, encoding="utf-8") as f:
+                tweet_id = f.read().strip()
+        except OSError:
+            return None
+        return tweet_id if tweet_id.isdigit() else None
+
+    def _save_cursor(self, user_id: str, tweet_id: str):
+        """계정별로 마지막으로 처리한 트윗 ID 저장"""
+        self.since_ids[user_id] = tweet_id
+        self.store.set(STATE_NAMESPACE, f"latest_tweet_id:{user_id}", tweet_id)
+
+    def _seed_legacy_cursor(self, user_id: str, tweet_id: str):
+        """이전 버전 커서로 이어서 확인 (오래된 트윗은 _process_tweets_data 에서 알리지 않고 건너뜀)"""
+        if user_id not in self.since_ids:
+            self._save_cursor(user_id, tweet_id)
+
+    def _username_for(self, user_id: str) -> str:
+        for username in self.usernames:
+            if self.user_ids.get(username.lower()) == user_id:
+                return username
+        return user_id
+
     async def init_twitter(self) -> bool:
-        """트위터 사용자 ID 초기화"""
-        if self.user_id:
+        """트위터 사용자 ID 초기화 (아직 모르는 계정만 100명 단위로 한 번에 조회)"""
+        missing = [u for u in self.usernames if u.lower() not in self.user_ids]
+        if not missing:
             return True
 
         try:
-            headers = {
-                "Authorization": f"Bearer {TWITTER_BEARER_TOKEN}",
-                "User-Agent": "DiscordBot/1.0"
-            }
-
-            url = f"https://api.twitter.com/2/users/by/username/{TWITTER_USERNAME}"
+            for start in range(0, len(missing), USER_LOOKUP_BATCH):
+                batch = missing[start:start + USER_LOOKUP_BATCH]
+                url = f"{TWITTER_API_BASE}/users/by"
 
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
-                async with session.get(url, headers=headers) as response:
+                async with self.http.get(HTTP_SERVICE, url, params={"usernames": ",".join(batch)}) as response:
                     if response.status == 200:
                         data = await response.json()
-                        if "data" in data:
-                            self.user_id = data["data"]["id"]
-                            logger.info(f"✅ Twitter 사용자 ID 초기화: {TWITTER_USERNAME} → {self.user_id}")
-                            return True
-                        else:
-                            logger.error(f"❌ 사용자 데이터가 없습니다: {TWITTER_USERNAME}")
+                        for user in data.get("data", []):
+                            self._register_user(user["username"], user["id"])
+                        for error in data.get("errors", []):
+                            logger.error(f"❌ 사용자 데이터가 없습니다: {error.get('value', error)}")
                     elif response.status == 401:
                         logger.error("❌ Twitter API 인증 실패 - Bearer 토큰을 확인하세요")
+                        break
                     elif response.status == 429:
-                        logger.warning("❌ Twitter API Rate Limit 초과")
+                        logger.warning(f"❌ Twitter API Rate Limit 초과 - {self.breaker.retry_in:.0f}초 동안 요청 중단")
+                        break
                     else:
                         logger.error(f"❌ Twitter API 오류: {response.status}")
+                        break
 
         except asyncio.TimeoutError:
             logger.error("❌ Twitter API 연결 타임아웃")
+        except CircuitOpenError as e:
+            logger.debug(f"Twitter 사용자 조회 건너뜀: {e}")
         except aiohttp.ClientError as e:
             logger.error(f"❌ Twitter API 연결 오류: {e}")
         except Exception as e:
             logger.error(f"❌ Twitter 초기화 중 예상치 못한 오류: {e}")
 
-        return False
+        return bool(self.user_ids)
+
+    def _register_user(self, username: str, user_id: str):
+        """조회한 사용자 ID를 캐시하고 저장"""
+        for configured in self.usernames:
+            if configured.lower() == username.lower():
+                username = configured
+                break
+        self.user_ids[username.lower()] = user_id
+        self.store.set(STATE_NAMESPACE, f"user_id:{username}", user_id)
+        logger.info(f"✅ Twitter 사용자 ID 초기화: {username} → {user_id}")
+
+        # 단일 계정 시절 커서가 있으면 이어서 사용
+        legacy = self.store.get(STATE_NAMESPACE, f"legacy_cursor:{username}")
+        if legacy:
+            self._seed_legacy_cursor(user_id, legacy)
+            self.store.delete(STATE_NAMESPACE, f"legacy_cursor:{username}")
 
     @tasks.loop(minutes=10.0)
     async def check_tweets(self):
         """주기적으로 새 트윗 확인"""
         await self.bot.wait_until_ready()
 
+        # API 가 차단 상태면 이번 주기는 요청하지 않음 (차단이 풀린 뒤 첫 주기에 시험 요청)
+        if self.breaker.is_open:
+            logger.info(f"⏸️ Twitter API 차단 중이라 트윗 확인을 건너뜁니다: {self.breaker.describe()}")
+            return
+
         # 초기화 확인
         if not await self.init_twitter():
             logger.warning("Twitter API 초기화 실패. 다음 시도까지 대기합니다.")
             return
 
-        # 알림 채널 설정
-        if not self.notify_channel:
-            try:
-                self.notify_channel = self.bot.get_channel(TWITTER_NOTIFY_CHANNEL_ID)
-                if not self.notify_channel:
-                    logger.error(f"❌ 알림 채널을 찾을 수 없음: {TWITTER_NOTIFY_CHANNEL_ID}")
-                    return
-            except Exception as e:
-                logger.error(f"❌ 채널 설정 오류: {e}")
-                return
+        # 구독한 채널이 없으면 API 호출을 아낌
+        if not self.subscriptions.has_subscribers("twitter"):
+            logger.debug("트윗 알림을 구독한 채널이 없어 확인을 건너뜁니다.")
+            return
 
         try:
-            await self._fetch_and_process_tweets()
+            await self.poll_timelines()
 
         except Exception as e:
             logger.error(f"❌ 트윗 확인 중 예상치 못한 오류: {e}")
 
-    async def _fetch_and_process_tweets(self):
-        """트윗 가져오기 및 처리"""
-        try:
-            headers = {
-                "Authorization": f"Bearer {TWITTER_BEARER_TOKEN}",
-                "User-Agent": "DiscordBot/1.0"
-            }
+    async def poll_timelines(self):
+        """모든 계정의 타임라인을 동시에 확인 (동시 요청 수와 Rate Limit 예산 안에서)"""
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_TIMELINES)
+
+        async def poll(user_id: str):
+            async with semaphore:
+                # 다른 계정 요청이 429/5xx 로 브레이커를 열었으면 나머지는 보내지 않음
+                if self.breaker.is_open:
+                    return
+                if not self.rate_budget.try_acquire():
+                    logger.warning(f"⚠️ Rate Limit 예산 소진으로 건너뜀: {self._username_for(user_id)}")
+                    return
+                await self._fetch_and_process_tweets(user_id)
 
+        await asyncio.gather(*(poll(user_id) for user_id in list(self.user_ids.values())))
+        self.last_check_time = datetime.now()
+        self.last_poll_duration = time.monotonic() - started
+        logger.debug(f"트윗 확인 완료: {len(self.user_ids)}개 계정, {self.last_poll_duration:.2f}초")
+
+    async def _fetch_and_process_tweets(self, user_id: str):
+        """트윗 가져오기 및 처리 (저장된 커서 이후 트윗은 페이지를 넘겨가며 한꺼번에 가져옴)"""
+        try:
             # API 파라미터 설정
             params = {
                 "max_results": "5",
@@ -108,70 +270,105 @@ class Twitter(commands.Cog):
                 "tweet.fields": "created_at,public_metrics"
             }
 
-            if self.latest_tweet_id:
-                params["since_id"] = self.latest_tweet_id
+            since_id = self.since_ids.get(user_id)
+            if since_id:
+                params["since_id"] = since_id
+                params["max_results"] = str(CATCH_UP_PAGE_SIZE)
 
-            url = f"https://api.twitter.com/2/users/{self.user_id}/tweets"
+            url = f"{TWITTER_API_BASE}/users/{user_id}/tweets"
+            tweets = []
 
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
-                async with session.get(url, headers=headers, params=params) as response:
+            for page in range(MAX_CATCH_UP_PAGES):
+                # 첫 페이지는 poll_timelines 에서 예산을 이미 사용함
+                if page > 0 and not self.rate_budget.try_acquire():
+                    break
+
+                async with self.http.get(HTTP_SERVICE, url, params=params) as response:
+                    self.rate_budget.update_from_headers(response.headers)
                     if response.status == 200:
                         data = await response.json()
-                        await self._process_tweets_data(data)
-
                     elif response.status == 401:
                         logger.error("❌ Twitter API 인증 실패")
+                        break
                     elif response.status == 429:
-                        logger.warning("❌ Twitter API Rate Limit 초과")
+                        logger.warning(f"❌ Twitter API Rate Limit 초과 - {self.breaker.retry_in:.0f}초 동안 요청 중단")
+                        break
                     else:
                         logger.error(f"❌ Twitter API 오류: {response.status}")
                         error_text = await response.text()
                         logger.error(f"응답 내용: {error_text}")
+                        break
+
+                page_tweets = data.get("data") or []
+                tweets.extend(page_tweets)
+                next_token = data.get("meta", {}).get("next_token")
+                if not since_id or not next_token:
+                    break
+                # 페이지는 최신순 - 이미 알림 제한 시간보다 오래된 트윗까지 왔으면 더 넘겨도 알리지 않음
+                if page_tweets and tweet_age_hours(min(page_tweets, key=lambda t: int(t["id"]))["id"]) \
+                        > TWITTER_CATCH_UP_MAX_HOURS:
+                    break
+                params["pagination_token"] = next_token
+
+            await self._process_tweets_data(user_id, {"data": tweets})
 
         except asyncio.TimeoutError:
             logger.error("❌ Twitter API 요청 타임아웃")
+        except CircuitOpenError as e:
+            logger.debug(f"트윗 가져오기 건너뜀 ({self._username_for(user_id)}): {e}")
         except aiohttp.ClientError as e:
             logger.error(f"❌ Twitter API 연결 오류: {e}")
         except Exception as e:
             logger.error(f"❌ 트윗 가져오기 중 오류: {e}")
 
-    async def _process_tweets_data(self, data: dict):
+    async def _process_tweets_data(self, user_id: str, data: dict):
         """트윗 데이터 처리"""
         try:
             if "data" not in data or not data["data"]:
-                logger.info("새로운 트윗이 없습니다.")
+                logger.debug(f"새로운 트윗이 없습니다: {self._username_for(user_id)}")
                 return
 
             tweets = data["data"]
+            since_id = self.since_ids.get(user_id)
 
             # 첫 실행시 최신 트윗 ID만 저장
-            if not self.latest_tweet_id:
-                self.latest_tweet_id = tweets[0]["id"]
-                logger.info(f"✅ 첫 실행: 최신 트윗 ID({self.latest_tweet_id}) 저장")
+            if not since_id:
+                self._save_cursor(user_id, max(tweets, key=lambda t: int(t["id"]))["id"])
+                logger.info(f"✅ 첫 실행: {self._username_for(user_id)} 최신 트윗 ID({self.since_ids[user_id]}) 저장")
                 return
 
             # 오래된 트윗부터 처리
-            sorted_tweets = sorted(tweets, key=lambda t: t["id"])
+            username = self._username_for(user_id)
+            new_tweets = sorted((t for t in tweets if int(t["id"]) > int(since_id)), key=lambda t: int(t["id"]))
+            if not new_tweets:
+                return
 
-            for tweet in sorted_tweets:
-                if int(tweet["id"]) <= int(self.latest_tweet_id):
-                    continue
+            # 따라잡을 때는 너무 오래된 트윗은 건너뛰고 최근 트윗도 계정별 최대 개수까지만 알림
+            recent = [t for t in new_tweets if tweet_age_hours(t["id"]) <= TWITTER_CATCH_UP_MAX_HOURS]
+            to_send = recent[-TWITTER_CATCH_UP_MAX_TWEETS:]
+            skipped = len(new_tweets) - len(to_send)
+            if skipped:
+                logger.warning(f"⚠️ {username} 밀린 트윗 {skipped}개는 알리지 않고 건너뜁니다 "
+                               f"({TWITTER_CATCH_UP_MAX_HOURS:g}시간 / {TWITTER_CATCH_UP_MAX_TWEETS}개 제한)")
 
-                await self._send_tweet_notification(tweet)
-                self.latest_tweet_id = tweet["id"]
+            for tweet in to_send:
+                await self._send_tweet_notification(tweet, username)
+                self._save_cursor(user_id, tweet["id"])
+            if new_tweets[-1]["id"] != self.since_ids.get(user_id):
+                self._save_cursor(user_id, new_tweets[-1]["id"])
 
         except Exception as e:
             logger.error(f"❌ 트윗 데이터 처리 중 오류: {e}")
 
-    async def _send_tweet_notification(self, tweet: dict):
+    async def _send_tweet_notification(self, tweet: dict, username: str):
         """트윗 알림 전송"""
         try:
             tweet_id = tweet["id"]
             tweet_text = tweet["text"]
-            tweet_url = f"https://twitter.com/{TWITTER_USERNAME}/status/{tweet_id}"
+            tweet_url = f"https://twitter.com/{username}/status/{tweet_id}"
 
             embed = discord.Embed(
-                title=f"{TWITTER_USERNAME}님의 새 트윗",
+                title=f"{username}님의 새 트윗",
                 description=tweet_text,
                 color=0x1DA1F2,
                 url=tweet_url
@@ -187,11 +384,11 @@ class Twitter(commands.Cog):
                 except Exception as e:
                     logger.warning(f"시간 파싱 오류: {e}")
 
-            await self.notify_channel.send(embed=embed)
-            logger.info(f"✅ 새 트윗 알림 전송 완료: {tweet_id}")
+            # 임베드는 한 번만 만들고 구독 채널 전체로 보냄 (몰려 온 트윗은 채널마다 한 메시지로 묶임)
+            result = self.subscriptions.publish("twitter", embed=embed, label=f"트윗 알림({username}/{tweet_id})")
+            if result.queued:
+                logger.info(f"✅ 새 트윗 알림 대기열 등록: {username}/{tweet_id} ({result})")
 
-        except discord.HTTPException as e:
-            logger.error(f"❌ Discord 메시지 전송 오류: {e}")
         except Exception as e:
             logger.error(f"❌ 트윗 알림 전송 중 오류: {e}")
 
@@ -205,9 +402,15 @@ class Twitter(commands.Cog):
 
             # 초기화 확인
             init_success = await self.init_twitter()
+            last_poll = f"{self.last_poll_duration:.2f}초" if self.last_poll_duration is not None else "없음"
 
             debug_msg = f"""**Twitter 디버그 정보**
 초기화 상태: {'성공' if init_success else '실패'}
+모니터링 계정: {len(self.user_ids)}/{len(self.usernames)}개 확인됨
+마지막 확인 소요 시간: {last_poll}
+남은 Rate Limit 예산: {self.rate_budget.remaining}/{self.rate_budget.limit}
+서킷 브레이커: {self.breaker.describe()}
+구독 채널: {len(self.subscriptions.channel_ids("twitter"))}개
 현재 시각: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
 
             await interaction.followup.send(debug_msg)
@@ -225,4 +428,4 @@ class Twitter(commands.Cog):
                 await interaction.response.send_message(f"❌ 디버그 실행 중 오류: {str(e)}")
 
 async def setup(bot):
-    await bot.add_cog(Twitter(bot))
\ No newline at end of file
+    await bot.add_cog(Twitter(bot))
@@ -0,0 +1,200 @@
+# websub.py
+import hmac
+import time
+import hashlib
+import logging
+import secrets
+import asyncio
+import aiohttp
+from aiohttp import web
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# WebSub(PubSubHubbub) 설정
+DEFAULT_HUB_URL = "https://pubsubhubbub.appspot.com/subscribe"
+DEFAULT_LEASE_SECONDS = 432000   # 5일 (허브가 더 짧게 줄 수 있음)
+RENEW_MARGIN = 3600              # 만료 1시간 전에 갱신
+RETRY_DELAY = 300                # 구독 요청 실패 시 재시도 대기(초)
+MAX_BODY_SIZE = 1024 * 1024      # 알림 본문 최대 크기
+
+# HTTP 서비스 이름
+HTTP_SERVICE = "websub_hub"
+
+
+class WebSubSubscriber:
+    """WebSub 허브에 토픽을 구독하고 푸시 알림을 받는 내장 HTTP 엔드포인트"""
+
+    def __init__(self, http, topic_url: str, callback_url: str,
+                 on_notification: Callable[[str], Awaitable[None]],
+                 secret: Optional[str] = None, hub_url: str = DEFAULT_HUB_URL,
+                 host: str = "0.0.0.0", port: int = 8080, lease_seconds: int = DEFAULT_LEASE_SECONDS,
+                 retry_delay: float = RETRY_DELAY):
+        self.http = http
+        self.http.register_service(HTTP_SERVICE, timeout=30)
+        self.topic_url = topic_url
+        self.callback_url = callback_url
+        self.on_notification = on_notification
+        self.secret = secret or secrets.token_hex(20)
+        self.hub_url = hub_url
+        self.host = host
+        self.port = port
+        self.lease_seconds = lease_seconds
+        self.retry_delay = retry_delay
+        self.path = urlparse(callback_url).path or "/"
+        self.lease_expires_at: Optional[float] = None
+        self.last_verified_at: Optional[float] = None
+        self.last_notification_at: Optional[float] = None
+        self.notifications = 0
+        self.rejected = 0
+        self._pending: Dict[str, str] = {}   # 허브 확인을 기다리는 요청 (모드 → hub.verify_token)
+        self._runner: Optional[web.AppRunner] = None
+        self._renew_task: Optional[asyncio.Task] = None
+        self._dispatch_tasks = set()
+
+    @property
+    def is_active(self) -> bool:
+        """허브가 구독을 확인했고 리스가 아직 유효한지"""
+        return self.lease_expires_at is not None and time.time() < self.lease_expires_at
+
+    async def start(self):
+        """HTTP 엔드포인트 시작 후 구독 및 자동 갱신 시작"""
+        app = web.Application(client_max_size=MAX_BODY_SIZE)
+        app.router.add_get(self.path, self._handle_verify)
+        app.router.add_post(self.path, self._handle_notify)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"✅ WebSub 수신 엔드포인트 시작: {self.host}:{self.port}{self.path}")
+        self._renew_task = asyncio.create_task(self._renew_loop())
+
+    async def stop(self):
+        """갱신 중단 및 엔드포인트 종료"""
+        if self._renew_task:
+            self._renew_task.cancel()
+            await asyncio.gather(self._renew_task, return_exceptions=True)
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def subscribe(self, mode: str = "subscribe") -> bool:
+        """허브에 구독(또는 해지) 요청 - 실제 확인은 허브가 콜백 GET 으로 수행"""
+        verify_token = secrets.token_hex(16)
+        self._pending[mode] = verify_token
+        data = {
+            "hub.callback": self.callback_url,
+            "hub.topic": self.topic_url,
+            "hub.verify": "async",
+            "hub.mode": mode,
+            "hub.secret": self.secret,
+            "hub.lease_seconds": str(self.lease_seconds),
+            "hub.verify_token": verify_token,
+        }
+        try:
+            async with self.http.request(HTTP_SERVICE, "POST", self.hub_url, data=data) as response:
+                if response.status in (202, 204):
+                    logger.info(f"✅ WebSub {mode} 요청 완료: {self.topic_url}")
+                    return True
+                logger.error(f"❌ WebSub 허브 응답 오류: {response.status} {await response.text()}")
+        except asyncio.TimeoutError:
+            logger.error("❌ WebSub 허브 요청 타임아웃")
+        except aiohttp.ClientError as e:
+            logger.error(f"❌ WebSub 허브 연결 오류: {e}")
+        if self._pending.get(mode) == verify_token:
+            del self._pending[mode]
+        return False
+
+    async def _renew_loop(self):
+        """리스 만료 전에 자동으로 재구독"""
+        while True:
+            requested_at = time.time()
+            if not await self.subscribe():
+                await asyncio.sleep(self.retry_delay)
+                continue
+
+            # 허브 확인(GET)을 기다렸다가 만료 직전까지 대기
+            await asyncio.sleep(self.retry_delay)
+            if not self.is_active or (self.last_verified_at or 0) < requested_at:
+                logger.warning("⚠️ WebSub 구독 확인을 받지 못했습니다. 다시 요청합니다.")
+                continue
+            await asyncio.sleep(max(self.lease_expires_at - time.time() - RENEW_MARGIN, self.retry_delay))
+
+    async def _handle_verify(self, request: web.Request) -> web.Response:
+        """허브의 구독 확인 요청 (hub.challenge 를 그대로 돌려줌)
+
+        누구나 콜백 URL 로 GET 을 보낼 수 있으므로 subscribe() 로 보낸 요청이 확인을 기다리는 중이고
+        hub.verify_token 이 그 요청의 값과 같을 때만 받아들임 (거부 알림은 구독 요청에 대한 것)
+        """
+        query = request.query
+        mode = query.get("hub.mode")
+        if query.get("hub.topic") != self.topic_url or mode not in ("subscribe", "unsubscribe", "denied"):
+            return web.Response(status=404)
+        requested = "subscribe" if mode == "denied" else mode
+        verify_token = self._pending.get(requested)
+        if verify_token is None or not hmac.compare_digest(query.get("hub.verify_token", ""), verify_token):
+            logger.warning(f"⚠️ 요청하지 않은 WebSub 확인 요청을 무시합니다: {mode}")
+            return web.Response(status=404)
+
+        if mode == "denied":
+            logger.error(f"❌ WebSub 구독 거부: {query.get('hub.reason', '')}")
+            del self._pending[requested]
+            self.lease_expires_at = None
+            return web.Response(status=200)
+
+        if mode == "subscribe":
+            try:
+                lease = int(query.get("hub.lease_seconds", self.lease_seconds))
+            except ValueError:
+                lease = -1
+            if lease <= 0:
+                logger.warning(f"⚠️ WebSub 구독 확인의 리스 값이 잘못되었습니다: {query.get('hub.lease_seconds')!r}")
+                return web.Response(status=400)
+            self.lease_expires_at = time.time() + lease
+            self.last_verified_at = time.time()
+            logger.info(f"✅ WebSub 구독 확인 (리스 {lease // 3600}시간)")
+        else:
+            self.lease_expires_at = None
+        del self._pending[mode]
+        return web.Response(text=query.get("hub.challenge", ""))
+
+    def verify_signature(self, body: bytes, header: Optional[str]) -> bool:
+        """X-Hub-Signature(HMAC) 검증"""
+        if not header or "=" not in header:
+            return False
+        method, signature = header.split("=", 1)
+        digest = getattr(hashlib, method.lower(), None)
+        if method.lower() not in ("sha1", "sha256", "sha384", "sha512") or digest is None:
+            return False
+        expected = hmac.new(self.secret.encode(), body, digest).hexdigest()
+        return hmac.compare_digest(expected, signature)
+
+    async def _handle_notify(self, request: web.Request) -> web.Response:
+        """허브의 콘텐츠 알림 (서명이 맞지 않으면 무시)"""
+        body = await request.read()
+        if not self.verify_signature(body, request.headers.get("X-Hub-Signature")):
+            # 스펙상 서명 불일치도 2xx 로 응답하고 내용만 무시
+            self.rejected += 1
+            logger.warning("⚠️ WebSub 알림 서명 불일치 - 무시합니다.")
+            return web.Response(status=202)
+
+        self.notifications += 1
+        self.last_notification_at = time.time()
+        task = asyncio.create_task(self._dispatch(body.decode("utf-8", errors="replace")))
+        self._dispatch_tasks.add(task)
+        task.add_done_callback(self._dispatch_tasks.discard)
+        return web.Response(status=202)
+
+    async def _dispatch(self, text: str):
+        try:
+            await self.on_notification(text)
+        except Exception as e:
+            logger.error(f"❌ WebSub 알림 처리 중 오류: {e}", exc_info=True)
+
+    def describe(self) -> str:
+        """디버그용 상태 문자열"""
+        if not self.is_active:
+            return "구독 확인 대기 중 (폴링으로 동작)"
+        remaining = (self.lease_expires_at - time.time()) / 3600
+        return f"활성 (리스 {remaining:.1f}시간 남음, 알림 {self.notifications}건, 서명 거부 {self.rejected}건)"
@@ -1,36 +1,167 @@
 import os
+import time
 import logging
 import asyncio
+import aiohttp
 import discord
+import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 from discord.ext import commands, tasks
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 # config.py에서 설정 정보 가져오기
-from config import YOUTUBE_API_KEY, YOUTUBE_CHANNEL_ID, DISCORD_YOUTUBE_CHANNEL_ID
+from config import YOUTUBE_API_KEY, YOUTUBE_CHANNEL_ID, YOUTUBE_INGEST_MODE
+from config import YOUTUBE_WEBSUB_CALLBACK_URL, YOUTUBE_WEBSUB_SECRET, YOUTUBE_WEBSUB_PORT
+from http_client import get_http_client
+from state_store import get_state_store
+from subscriptions import get_subscriptions
+from cluster import is_leader
+from resilience import CircuitOpenError
+from youtube_api import HTTP_SERVICE as API_HTTP_SERVICE
+from youtube_api import YouTubeAPI, YouTubeAPIError, YouTubeAuthError, YouTubeNotFoundError, YouTubeQuotaError
+
+if TYPE_CHECKING:
+    from websub import WebSubSubscriber
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
+# 필요한 게이트웨이 intents (구독 채널 조회)
+REQUIRED_INTENTS = ("guilds",)
+
+# 상태 저장 설정
+STATE_NAMESPACE = "youtube"
+
+# 수집 설정
+RSS_FEED_URL = "https://www.youtube.com/feeds/videos.xml?channel_id={}"
+HTTP_SERVICE = "youtube_rss"
+PLAYLIST_PAGE_SIZE = 50     # playlistItems.list 최대 페이지 크기
+MAX_CATCH_UP_PAGES = 3      # 마지막으로 본 동영상까지 거슬러 올라갈 최대 페이지 수
+POLL_INTERVAL_MINUTES = 2   # playlistItems.list 는 1 unit 이라 2분 간격이어도 하루 720 unit
+
+# 푸시(WebSub) 설정
+WEBSUB_TOPIC_URL = "https://www.youtube.com/xml/feeds/videos.xml?channel_id={}"
+PUSH_SAFETY_POLL_MINUTES = 60   # 푸시가 활성일 때도 놓친 알림 대비로 이 간격마다 한 번 폴링
+PUSH_SILENCE_HOURS = 24         # 이 시간 동안 푸시가 한 번도 오지 않으면 리스가 살아 있어도 평소 간격으로 폴링
+
+# Atom 피드 네임스페이스
+ATOM_NS = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "yt": "http://www.youtube.com/xml/schemas/2015",
+    "media": "http://search.yahoo.com/mrss/",
+}
+
+
+def uploads_playlist_id(channel_id: str) -> str:
+    """채널 ID(UC...)에 대응하는 업로드 재생목록 ID(UU...)"""
+    return "UU" + channel_id[2:] if channel_id.startswith("UC") else channel_id
+
+
+def parse_atom_feed(text: str) -> List[Dict[str, str]]:
+    """YouTube Atom 피드를 동영상 목록으로 변환 (최신순)"""
+    root = ET.fromstring(text)
+    videos = []
+    for entry in root.findall("atom:entry", ATOM_NS):
+        video_id = entry.findtext("yt:videoId", default="", namespaces=ATOM_NS)
+        if not video_id:
+            continue
+        videos.append({
+            "id": video_id,
+            "title": entry.findtext("atom:title", default="", namespaces=ATOM_NS),
+            "description": entry.findtext("media:group/media:description", default="", namespaces=ATOM_NS),
+            "published": entry.findtext("atom:published", default="", namespaces=ATOM_NS),
+        })
+    videos.sort(key=lambda v: v["published"], reverse=True)
+    return videos
+
+
+def parse_published(value: Optional[str]) -> Optional[datetime]:
+    """게시 시각 문자열(RSS: +00:00, Data API: Z)을 비교 가능한 datetime 으로 변환"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
 class YouTube(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.youtube: Optional[object] = None
+        self.store = get_state_store(bot)
+        self.http = get_http_client(bot)
+        self.subscriptions = get_subscriptions(bot)
+        self.ingest_mode = YOUTUBE_INGEST_MODE
+        self.http.register_service(HTTP_SERVICE, timeout=15)
+        # 수집 방식에 따라 요청하는 서비스가 다름 (RSS: youtube_rss, playlist: youtube_api)
+        self.breaker = self.http.breaker(HTTP_SERVICE if self.ingest_mode == "rss" else API_HTTP_SERVICE)
+        self.youtube: Optional[YouTubeAPI] = None
         self.channel_id = YOUTUBE_CHANNEL_ID
-        self.discord_channel_id = DISCORD_YOUTUBE_CHANNEL_ID
         self.latest_video_id: Optional[str] = None
-        self.notify_channel: Optional[discord.TextChannel] = None
-        if YOUTUBE_API_KEY and YOUTUBE_CHANNEL_ID:
+        self.latest_published: Optional[datetime] = None
+        self.push_missed_at: Optional[float] = None
+        self.websub: Optional["WebSubSubscriber"] = None
+        self.last_poll_at: Optional[datetime] = None
+        self._process_lock = asyncio.Lock()
+        if YOUTUBE_CHANNEL_ID and (YOUTUBE_API_KEY or self.ingest_mode == "rss"):
             self.check_youtube.start()
         else:
             logger.warning("YouTube API 키 또는 채널 ID가 없어 YouTube 모니터링을 시작하지 않습니다.")
 
+    async def cog_load(self):
+        """저장된 커서 복원 (재시작 시 마지막 위치부터 이어서 확인)"""
+        await self.store.open()
+        self._restore_cursor()
+        if self.latest_video_id:
+            logger.info(f"✅ 저장된 YouTube 커서 복원: {self.latest_video_id}")
+        # 클러스터에서는 리더만 푸시를 받음 (팔로워는 리더를 이어받을 때 시작)
+        if is_leader(self.bot):
+            await self._start_websub()
+
+    async def cluster_promoted(self):
+        """클러스터에서 리더를 이어받음 - 이전 리더가 저장한 커서부터 이어서 확인하고 푸시 엔드포인트 시작"""
+        self._restore_cursor()
+        await self._start_websub()
+
+    async def _start_websub(self):
+        # 푸시 모드: 콜백 URL이 설정된 경우에만 내장 엔드포인트 시작
+        if YOUTUBE_WEBSUB_CALLBACK_URL and self.channel_id and self.websub is None:
+            # aiohttp.web 은 푸시를 쓸 때만 import
+            from websub import WebSubSubscriber
+            self.websub = WebSubSubscriber(
+                self.http,
+                topic_url=WEBSUB_TOPIC_URL.format(self.channel_id),
+                callback_url=YOUTUBE_WEBSUB_CALLBACK_URL,
+                on_notification=self._handle_push,
+                secret=YOUTUBE_WEBSUB_SECRET,
+                port=YOUTUBE_WEBSUB_PORT,
+            )
+            try:
+                await self.websub.start()
+            except OSError as e:
+                logger.error(f"❌ WebSub 엔드포인트 시작 실패 - 폴링만 사용합니다: {e}")
+                self.websub = None
+
+    def _restore_cursor(self):
+        """저장된 마지막 동영상 ID와 게시 시각 불러오기"""
+        self.latest_video_id = self.store.get(STATE_NAMESPACE, f"latest_video_id:{self.channel_id}")
+        self.latest_published = parse_published(self.store.get(STATE_NAMESPACE, f"latest_published:{self.channel_id}"))
+
+    def _save_cursor(self, video: Dict[str, str], seen: Optional[List[str]] = None):
+        """마지막으로 처리한 동영상 ID와 게시 시각 저장"""
+        self.latest_video_id = video["id"]
+        self.store.set(STATE_NAMESPACE, f"latest_video_id:{self.channel_id}", video["id"])
+        published = parse_published(video.get("published"))
+        if published and (self.latest_published is None or published > self.latest_published):
+            self.latest_published = published
+            self.store.set(STATE_NAMESPACE, f"latest_published:{self.channel_id}", video["published"])
+        self.store.mark_seen(STATE_NAMESPACE, seen or [video["id"]])
+
     async def cog_unload(self):
         """Cog 언로드 시 정리"""
         if hasattr(self, 'check_youtube'):
             self.check_youtube.cancel()
+        if self.websub:
+            await self.websub.stop()
 
     def init_youtube_client(self) -> bool:
         """YouTube API 클라이언트 초기화"""
@@ -42,7 +173,7 @@ class YouTube(commands.Cog):
                 logger.error("❌ YouTube API 키가 설정되지 않았습니다.")
                 return False
 
-            self.youtube = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
+            self.youtube = YouTubeAPI(self.http, YOUTUBE_API_KEY)
             logger.info("✅ YouTube API 클라이언트 초기화 완료")
             return True
 
@@ -50,78 +181,177 @@ class YouTube(commands.Cog):
             logger.error(f"❌ YouTube API 클라이언트 초기화 실패: {e}")
             return False
 
-    @tasks.loop(minutes=30)  # 30분마다 확인 (API 할당량 고려)
+    @tasks.loop(minutes=POLL_INTERVAL_MINUTES)
     async def check_youtube(self):
         """주기적으로 새 YouTube 동영상 확인"""
         await self.bot.wait_until_ready()
 
-        # YouTube API 클라이언트 초기화
-        if not self.init_youtube_client():
+        # YouTube API 클라이언트 초기화 (RSS 모드는 API 키 불필요)
+        if self.ingest_mode == "playlist" and not self.init_youtube_client():
             logger.warning("YouTube API 클라이언트 초기화 실패. 다음 시도까지 대기합니다.")
             return
 
-        # 알림 채널 설정
-        if not self.notify_channel:
-            try:
-                self.notify_channel = self.bot.get_channel(self.discord_channel_id)
-                if not self.notify_channel:
-                    logger.error(f"❌ YouTube 알림 채널을 찾을 수 없습니다: {self.discord_channel_id}")
-                    return
-            except Exception as e:
-                logger.error(f"❌ YouTube 채널 설정 오류: {e}")
-                return
+        # 푸시가 제대로 오고 있으면 안전망 폴링만 가끔 수행
+        if self._push_is_healthy() and self.last_poll_at and \
+                datetime.now() - self.last_poll_at < timedelta(minutes=PUSH_SAFETY_POLL_MINUTES):
+            return
+
+        if not self._has_subscribers():
+            return
+
+        # 할당량 초과/장애로 차단 중이면 이번 주기는 요청하지 않음
+        if self.breaker.is_open:
+            logger.info(f"⏸️ YouTube 요청 차단 중이라 확인을 건너뜁니다: {self.breaker.describe()}")
+            return
 
         try:
+            self.last_poll_at = datetime.now()
             await self._check_latest_videos()
 
         except Exception as e:
             logger.error(f"❌ YouTube 동영상 확인 중 예상치 못한 오류: {e}")
 
-    async def _check_latest_videos(self):
-        """최신 동영상 확인"""
+    def _push_is_healthy(self) -> bool:
+        """푸시만 믿고 폴링 간격을 늘려도 되는지
+
+        리스가 살아 있어도 허브가 알림을 보내지 않을 수 있으므로, 최근 PUSH_SILENCE_HOURS 안에
+        푸시(또는 구독 확인)가 있었고 폴링이 푸시가 놓친 동영상을 찾은 뒤로 푸시가 다시 왔을 때만 믿음
+        """
+        if not (self.websub and self.websub.is_active):
+            return False
+        last_push = self.websub.last_notification_at
+        last_heard = max(last_push or 0, self.websub.last_verified_at or 0)
+        if time.time() - last_heard > PUSH_SILENCE_HOURS * 3600:
+            return False
+        return self.push_missed_at is None or (last_push or 0) > self.push_missed_at
+
+    def _has_subscribers(self) -> bool:
+        """알림을 받을 구독 채널이 있는지 확인"""
+        if not self.subscriptions.has_subscribers("youtube"):
+            logger.debug("YouTube 알림을 구독한 채널이 없어 확인을 건너뜁니다.")
+            return False
+        return True
+
+    async def _handle_push(self, text: str):
+        """WebSub 푸시 알림 처리 (새 동영상은 바로 알림)"""
         try:
-            # 최신 동영상 정보 가져오기
-            request = self.youtube.search().list(
-                part="id,snippet",
-                channelId=self.channel_id,
-                maxResults=1,
-                order="date",
-                type="video",
-                publishedAfter=(datetime.now() - timedelta(hours=2)).isoformat() + 'Z'  # 최근 2시간 내 동영상
+            videos = parse_atom_feed(text)
+        except ET.ParseError as e:
+            logger.error(f"❌ WebSub 알림 파싱 오류: {e}")
+            return
+
+        if not videos or not self._has_subscribers():
+            return
+
+        async with self._process_lock:
+            # 제목 수정 등으로 다시 오는 알림은 seen 목록과 마지막 동영상 게시 시각으로 걸러냄
+            for video in reversed(videos):
+                if video["id"] == self.latest_video_id or self.store.is_seen(STATE_NAMESPACE, video["id"]):
+                    continue
+                published = parse_published(video["published"])
+                if self.latest_published and (published is None or published <= self.latest_published):
+                    logger.debug(f"이전 동영상의 수정 알림이라 무시합니다: {video['id']} ({video['published']})")
+                    continue
+                video_url = f"https://www.youtube.com/watch?v={video['id']}"
+                logger.info(f"📨 WebSub 푸시로 새 동영상 수신: {video['id']}")
+                await self._send_video_notification(video["id"], video["title"], video["description"], video_url)
+                self._save_cursor(video)
+
+    async def _fetch_playlist_uploads(self) -> List[Dict[str, str]]:
+        """업로드 재생목록에서 마지막으로 본 동영상까지의 동영상 목록 (최신순, 1 unit/페이지)"""
+        videos: List[Dict[str, str]] = []
+        page_token = None
+
+        for _ in range(MAX_CATCH_UP_PAGES):
+            response = await self.youtube.playlist_items(
+                uploads_playlist_id(self.channel_id),
+                max_results=PLAYLIST_PAGE_SIZE,
+                page_token=page_token
             )
 
-            # API 호출을 비동기로 실행
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, request.execute)
+            for item in response.get("items", []):
+                snippet = item.get("snippet", {})
+                videos.append({
+                    "id": item.get("contentDetails", {}).get("videoId") or snippet.get("resourceId", {}).get("videoId"),
+                    "title": snippet.get("title", ""),
+                    "description": snippet.get("description", ""),
+                    "published": item.get("contentDetails", {}).get("videoPublishedAt") or snippet.get("publishedAt", ""),
+                })
+
+            # 이미 본 동영상이 나오면 더 거슬러 올라갈 필요 없음
+            page_token = response.get("nextPageToken")
+            if not page_token or self.latest_video_id is None or self._reached_cursor(videos):
+                break
+
+        videos.sort(key=lambda v: v["published"], reverse=True)
+        return videos
+
+    async def _fetch_rss_uploads(self) -> List[Dict[str, str]]:
+        """공개 RSS 피드에서 최근 동영상 목록 (최신순, 할당량 없음)"""
+        async with self.http.get(HTTP_SERVICE, RSS_FEED_URL.format(self.channel_id), raise_for_status=True) as response:
+            text = await response.text()
+        return parse_atom_feed(text)
+
+    def _reached_cursor(self, videos: List[Dict[str, str]]) -> bool:
+        return any(v["id"] == self.latest_video_id or self.store.is_seen(STATE_NAMESPACE, v["id"]) for v in videos)
 
-            if not response.get("items"):
+    async def _check_latest_videos(self):
+        """최신 동영상 확인 (푸시 처리와 겹치지 않도록 잠금)"""
+        async with self._process_lock:
+            await self._poll_latest_videos()
+
+    async def _poll_latest_videos(self):
+        """최신 동영상 확인 (여러 개가 한꺼번에 올라와도 모두 알림)"""
+        try:
+            if self.ingest_mode == "rss":
+                videos = await self._fetch_rss_uploads()
+            else:
+                videos = await self._fetch_playlist_uploads()
+
+            if not videos:
                 logger.debug("새로운 YouTube 동영상이 없습니다.")
                 return
 
-            video_data = response["items"][0]
-            video_id = video_data["id"]["videoId"]
-            video_title = video_data["snippet"]["title"]
-            video_description = video_data["snippet"]["description"]
-            video_url = f"https://www.youtube.com/watch?v={video_id}"
-
             # 첫 실행시 최신 동영상 ID만 저장
             if self.latest_video_id is None:
-                self.latest_video_id = video_id
-                logger.info(f"✅ YouTube 첫 실행: 최신 동영상 ID({video_id}) 저장")
+                self._save_cursor(videos[0], seen=[v["id"] for v in videos])
+                logger.info(f"✅ YouTube 첫 실행: 최신 동영상 ID({videos[0]['id']}) 저장")
                 return
 
-            # 새로운 동영상이 있는 경우 알림 전송
-            if video_id != self.latest_video_id:
-                await self._send_video_notification(video_id, video_title, video_description, video_url)
-                self.latest_video_id = video_id
-
-        except HttpError as e:
-            if e.resp.status == 403:
-                logger.error("❌ YouTube API 할당량 초과 또는 권한 없음")
-            elif e.resp.status == 400:
-                logger.error("❌ YouTube API 요청 매개변수 오류")
-            else:
-                logger.error(f"❌ YouTube API HTTP 오류: {e}")
+            # 마지막으로 본 동영상보다 새로운 것만 (재시작 전에 이미 알린 동영상은 제외)
+            new_videos = []
+            for video in videos:
+                if video["id"] == self.latest_video_id:
+                    break
+                if not self.store.is_seen(STATE_NAMESPACE, video["id"]):
+                    new_videos.append(video)
+
+            # 푸시가 활성인데 폴링에서 새 동영상이 나오면 푸시가 놓친 것 - 다음 푸시가 올 때까지 평소 간격으로 폴링
+            if new_videos and self.websub and self.websub.is_active:
+                logger.warning(f"⚠️ WebSub 푸시가 놓친 동영상 {len(new_videos)}개를 폴링으로 찾았습니다. "
+                               f"푸시가 다시 올 때까지 {POLL_INTERVAL_MINUTES}분 간격으로 확인합니다.")
+                self.push_missed_at = time.time()
+
+            # 오래된 동영상부터 알림
+            for video in reversed(new_videos):
+                video_url = f"https://www.youtube.com/watch?v={video['id']}"
+                await self._send_video_notification(video["id"], video["title"], video["description"], video_url)
+                self._save_cursor(video)
+
+        except YouTubeQuotaError as e:
+            logger.error(f"❌ YouTube API 할당량 초과: {e.reason} - {self.breaker.retry_in / 3600:.1f}시간 동안 요청 중단")
+        except CircuitOpenError as e:
+            logger.debug(f"YouTube 확인 건너뜀: {e}")
+        except YouTubeAuthError as e:
+            logger.error(f"❌ YouTube API 권한 없음 (API 키 확인 필요): {e.reason}")
+        except YouTubeNotFoundError:
+            logger.error(f"❌ 업로드 재생목록을 찾을 수 없습니다: {uploads_playlist_id(self.channel_id)}")
+        except YouTubeAPIError as e:
+            logger.error(f"❌ YouTube API HTTP 오류: {e}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"❌ YouTube 요청 오류: {e}")
+        except ET.ParseError as e:
+            logger.error(f"❌ YouTube RSS 피드 파싱 오류: {e}")
         except Exception as e:
             logger.error(f"❌ YouTube 동영상 확인 중 오류: {e}")
 
@@ -145,11 +375,11 @@ class YouTube(commands.Cog):
             embed.set_footer(text=f"동영상 ID: {video_id}")
             embed.timestamp = datetime.now()
 
-            await self.notify_channel.send(embed=embed)
-            logger.info(f"✅ YouTube 알림 전송 완료: {title}")
+            # 임베드는 한 번만 만들고 구독 채널 전체로 보냄
+            result = self.subscriptions.publish("youtube", embed=embed, label=f"YouTube 알림({video_id})")
+            if result.queued:
+                logger.info(f"✅ YouTube 알림 대기열 등록: {title} ({result})")
 
-        except discord.HTTPException as e:
-            logger.error(f"❌ Discord 메시지 전송 오류: {e}")
         except Exception as e:
             logger.error(f"❌ YouTube 알림 전송 중 오류: {e}")
 
@@ -161,11 +391,16 @@ class YouTube(commands.Cog):
 
             await interaction.followup.send("YouTube API 연결 상태를 확인합니다...")
 
-            init_success = self.init_youtube_client()
+            init_success = self.ingest_mode == "rss" or self.init_youtube_client()
 
             debug_msg = f"""**YouTube 디버그 정보**
 API 키: {'설정됨' if YOUTUBE_API_KEY else '없음'}
+수집 방식: {self.ingest_mode} ({POLL_INTERVAL_MINUTES}분 간격)
+푸시(WebSub): {self.websub.describe() if self.websub else '사용 안 함'}
+마지막 동영상: {self.latest_video_id or '없음'}
+구독 채널: {len(self.subscriptions.channel_ids("youtube"))}개
 초기화 상태: {'성공' if init_success else '실패'}
+서킷 브레이커: {self.breaker.describe()}
 현재 시각: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
 
             await interaction.followup.send(debug_msg)
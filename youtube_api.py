@@ -0,0 +1,110 @@
+# youtube_api.py
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+from resilience import retry_after_from_headers
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# YouTube Data API v3 설정
+YOUTUBE_API_BASE = "https://www.googleapis.com/youtube/v3"
+HTTP_SERVICE = "youtube_api"
+REQUEST_TIMEOUT = 15
+
+# 할당량/속도 제한을 뜻하는 오류 reason
+QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded", "rateLimitExceeded", "userRateLimitExceeded"}
+DAILY_QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}   # 태평양 시간 자정에 초기화
+QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+RATE_LIMIT_PAUSE = 60   # 초당 속도 제한에 걸렸을 때 Retry-After 가 없으면 쉬는 시간(초)
+
+
+class YouTubeAPIError(Exception):
+    """YouTube Data API 오류 응답"""
+
+    def __init__(self, status: int, reason: str = "", message: str = ""):
+        super().__init__(f"{status} {reason}: {message}".strip())
+        self.status = status
+        self.reason = reason
+        self.message = message
+
+
+class YouTubeQuotaError(YouTubeAPIError):
+    """일일 할당량 초과 또는 속도 제한 (다음 할당량 초기화까지 재시도해도 소용 없음)"""
+
+
+class YouTubeAuthError(YouTubeAPIError):
+    """API 키가 잘못되었거나 권한 없음"""
+
+
+class YouTubeNotFoundError(YouTubeAPIError):
+    """요청한 재생목록/채널이 없음"""
+
+
+def seconds_until_quota_reset(now: Optional[datetime] = None) -> float:
+    """다음 일일 할당량 초기화(태평양 시간 자정)까지 남은 시간(초)"""
+    now = (now or datetime.now(QUOTA_TZ)).astimezone(QUOTA_TZ)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return max((midnight - now).total_seconds(), 0.0)
+
+
+def _error_from_response(status: int, body: Any) -> YouTubeAPIError:
+    """Google API 오류 본문({"error": {"errors": [{"reason": ...}]}})을 예외로 변환"""
+    error = body.get("error", {}) if isinstance(body, dict) else {}
+    errors = error.get("errors") or [{}]
+    reason = errors[0].get("reason", "")
+    message = error.get("message", "")
+
+    if reason in QUOTA_REASONS or status == 429:
+        return YouTubeQuotaError(status, reason, message)
+    if status in (401, 403):
+        return YouTubeAuthError(status, reason, message)
+    if status == 404:
+        return YouTubeNotFoundError(status, reason, message)
+    return YouTubeAPIError(status, reason, message)
+
+
+class YouTubeAPI:
+    """봇 공용 커넥션 풀을 쓰는 가벼운 비동기 YouTube Data API 클라이언트
+
+    googleapiclient 와 달리 discovery 문서를 읽지 않고, 스레드 풀 없이 이벤트 루프에서 바로 요청한다.
+    """
+
+    def __init__(self, http, api_key: str, base_url: str = YOUTUBE_API_BASE):
+        self.http = http
+        self.http.register_service(HTTP_SERVICE, timeout=REQUEST_TIMEOUT, headers={"Accept": "application/json"})
+        self.breaker = self.http.breaker(HTTP_SERVICE)
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+
+    async def _get(self, resource: str, **params) -> Dict[str, Any]:
+        """GET {base}/{resource} (None 인 매개변수는 제외)"""
+        query = {k: str(v) for k, v in params.items() if v is not None}
+        query["key"] = self.api_key
+        async with self.http.get(HTTP_SERVICE, f"{self.base_url}/{resource}", params=query) as response:
+            try:
+                body = await response.json(content_type=None)
+            except ValueError:
+                body = {}
+            if response.status != 200:
+                error = _error_from_response(response.status, body)
+                if isinstance(error, YouTubeQuotaError):
+                    # 할당량 오류는 403 이라 상태 코드만으로는 알 수 없음 - 초기화될 때까지 요청 중단
+                    if error.reason in DAILY_QUOTA_REASONS:
+                        self.breaker.trip(seconds_until_quota_reset(), f"할당량 초과 ({error.reason})")
+                    else:
+                        pause = retry_after_from_headers(response.headers) or RATE_LIMIT_PAUSE
+                        self.breaker.trip(pause, f"속도 제한 ({error.reason or response.status})")
+                raise error
+            return body
+
+    async def playlist_items(self, playlist_id: str, part: str = "snippet,contentDetails",
+                             max_results: int = 50, page_token: Optional[str] = None) -> Dict[str, Any]:
+        """playlistItems.list (1 unit)"""
+        return await self._get("playlistItems", part=part, playlistId=playlist_id,
+                               maxResults=max_results, pageToken=page_token)
+
+    async def channels(self, channel_id: str, part: str = "snippet,contentDetails") -> Dict[str, Any]:
+        """channels.list (1 unit)"""
+        return await self._get("channels", part=part, id=channel_id)